@@ -0,0 +1,187 @@
+"""Admission control for dashboard API requests.
+
+Starlette runs up to ~40 sync handlers at once, while the DB pool has ``DB_POOL_MAX``
+connections; without a limit the excess requests pile up inside ``db.get_conn`` and
+fail with ``PoolError`` (500) after ``DB_POOL_ACQUIRE_TIMEOUT``. This middleware admits
+requests per route class through a bounded FIFO queue instead:
+
+- ``cached`` — the encoded response is already in ``response_cache``: no DB work;
+- ``export`` — ``/export/*`` downloads: one connection each, held until the whole body
+  is streamed (see ``services/export``);
+- ``heavy`` — anything else: the request builds the response from Postgres.
+
+A request that finds its class queue full, or waits in it longer than
+``ADMISSION_MAX_WAIT``, gets an immediate ``503`` with ``Retry-After``, so under a spike
+latency stays bounded and clients back off instead of timing out.
+
+Exports have their own gate so that long downloads never take the slots of dashboard
+requests. The pool is split between the two: exports get ``DB_POOL_MAX // 10``
+connections by default (at least 1), and a heavy request may hold up to
+``DB_FANOUT_LIMIT`` connections at once (independent queries run concurrently, see
+``services/concurrency``), so the heavy gate admits ``(DB_POOL_MAX - export
+concurrency) // DB_FANOUT_LIMIT`` requests: the admitted requests cannot need more
+connections than the pool has. Raising ``DB_POOL_MAX`` or lowering ``DB_FANOUT_LIMIT``
+raises the defaults with it. Settings:
+``ADMISSION_CONTROL=0`` turns it off; ``ADMISSION_HEAVY_CONCURRENCY`` (default as
+above, at least 1) / ``ADMISSION_HEAVY_QUEUE`` (default twice the concurrency);
+``ADMISSION_EXPORT_CONCURRENCY`` / ``ADMISSION_EXPORT_QUEUE`` (default
+``DB_POOL_MAX // 10``, at least 1 / twice the concurrency);
+``ADMISSION_CACHED_CONCURRENCY`` / ``ADMISSION_CACHED_QUEUE`` (default 64 / 256);
+``ADMISSION_MAX_WAIT`` seconds (default 2); ``ADMISSION_RETRY_AFTER`` seconds (default 1).
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.backend import metrics, request_timing, response_cache
+from app.backend.services import concurrency
+
+
+def enabled() -> bool:
+    return os.environ.get("ADMISSION_CONTROL", "1").lower() not in ("0", "false", "no", "off")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+class AdmissionGate:
+    """At most ``limit`` requests run at once; up to ``max_queue`` more wait in FIFO order."""
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def _update_gauges(self):
+        metrics.ADMISSION_ACTIVE.labels(route_class=self.name).set(self.active)
+        metrics.ADMISSION_QUEUE_DEPTH.labels(route_class=self.name).set(len(self._waiters))
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot; returns None when admitted, otherwise the rejection reason."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._update_gauges()
+            metrics.ADMISSION_WAIT_SECONDS.labels(route_class=self.name).observe(0.0)
+            return None
+        if len(self._waiters) >= self.max_queue:
+            metrics.ADMISSION_REJECTED.labels(route_class=self.name, reason="queue_full").inc()
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        started = time.perf_counter()
+        try:
+            # release() hands the slot over by resolving the future, so ``active`` stays put
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except asyncio.TimeoutError:
+            if waiter.done():  # granted at the last moment
+                return None
+            waiter.cancel()
+            metrics.ADMISSION_REJECTED.labels(route_class=self.name, reason="timeout").inc()
+            return "timeout"
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._update_gauges()
+            metrics.ADMISSION_WAIT_SECONDS.labels(route_class=self.name).observe(time.perf_counter() - started)
+        return None
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self.active -= 1
+        self._update_gauges()
+
+
+def _default_export_concurrency() -> int:
+    """Pool connections left to exports, one per running download."""
+    return max(1, _env_int("DB_POOL_MAX", 10) // 10)
+
+
+def _default_heavy_concurrency(export_concurrency: int) -> int:
+    """Heavy requests whose DB fan-out fits in the pool next to the running exports."""
+    return max(1, (_env_int("DB_POOL_MAX", 10) - export_concurrency) // concurrency._default_limit())
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware admitting requests under ``path_prefix`` through per-class gates."""
+
+    def __init__(self, app: ASGIApp, path_prefix: str = "/api/dashboard"):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.enabled = enabled()
+        max_wait = _env_float("ADMISSION_MAX_WAIT", 2.0)
+        exports = _env_int("ADMISSION_EXPORT_CONCURRENCY", _default_export_concurrency())
+        heavy = _env_int("ADMISSION_HEAVY_CONCURRENCY", _default_heavy_concurrency(exports))
+        self.gates: Dict[str, AdmissionGate] = {
+            "cached": AdmissionGate(
+                "cached",
+                _env_int("ADMISSION_CACHED_CONCURRENCY", 64),
+                _env_int("ADMISSION_CACHED_QUEUE", 256),
+                max_wait,
+            ),
+            "export": AdmissionGate("export", exports, _env_int("ADMISSION_EXPORT_QUEUE", 2 * exports), max_wait),
+            "heavy": AdmissionGate("heavy", heavy, _env_int("ADMISSION_HEAVY_QUEUE", 2 * heavy), max_wait),
+        }
+        self.retry_after = _env_int("ADMISSION_RETRY_AFTER", 1)
+
+    def route_class(self, scope: Scope) -> str:
+        if scope["path"].startswith(self.path_prefix + "/export/"):
+            return "export"
+        return "cached" if response_cache.is_cached(Request(scope)) else "heavy"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not self.enabled or scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        gate = self.gates[self.route_class(scope)]
+        with request_timing.phase("queue"):
+            rejected = await gate.acquire()
+        if rejected is not None:
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
+
+    async def _reject(self, send: Send):
+        body = json.dumps({"detail": "Server is busy, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,401 @@
+"""Load benchmark of the ``/api/dashboard/*`` endpoints against a real Postgres.
+
+Starts the API (``uvicorn``, in a subprocess) on the given database — usually one filled
+by ``synthetic_data`` — discovers request parameters through the API itself (months,
+dates, ``description_id`` values) and drives every dashboard endpoint at a fixed
+concurrency in two modes:
+
+- ``cold`` — each round moves the data version first (``UPDATE last_loaded`` followed by
+  ``NOTIFY`` on ``DATA_VERSION_CHANNEL``, so all in-process caches are dropped) and then
+  sends one wave of ``concurrency`` simultaneous requests over different parameters;
+- ``warm`` — after one priming pass, ``requests`` requests with the caches populated.
+
+For each endpoint and mode the JSON report has p50/p95/p99/mean latency, throughput,
+errors, and the DB time per request (``pool`` + ``sql`` from the ``Server-Timing``
+header) and SQL statement count. The report also records the data scale, the git
+commit and the ``DB_*``/``RESPONSE_*``/``ADMISSION_*`` settings, so reports of two
+commits or configurations can be compared; ``--baseline`` prints that comparison.
+
+    python -m app.backend.benchmarks.api_load --dsn postgresql://localhost/skpdi_bench \\
+        --build --reset --days 730 --concurrency 16 --out bench.json --baseline main.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode, urlsplit
+
+import psycopg2
+from psycopg2 import sql
+
+from app.backend.benchmarks import synthetic_data
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+PREFIX = "/api/dashboard"
+CHANNEL = "bench_data_version"
+SMETA_KEYS = ("leto", "zima", "vnereglement")
+_ENV_PREFIXES = ("DB_", "RESPONSE_", "ADMISSION_", "CACHE_", "MONTH_CUBE", "SERVER_TIMING")
+
+_TIMING_ENTRY = re.compile(r'(\w+);dur=([0-9.]+)(?:;desc="(\d+) statements")?')
+
+
+class Client:
+    """Keep-alive HTTP client, one connection per worker thread."""
+
+    def __init__(self, base_url: str, timeout: float = 120.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conn(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def get(self, path: str) -> Tuple[int, bytes, float, Dict[str, str]]:
+        """GET ``path``; returns status, body, latency in seconds and headers."""
+        started = time.perf_counter()
+        conn = self._conn()
+        try:
+            conn.request("GET", path, headers={"Accept-Encoding": "br, gzip"})
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            raise
+        elapsed = time.perf_counter() - started
+        return response.status, body, elapsed, {k.lower(): v for k, v in response.getheaders()}
+
+    def get_json(self, path: str):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            body = response.read()
+        finally:
+            conn.close()
+        if response.status != 200:
+            raise RuntimeError(f"GET {path}: {response.status} {body[:200]!r}")
+        return json.loads(body)
+
+
+def _path(endpoint: str, **params) -> str:
+    query = urlencode({k: v for k, v in params.items() if v is not None})
+    return f"{PREFIX}{endpoint}" + (f"?{query}" if query else "")
+
+
+def discover_targets(client: Client, months_limit: int) -> Dict[str, List[str]]:
+    """Request paths per endpoint, built from the months, dates and descriptions the API returns."""
+    months = [m for m in client.get_json(_path("/months", limit=months_limit))]
+    months = [m["month"] if isinstance(m, dict) else m for m in months]
+    if not months:
+        raise RuntimeError("The API returned no months: is the database loaded?")
+    targets: Dict[str, List[str]] = {
+        "": [_path("", month=m) for m in months],
+        "/months": [_path("/months")],
+        "/months/catalog": [_path("/months/catalog")],
+        "/last-loaded": [_path("/last-loaded")],
+        "/daily": [],
+        "/monthly/smeta-description-daily": [],
+    }
+    for endpoint in ("/monthly/summary", "/monthly/page", "/monthly/by-smeta", "/monthly/daily-revenue",
+                     "/monthly/dates", "/monthly/fact-by-type-of-work"):
+        targets[endpoint] = [_path(endpoint, month=m) for m in months]
+    for endpoint in ("/monthly/smeta-details", "/monthly/smeta-details-with-types"):
+        targets[endpoint] = [_path(endpoint, month=m, smeta_key=k) for m in months for k in SMETA_KEYS]
+
+    for month in months:
+        dates = client.get_json(_path("/monthly/dates", month=month))
+        targets["/daily"] += [_path("/daily", date=d) for d in dates[:5]]
+        for smeta_key in SMETA_KEYS:
+            details = client.get_json(_path("/monthly/smeta-details", month=month, smeta_key=smeta_key))
+            for row in details.get("rows", [])[:3]:
+                targets["/monthly/smeta-description-daily"].append(
+                    _path("/monthly/smeta-description-daily", month=month, smeta_key=smeta_key,
+                          description_id=row["description_id"])
+                )
+    return {endpoint: paths for endpoint, paths in targets.items() if paths}
+
+
+def _server_timing(header: Optional[str]) -> Tuple[Optional[float], Optional[int]]:
+    """DB milliseconds (pool + sql) and SQL statement count from a ``Server-Timing`` header."""
+    if not header:
+        return None, None
+    db_ms, statements = 0.0, 0
+    for name, dur, desc in _TIMING_ENTRY.findall(header):
+        if name in ("pool", "sql"):
+            db_ms += float(dur)
+        if name == "sql" and desc:
+            statements = int(desc)
+    return db_ms, statements
+
+
+def _percentile(values: Sequence[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class Sample:
+    __slots__ = ("status", "latency", "db_ms", "statements")
+
+    def __init__(self, status: int, latency: float, db_ms: Optional[float], statements: Optional[int]):
+        self.status = status
+        self.latency = latency
+        self.db_ms = db_ms
+        self.statements = statements
+
+
+def _fetch(client: Client, path: str) -> Sample:
+    try:
+        status, _, latency, headers = client.get(path)
+    except (OSError, http.client.HTTPException):
+        return Sample(0, 0.0, None, None)
+    db_ms, statements = _server_timing(headers.get("server-timing"))
+    return Sample(status, latency, db_ms, statements)
+
+
+def summarize(samples: List[Sample], wall: float) -> dict:
+    ok = [s for s in samples if s.status == 200]
+    latencies = [s.latency * 1000 for s in ok]
+    db_times = [s.db_ms for s in ok if s.db_ms is not None]
+    statements = [s.statements for s in ok if s.statements is not None]
+
+    def ms(value):
+        return None if value is None else round(value, 2)
+
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "statuses": {str(k): v for k, v in sorted(_count(s.status for s in samples).items()) if k != 200},
+        "p50_ms": ms(_percentile(latencies, 50)),
+        "p95_ms": ms(_percentile(latencies, 95)),
+        "p99_ms": ms(_percentile(latencies, 99)),
+        "mean_ms": ms(statistics.fmean(latencies)) if latencies else None,
+        "throughput_rps": round(len(ok) / wall, 2) if wall > 0 else None,
+        "db_ms_mean": ms(statistics.fmean(db_times)) if db_times else None,
+        "sql_statements_mean": round(statistics.fmean(statements), 2) if statements else None,
+    }
+
+
+def _count(values) -> Dict[int, int]:
+    counts: Dict[int, int] = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+class DataVersionBumper:
+    """Moves ``last_loaded`` and waits until the API serves the new version."""
+
+    def __init__(self, dsn: str, client: Client, channel: str = CHANNEL):
+        self.conn = psycopg2.connect(dsn)
+        self.conn.autocommit = True
+        self.client = client
+        self.channel = channel
+
+    def bump(self, timeout: float = 30.0):
+        with self.conn.cursor() as cur:
+            # whole seconds, strictly increasing: every bump is a new version
+            cur.execute(
+                "UPDATE last_loaded SET last_loaded = GREATEST(last_loaded + interval '1 second', "
+                "date_trunc('second', clock_timestamp())::timestamp) RETURNING last_loaded"
+            )
+            loaded_at = cur.fetchone()[0]
+            cur.execute(sql.SQL("NOTIFY {}").format(sql.Identifier(self.channel)))
+        expected = loaded_at.isoformat()
+        # the new version shows up in /last-loaded once the server's watcher has seen it
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.client.get_json(_path("/last-loaded")).get("loaded_at") == expected:
+                return
+            time.sleep(0.05)
+        raise RuntimeError(f"The API did not pick up last_loaded = {loaded_at} within {timeout}s")
+
+    def close(self):
+        self.conn.close()
+
+
+def run_endpoint(client: Client, bumper: DataVersionBumper, paths: List[str], concurrency: int,
+                 cold_rounds: int, warm_requests: int) -> dict:
+    result = {}
+    with ThreadPoolExecutor(concurrency) as pool:
+        samples, wall = [], 0.0
+        for round_ in range(cold_rounds):
+            bumper.bump()
+            wave = [paths[(round_ * concurrency + i) % len(paths)] for i in range(concurrency)]
+            started = time.perf_counter()
+            samples += list(pool.map(lambda p: _fetch(client, p), wave))
+            wall += time.perf_counter() - started
+        result["cold"] = summarize(samples, wall)
+
+        list(pool.map(lambda p: _fetch(client, p), paths))  # prime
+        wave = [paths[i % len(paths)] for i in range(warm_requests)]
+        started = time.perf_counter()
+        samples = list(pool.map(lambda p: _fetch(client, p), wave))
+        result["warm"] = summarize(samples, time.perf_counter() - started)
+    result["distinct_params"] = len(paths)
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(dsn: str, workers: int) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    # no pre-warm by default, so cold waves really start with empty caches
+    env = {"CACHE_PREWARM_MONTHS": "0", **os.environ, "DB_DSN": dsn, "DATA_VERSION_CHANNEL": CHANNEL, "SERVER_TIMING": "1"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.backend.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=REPO_ROOT, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    client = Client(base_url, timeout=2)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            client.get_json("/api/health")
+            return process, base_url
+        except (OSError, RuntimeError):
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start within 60s")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _data_scale(dsn: str) -> dict:
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            scale = {}
+            for table in ("work_description", "status_of_work", "skpdi_report_raw", "mv_fact_daily_amounts"):
+                cur.execute(f"SELECT count(*) FROM {table}")
+                scale[table] = cur.fetchone()[0]
+            cur.execute("SELECT min(date_of_work), max(date_of_work) FROM skpdi_report_raw")
+            first, last = cur.fetchone()
+            scale["days"] = (last - first).days + 1 if first and last else 0
+            return scale
+    finally:
+        conn.close()
+
+
+def compare(report: dict, baseline: dict) -> List[str]:
+    """Lines comparing p50/p95/db time of ``report`` against ``baseline`` per endpoint and mode."""
+    lines = [f"{'endpoint':<36} {'mode':<5} {'p50 ms':>18} {'p95 ms':>18} {'db ms':>18}"]
+
+    def cell(new, old):
+        if new is None or old is None:
+            return f"{new!s:>18}"
+        change = (new - old) / old * 100 if old else 0.0
+        return f"{new:>9.1f} ({change:+5.0f}%)"
+
+    for endpoint, modes in report["endpoints"].items():
+        old_modes = baseline.get("endpoints", {}).get(endpoint, {})
+        for mode in ("cold", "warm"):
+            new, old = modes.get(mode, {}), old_modes.get(mode, {})
+            lines.append(f"{endpoint or '/':<36} {mode:<5} {cell(new.get('p50_ms'), old.get('p50_ms'))} "
+                         f"{cell(new.get('p95_ms'), old.get('p95_ms'))} {cell(new.get('db_ms_mean'), old.get('db_ms_mean'))}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold/warm load benchmark of the dashboard API")
+    parser.add_argument("--dsn", required=True, help="DSN of the benchmark database")
+    parser.add_argument("--build", action="store_true", help="load synthetic data first (see synthetic_data)")
+    parser.add_argument("--reset", action="store_true", help="with --build: drop the benchmark tables first")
+    synthetic_data.add_scale_arguments(parser)
+    parser.add_argument("--url", help="benchmark a running server instead of starting one; it must use "
+                                      f"the same database and DATA_VERSION_CHANNEL={CHANNEL}")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the started server")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--cold-rounds", type=int, default=3, help="cache-invalidating rounds per endpoint")
+    parser.add_argument("--requests", type=int, default=200, help="warm requests per endpoint")
+    parser.add_argument("--months", type=int, default=6, help="number of recent months to request")
+    parser.add_argument("--endpoint", action="append", help="only these endpoints (e.g. /monthly/page)")
+    parser.add_argument("--out", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="previous JSON report to compare with")
+    args = parser.parse_args(argv)
+
+    build = None
+    if args.build:
+        build = synthetic_data.build(args.dsn, synthetic_data.scale_from_args(args), reset=args.reset)
+
+    process = None
+    base_url = args.url
+    if base_url is None:
+        process, base_url = start_server(args.dsn, args.workers)
+    client = Client(base_url)
+    bumper = DataVersionBumper(args.dsn, client)
+    try:
+        targets = discover_targets(client, args.months)
+        if args.endpoint:
+            targets = {e: p for e, p in targets.items() if e in args.endpoint or (e == "" and "/" in args.endpoint)}
+        endpoints = {}
+        for endpoint, paths in targets.items():
+            endpoints[endpoint] = run_endpoint(client, bumper, paths, args.concurrency, args.cold_rounds, args.requests)
+            warm, cold = endpoints[endpoint]["warm"], endpoints[endpoint]["cold"]
+            print(f"{PREFIX}{endpoint}: cold p50 {cold['p50_ms']} ms, warm p50 {warm['p50_ms']} ms, "
+                  f"{warm['throughput_rps']} rps", file=sys.stderr)
+    finally:
+        bumper.close()
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "concurrency": args.concurrency,
+            "cold_rounds": args.cold_rounds,
+            "warm_requests": args.requests,
+            "workers": args.workers if args.url is None else None,
+            "data": _data_scale(args.dsn),
+            "build": build,
+            "env": {k: v for k, v in sorted(os.environ.items()) if k.startswith(_ENV_PREFIXES) and k != "DB_DSN"},
+        },
+        "endpoints": endpoints,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        print("\n".join(compare(report, baseline)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
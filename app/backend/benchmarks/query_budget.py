@@ -0,0 +1,628 @@
+"""Query budgets of the dashboard endpoints: SQL round trips and rows fetched per request.
+
+Regressions usually come from a service function quietly falling back to extra queries
+(``compute_plan_fact`` calling ``sum_fact_vnereglament``, ``build_monthly_summary``
+calling ``get_total_fact_amount`` without a bundle...). This checker replaces the DB
+pools of ``app.backend.db`` with a recording stand-in that answers every
+``dashboard_repo`` SQL constant from a small in-memory data set, requests each
+``/api/dashboard/*`` endpoint through the ASGI app and compares what it ran with the
+endpoint's declared budget:
+
+- ``cold`` — right after the data version moved: every cache is empty;
+- ``warm`` — the response cache is dropped but the service-layer caches are kept;
+- a repeated request served from the response cache must run no queries at all.
+
+Round trips are the statements sent for the request (``SET``/``RESET`` of the async
+path's session ``statement_timeout`` are reported separately and not budgeted); rows are
+the rows fetched. The budgets hold for the default configuration (``MONTH_CUBE`` off) on
+both the threadpool and the ``DB_ASYNC`` path. Exits with status 1 when an endpoint is
+over budget, so it can run in CI::
+
+    python -m app.backend.benchmarks.query_budget
+    python -m app.backend.benchmarks.query_budget --async
+
+A budget that is no longer reached is reported as ``under`` — tighten it in ``BUDGETS``.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import re
+import sys
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.backend import db
+from app.backend.repositories import dashboard_repo
+from app.backend.services import data_version
+from app.backend.services.description_registry import generate_description_id
+
+
+@dataclass(frozen=True)
+class Budget:
+    round_trips: int
+    rows: int
+
+
+@dataclass(frozen=True)
+class EndpointBudget:
+    path: str  # ``{description_id}`` is filled in from the fixture data
+    cold: Budget
+    warm: Budget
+
+
+MONTH = "2025-11"
+
+BUDGETS: Tuple[EndpointBudget, ...] = (
+    EndpointBudget(f"/api/dashboard?month={MONTH}", cold=Budget(2, 4), warm=Budget(0, 0)),
+    EndpointBudget(f"/api/dashboard/monthly/summary?month={MONTH}", cold=Budget(1, 1), warm=Budget(0, 0)),
+    EndpointBudget("/api/dashboard/months", cold=Budget(1, 3), warm=Budget(0, 0)),
+    EndpointBudget("/api/dashboard/months/catalog", cold=Budget(1, 3), warm=Budget(0, 0)),
+    EndpointBudget(f"/api/dashboard/monthly/page?month={MONTH}", cold=Budget(3, 106), warm=Budget(0, 0)),
+    EndpointBudget(f"/api/dashboard/monthly/by-smeta?month={MONTH}", cold=Budget(1, 1), warm=Budget(0, 0)),
+    EndpointBudget(f"/api/dashboard/monthly/daily-revenue?month={MONTH}", cold=Budget(1, 20), warm=Budget(0, 0)),
+    EndpointBudget("/api/dashboard/monthly/range?from=2025-09&to=2025-11", cold=Budget(1, 3), warm=Budget(0, 0)),
+    EndpointBudget(
+        "/api/dashboard/monthly/daily-revenue/range?from=2025-09&to=2025-11", cold=Budget(1, 60), warm=Budget(0, 0),
+    ),
+    EndpointBudget(f"/api/dashboard/monthly/dates?month={MONTH}", cold=Budget(1, 20), warm=Budget(1, 20)),
+    EndpointBudget(f"/api/dashboard/monthly/smeta-details?month={MONTH}&smeta_key=leto", cold=Budget(1, 10), warm=Budget(0, 0)),
+    EndpointBudget(
+        f"/api/dashboard/monthly/smeta-description-daily?month={MONTH}&smeta_key=leto&description_id={{description_id}}",
+        cold=Budget(1, 5), warm=Budget(1, 5),
+    ),
+    EndpointBudget("/api/dashboard/last-loaded", cold=Budget(0, 0), warm=Budget(0, 0)),
+    EndpointBudget(f"/api/dashboard/daily?date={MONTH}-05", cold=Budget(1, 10), warm=Budget(1, 10)),
+    EndpointBudget(f"/api/dashboard/monthly/fact-by-type-of-work?month={MONTH}", cold=Budget(1, 5), warm=Budget(1, 5)),
+    EndpointBudget(
+        f"/api/dashboard/monthly/smeta-details-with-types?month={MONTH}&smeta_key=leto",
+        cold=Budget(1, 10), warm=Budget(0, 0),
+    ),
+)
+
+
+# --- Fixture data ---
+
+SMETA_CODES = {1: "Лето", 2: "Зима", 3: "Внерегламент ч.1", 4: "Внерегламент ч.2"}
+TYPES_OF_WORK = ("Содержание", "Ремонт", "Уборка", "Озеленение", None)
+UNITS = ("м2", "м", "шт", "т")
+
+
+class FixtureData:
+    """A small, deterministic stand-in for the MVs the dashboard queries read."""
+
+    def __init__(self, months: Sequence[str] = ("2025-11", "2025-10", "2025-09"), descriptions: int = 40,
+                 days: int = 20, seed: int = 1):
+        rnd = random.Random(seed)
+        self.months = list(months)
+        self.loaded_at = datetime(2025, 11, 21, 6, 0)
+        self.descriptions = [
+            {
+                "id_description": i,
+                "description": f"Работа {i}",
+                "id_smeta": i % 4 + 1,
+                "smeta_code": SMETA_CODES[i % 4 + 1],
+                "type_of_work": TYPES_OF_WORK[i % len(TYPES_OF_WORK)],
+                "unit": UNITS[i % len(UNITS)],
+            }
+            for i in range(1, descriptions + 1)
+        ]
+        self.facts = []  # mv_fact_daily_amounts rows with id_status = 3
+        self.plan = []  # planned amount per month and description (Лето/Зима only)
+        for month_key in self.months:
+            first = date.fromisoformat(month_key + "-01")
+            for d in self.descriptions:
+                if d["id_smeta"] in (1, 2):
+                    self.plan.append({**d, "month_key": month_key,
+                                      "planned_amount": Decimal(rnd.randint(10_000, 900_000))})
+            for day in range(days):
+                for d in self.descriptions:
+                    if (day + d["id_description"]) % 4 == 0:
+                        self.facts.append({
+                            **d,
+                            "month_key": month_key,
+                            "date_done": first + timedelta(days=day),
+                            "total_volume": Decimal(rnd.randint(1, 500)),
+                            "total_amount": Decimal(rnd.randint(1_000, 90_000)) + Decimal("0.35"),
+                        })
+
+    def description_id(self, id_smeta: int = 1) -> str:
+        """``description_id`` of a description of smeta ``id_smeta`` that has fact in ``MONTH``."""
+        for row in self.facts:
+            if row["month_key"] == MONTH and row["id_smeta"] == id_smeta:
+                return generate_description_id(row["description"])
+        raise LookupError(id_smeta)
+
+    # Query helpers
+
+    def month_facts(self, month_start: str, smeta_ids: Optional[Sequence[int]] = None) -> List[dict]:
+        month_key = month_start[:7]
+        return [r for r in self.facts if r["month_key"] == month_key and (smeta_ids is None or r["id_smeta"] in smeta_ids)]
+
+    def plan_vs_fact(self, month_start: str, smeta_ids: Optional[Sequence[int]] = None) -> List[dict]:
+        """Rows of ``mv_plan_vs_fact_monthly_ids`` for the month."""
+        month_key = month_start[:7]
+        rows: Dict[int, dict] = {}
+        for r in self.plan:
+            if r["month_key"] == month_key:
+                rows[r["id_description"]] = {**r, "fact_amount_done": Decimal(0)}
+        for r in self.facts:
+            if r["month_key"] == month_key:
+                row = rows.setdefault(r["id_description"], {**r, "planned_amount": Decimal(0), "fact_amount_done": Decimal(0)})
+                row["fact_amount_done"] += r["total_amount"]
+        return [r for r in rows.values() if smeta_ids is None or r["id_smeta"] in smeta_ids]
+
+    def plan_fact_month(self, month_key: str) -> Optional[dict]:
+        rows = self.plan_vs_fact(month_key + "-01")
+        if not rows:
+            return None
+
+        def total(column, ids):
+            return _rounded(sum(r[column] for r in rows if r["id_smeta"] in ids))
+
+        plan_leto, plan_zima = total("planned_amount", (1,)), total("planned_amount", (2,))
+        plan_vnereglament = round((plan_leto + plan_zima) * 0.43)
+        return {
+            "month_key": month_key,
+            "plan_leto": plan_leto,
+            "plan_zima": plan_zima,
+            "plan_vnereglament": plan_vnereglament,
+            "plan_total": plan_leto + plan_zima + plan_vnereglament,
+            "fact_leto": total("fact_amount_done", (1,)),
+            "fact_zima": total("fact_amount_done", (2,)),
+            "fact_vnereglament": total("fact_amount_done", (3, 4)),
+            "fact_total": total("fact_amount_done", (1, 2, 3, 4)),
+        }
+
+    def items(self, month_start: str) -> List[dict]:
+        rows = sorted(self.plan_vs_fact(month_start), key=lambda r: r["planned_amount"], reverse=True)
+        return [
+            {
+                "month_start": month_start,
+                "smeta": r["smeta_code"],
+                "work_name": r["description"],
+                "planned_amount": float(r["planned_amount"]),
+                "fact_amount": float(r["fact_amount_done"]),
+            }
+            for r in rows
+        ]
+
+    def fact_total_all_months(self) -> int:
+        return sum((self.plan_fact_month(m) or {}).get("fact_total", 0) for m in self.months)
+
+
+def _rounded(value) -> int:
+    """``numeric::int`` of Postgres: half away from zero, where ``int()`` would truncate."""
+    return int(Decimal(value).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _group_sum(rows: Sequence[dict], keys: Sequence[str], column: str = "total_amount") -> List[dict]:
+    groups: Dict[tuple, Decimal] = defaultdict(Decimal)
+    for r in rows:
+        groups[tuple(r[k] for k in keys)] += r[column]
+    return [{**dict(zip(keys, key)), "amount": amount} for key, amount in groups.items()]
+
+
+def _daily_rows(rows: Sequence[dict]) -> List[dict]:
+    days: Dict[date, dict] = {}
+    for r in sorted(rows, key=lambda r: r["date_done"]):
+        day = days.setdefault(r["date_done"], {"date": r["date_done"].isoformat(), "volume": Decimal(0),
+                                               "unit": r["unit"], "amount": Decimal(0)})
+        day["volume"] += r["total_volume"]
+        day["amount"] += r["total_amount"]
+        day["unit"] = min(day["unit"], r["unit"])
+    return [{**d, "volume": _rounded(d["volume"]), "amount": _rounded(d["amount"])} for d in days.values()]
+
+
+def _handlers(data: FixtureData) -> Dict[str, Callable[[tuple], List[dict]]]:
+    """Result of every ``dashboard_repo`` SQL constant computed from ``data``, by constant name."""
+    months = [{"month": m} for m in data.months]
+
+    def plan_fact_rows_by_smeta(p):
+        month_start, _, monthly_ids, plan_id, _, fact_ids = p
+        rows = data.plan_vs_fact(month_start, monthly_ids)
+        out: Dict[str, dict] = {}
+        for r in rows:
+            row = out.setdefault(r["description"], {"description": r["description"], "plan": Decimal(0), "fact": Decimal(0)})
+            if plan_id is not None and r["id_smeta"] == plan_id:
+                row["plan"] += r["planned_amount"]
+            if r["id_smeta"] in fact_ids:
+                row["fact"] += r["fact_amount_done"]
+        return [{**row, "plan": _rounded(row["plan"]), "fact": _rounded(row["fact"])} for row in out.values()]
+
+    def range_plan_fact(p):
+        first, last = p[2], p[1][:7]
+        fact_cumulative = sum((data.plan_fact_month(m) or {}).get("fact_total", 0) for m in data.months if m < first)
+        rows = []
+        month_key = first
+        while month_key <= last:
+            pf = data.plan_fact_month(month_key) or {}
+            fact_cumulative += pf.get("fact_total", 0)
+            rows.append({
+                **{column: pf.get(column, 0) for column in (
+                    "plan_leto", "plan_zima", "plan_vnereglament", "plan_total", "fact_leto", "fact_zima", "fact_total")},
+                "month_key": month_key,
+                "fact_vnereglament": pf.get("fact_vnereglament"),
+                "sum_fact_vnereglament": pf.get("fact_vnereglament", 0),
+                "contract_amount": 1_250_000_000,
+                "fact_cumulative": fact_cumulative,
+            })
+            year, month = int(month_key[:4]), int(month_key[5:])
+            month_key = f"{year + 1:04d}-01" if month == 12 else f"{year:04d}-{month + 1:02d}"
+        return rows
+
+    def month_fact_breakdown(p):
+        rows = data.month_facts(p[0])
+        by_date = [{"breakdown": "date", "date": r["date_done"].isoformat(), "id_smeta": None, "description": None,
+                    "type_of_work": None, "amount": r["amount"]} for r in _group_sum(rows, ["date_done"])]
+        by_type = [{"breakdown": "type_of_work", "date": None, "id_smeta": None, "description": None, **r}
+                   for r in _group_sum(rows, ["type_of_work"])]
+        by_smeta = [{"breakdown": "smeta", "date": None, **r}
+                    for r in _group_sum(rows, ["id_smeta", "description", "type_of_work"])]
+        return by_date + by_type + by_smeta
+
+    def smeta_details_with_types(p):
+        out: Dict[str, dict] = {}
+        for r in data.plan_vs_fact(p[0], p[2]):
+            out[r["description"]] = {"type_of_work": r["type_of_work"], "description": r["description"],
+                                     "plan": _rounded(r["planned_amount"]), "fact": _rounded(r["fact_amount_done"])}
+        rows = [r for r in out.values() if r["plan"] > 1 or r["fact"] > 1]
+        return sorted(rows, key=lambda r: (r["type_of_work"] is None, r["type_of_work"] or "", -r["fact"]))
+
+    def bundle(p):
+        month_key, month_start = p[0], p[1]
+        plan_fact = data.plan_fact_month(month_key) or dict.fromkeys(
+            ("month_key", "plan_leto", "plan_zima", "plan_vnereglament", "plan_total",
+             "fact_leto", "fact_zima", "fact_vnereglament", "fact_total"))
+        return [{
+            **plan_fact,
+            "contract_amount": 1_250_000_000,
+            "fact_total_all_months": data.fact_total_all_months(),
+            "sum_fact_vnereglament": _rounded(sum(r["fact_amount_done"] for r in data.plan_vs_fact(month_start, (3, 4)))),
+            "items": data.items(month_start),
+        }]
+
+    def daily(p):
+        rows = [r for r in data.facts if r["date_done"].isoformat() == p[0]]
+        out = []
+        for description in sorted({r["description"] for r in rows}):
+            same = [r for r in rows if r["description"] == description]
+            out.append({"description": description, "unit": min(r["unit"] for r in same),
+                        "volume": _rounded(sum(r["total_volume"] for r in same)),
+                        "amount": _rounded(sum(r["total_amount"] for r in same))})
+        return out
+
+    def dates(p):
+        return [{"date": d} for d in sorted({r["date_done"].isoformat() for r in data.month_facts(p[0])})]
+
+    return {
+        "MONTHS_FROM_PLAN_VS_FACT_MONTHLY_SQL": lambda p: months,
+        "MONTHS_FROM_PLAN_FACT_BACKEND_SQL": lambda p: months,
+        "MONTHS_FROM_FACT_WITH_MONEY_SQL": lambda p: months,
+        "MONTHS_CATALOG_SQL": lambda p: [{"month": m, "has_plan": True, "has_fact": True} for m in data.months],
+        "PLAN_FACT_MONTH_SQL": lambda p: [r for r in [data.plan_fact_month(p[0])] if r],
+        "MONTH_SUMMARY_BUNDLE_SQL": bundle,
+        "SUM_FACT_VNEREGLAMENT_SQL": lambda p: [{"s": _rounded(sum(r["fact_amount_done"] for r in data.plan_vs_fact(p[0], (3, 4))))}],
+        "CONTRACT_AMOUNT_BY_MONTH_SQL": lambda p: [{"sum": 1_250_000_000}],
+        "CONTRACT_AMOUNT_DEFAULT_SQL": lambda p: [{"sum": 1_250_000_000}],
+        "TOTAL_FACT_AMOUNT_SQL": lambda p: [{"sum": data.fact_total_all_months()}],
+        "MONTHLY_ITEMS_SQL": lambda p: data.items(p[0]),
+        "LAST_LOADED_SQL": lambda p: [{"loaded_at": data.loaded_at}],
+        "PLAN_FACT_ROWS_BY_SMETA_SQL": plan_fact_rows_by_smeta,
+        "MONTH_PLAN_FACT_DETAILS_SQL": lambda p: [
+            {"id_smeta": r["id_smeta"], "description": r["description"], "type_of_work": r["type_of_work"],
+             "plan": r["planned_amount"], "fact": r["fact_amount_done"]}
+            for r in data.plan_vs_fact(p[0], p[2])
+        ],
+        "MONTH_FACT_BREAKDOWN_SQL": month_fact_breakdown,
+        "MONTH_FACT_SLICE_SQL": lambda p: [
+            {k: r[k] for k in ("date_done", "id_smeta", "id_description", "description", "type_of_work", "unit",
+                               "total_volume", "total_amount")}
+            for r in data.month_facts(p[0])
+        ],
+        "DESCRIPTION_DAILY_ROWS_SQL": lambda p: _daily_rows(
+            [r for r in data.month_facts(p[0], p[3]) if r["description"] == p[2]]),
+        "DESCRIPTION_DAILY_ROWS_BY_IDS_SQL": lambda p: _daily_rows(
+            [r for r in data.month_facts(p[0], p[3]) if r["id_description"] in p[2]]),
+        "WORK_DESCRIPTIONS_SQL": lambda p: [
+            {"id_description": d["id_description"], "description": d["description"]} for d in data.descriptions],
+        # Also serves month ranges: [first month, month after the second bound)
+        "MONTHLY_DAILY_REVENUE_SQL": lambda p: [
+            {"date": r["date_done"].isoformat(), "amount": _rounded(r["amount"])}
+            for r in sorted(_group_sum([f for f in data.facts if p[0][:7] <= f["month_key"] <= p[1][:7]], ["date_done"]),
+                            key=lambda r: r["date_done"])
+        ],
+        "RANGE_PLAN_FACT_SQL": range_plan_fact,
+        "DAILY_ROWS_SQL": daily,
+        "DAILY_TOTAL_SQL": lambda p: [{"total": sum(r["amount"] for r in daily(p))}],
+        "MONTHLY_DATES_SQL": dates,
+        "CATALOG_MONTHLY_DATES_SQL": dates,
+        "FACT_BY_TYPE_OF_WORK_SQL": lambda p: sorted(
+            ({"type_of_work": r["type_of_work"] or "Не указано", "amount": _rounded(r["amount"])}
+             for r in _group_sum(data.month_facts(p[0]), ["type_of_work"])),
+            key=lambda r: -r["amount"],
+        ),
+        "SMETA_DETAILS_WITH_TYPE_OF_WORK_SQL": smeta_details_with_types,
+        # Exports stream through db.server_cursor, which is outside the budgeted pools
+        "EXPORT_DAILY_ROWS_SQL": lambda p: [],
+        "EXPORT_SMETA_DETAILS_WITH_TYPES_SQL": lambda p: [],
+        "EXPORT_DESCRIPTION_DAILY_ROWS_SQL": lambda p: [],
+        "EXPORT_MONTHLY_ITEMS_SQL": lambda p: [],
+    }
+
+
+# --- Recording stand-in for the DB pools ---
+
+_STATEMENT_TIMEOUT_PREFIX = re.compile(r"^SET LOCAL statement_timeout = \d+; ")
+_SESSION_STATEMENT = re.compile(r"^(SET|RESET) statement_timeout\b")
+
+
+class RecordingDB:
+    """Answers ``dashboard_repo`` queries from ``FixtureData`` and records every statement."""
+
+    def __init__(self, data: FixtureData):
+        handlers = _handlers(data)
+        self._queries: Dict[str, Tuple[str, Callable[[tuple], List[dict]]]] = {}
+        for name in dir(dashboard_repo):
+            if name.endswith("_SQL"):
+                if name not in handlers:
+                    raise LookupError(f"No fixture for dashboard_repo.{name}: add it to query_budget._handlers")
+                self._queries[getattr(dashboard_repo, name)] = (name, handlers[name])
+        self._lock = threading.Lock()
+        self.statements: List[Tuple[str, int]] = []  # (SQL constant name, rows)
+        self.session_statements = 0
+
+    def reset(self):
+        with self._lock:
+            self.statements = []
+            self.session_statements = 0
+
+    def execute(self, statement: str, params: tuple) -> List[dict]:
+        if _SESSION_STATEMENT.match(statement):
+            with self._lock:
+                self.session_statements += 1
+            return []
+        sql = _STATEMENT_TIMEOUT_PREFIX.sub("", statement, count=1)
+        try:
+            name, handler = self._queries[sql]
+        except KeyError:
+            raise LookupError(f"Query is not a dashboard_repo constant: {' '.join(sql.split())[:200]}") from None
+        rows = [dict(r) for r in handler(tuple(params or ()))]
+        with self._lock:
+            self.statements.append((name, len(rows)))
+        return rows
+
+
+class _Cursor:
+    def __init__(self, recorder: RecordingDB):
+        self._recorder = recorder
+        self._rows: List[dict] = []
+        self.description = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def _execute(self, statement, params):
+        self._rows = self._recorder.execute(statement, params)
+        self.description = None if _SESSION_STATEMENT.match(statement) else ()
+
+    def execute(self, statement, params=()):
+        self._execute(statement, params)
+
+    def fetchall(self):
+        return self._rows
+
+
+class _AsyncCursor(_Cursor):
+    async def execute(self, statement, params=()):
+        self._execute(statement, params)
+
+    async def fetchall(self):
+        return self._rows
+
+
+class _Connection:
+    def __init__(self, recorder: RecordingDB):
+        self._recorder = recorder
+
+    def cursor(self, cursor_factory=None):
+        return _Cursor(self._recorder)
+
+    def cancel(self):
+        pass
+
+
+class _AsyncConnection(_Connection):
+    def cursor(self, cursor_factory=None):
+        return _AsyncCursor(self._recorder)
+
+
+class _Pool:
+    """Stands in for ``db.FairConnectionPool``."""
+
+    def __init__(self, recorder: RecordingDB):
+        self._recorder = recorder
+
+    def getconn(self, timeout):
+        return _Connection(self._recorder)
+
+    def putconn(self, conn):
+        pass
+
+    def closeall(self):
+        pass
+
+    def status(self):
+        return {}
+
+
+class _AsyncPool:
+    """Stands in for psycopg's ``AsyncConnectionPool`` (one connection per request task)."""
+
+    def __init__(self, recorder: RecordingDB):
+        self._recorder = recorder
+        self._connections: List[_AsyncConnection] = []
+
+    @contextlib.asynccontextmanager
+    async def connection(self, timeout=None):
+        conn = self._connections.pop() if self._connections else _AsyncConnection(self._recorder)
+        try:
+            yield conn
+        finally:
+            self._connections.append(conn)
+
+
+@contextlib.contextmanager
+def recording_db(recorder: RecordingDB, use_async: bool = False) -> Iterator[RecordingDB]:
+    """Install the stand-in as ``db``'s pools (the async one only with ``use_async``)."""
+    saved = db._pool, db._async_pool
+    db._pool = _Pool(recorder)
+    db._async_pool = _AsyncPool(recorder) if use_async else None
+    try:
+        yield recorder
+    finally:
+        db._pool, db._async_pool = saved
+
+
+# --- Driving the endpoints ---
+
+
+async def asgi_get(app, path: str) -> int:
+    """GET ``path`` from ``app`` over raw ASGI; returns the status code."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"query-budget")], "client": ("127.0.0.1", 1), "server": ("query-budget", 80),
+    }
+    finished = asyncio.Event()
+    request_sent = False
+    status = 0
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            finished.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+@dataclass
+class Measurement:
+    status: int
+    round_trips: int
+    rows: int
+    session_statements: int
+    queries: List[str]
+
+    def within(self, budget: Budget) -> bool:
+        return self.status == 200 and self.round_trips <= budget.round_trips and self.rows <= budget.rows
+
+
+async def _measure(app, recorder: RecordingDB, path: str) -> Measurement:
+    recorder.reset()
+    status = await asgi_get(app, path)
+    statements = list(recorder.statements)
+    return Measurement(status, len(statements), sum(rows for _, rows in statements),
+                       recorder.session_statements, [name for name, _ in statements])
+
+
+async def measure_all(app, recorder: RecordingDB, data: FixtureData, budgets: Sequence[EndpointBudget]) -> List[dict]:
+    """Cold, warm and response-cached measurements of every endpoint."""
+    from app.backend import response_cache
+
+    results = []
+    for budget in budgets:
+        path = budget.path.format(description_id=data.description_id())
+        data.loaded_at += timedelta(seconds=1)
+        data_version.set_loaded_at(data.loaded_at)  # drops every cache
+        cold = await _measure(app, recorder, path)
+        response_cache._cache.invalidate()
+        warm = await _measure(app, recorder, path)
+        cached = await _measure(app, recorder, path)
+        results.append({"budget": budget, "path": path, "cold": cold, "warm": warm, "cached": cached})
+    return results
+
+
+def _verdict(measured: Measurement, budget: Budget) -> str:
+    if not measured.within(budget):
+        return "OVER" if measured.status == 200 else f"HTTP {measured.status}"
+    if measured.round_trips < budget.round_trips or measured.rows < budget.rows:
+        return "under"
+    return "ok"
+
+
+def report(results: List[dict]) -> Tuple[List[str], bool]:
+    """Table lines and whether every endpoint is within its budget."""
+    lines = [f"{'endpoint':<70} {'mode':<6} {'round trips':>12} {'rows':>12}  verdict"]
+    passed = True
+    for result in results:
+        budget: EndpointBudget = result["budget"]
+        for mode in ("cold", "warm", "cached"):
+            measured: Measurement = result[mode]
+            limit = getattr(budget, mode) if mode != "cached" else Budget(0, 0)
+            verdict = _verdict(measured, limit)
+            passed = passed and verdict in ("ok", "under")
+            lines.append(
+                f"{result['path'][:70]:<70} {mode:<6} {f'{measured.round_trips}/{limit.round_trips}':>12} "
+                f"{f'{measured.rows}/{limit.rows}':>12}  {verdict}"
+            )
+            if verdict not in ("ok", "under") or mode == "cold" and verdict == "under":
+                lines.append(f"{'':<70} {'':<6} queries: {', '.join(measured.queries) or '-'}")
+    return lines, passed
+
+
+def run(use_async: bool = False, budgets: Sequence[EndpointBudget] = BUDGETS) -> Tuple[List[str], bool]:
+    """Measure ``budgets`` on the threadpool or ``DB_ASYNC`` path; returns the report and pass/fail."""
+    # Budgets describe the default configuration
+    os.environ.pop("MONTH_CUBE", None)
+    os.environ["CACHE_PREWARM_MONTHS"] = "0"
+    os.environ["ADMISSION_CONTROL"] = "0"
+    from app.backend.main import app
+
+    data = FixtureData()
+    recorder = RecordingDB(data)
+    with recording_db(recorder, use_async=use_async):
+        results = asyncio.run(measure_all(app, recorder, data, budgets))
+    return report(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check SQL round trips and rows per dashboard endpoint")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="check the DB_ASYNC data path")
+    args = parser.parse_args(argv)
+    lines, passed = run(use_async=args.use_async)
+    print("\n".join(lines))
+    if not passed:
+        print("\nQuery budget exceeded", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
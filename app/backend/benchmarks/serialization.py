@@ -0,0 +1,152 @@
+"""Microbenchmark of response encoding: standard FastAPI path vs ``RESPONSE_JSON=orjson``.
+
+Builds realistic payloads for every response model in ``schemas/dashboard.py`` through
+the service-layer assembly helpers and, for each of them, reports the time per encode
+and the peak memory allocated while encoding (``tracemalloc``) for both paths. It also
+checks that both paths produce the same bytes.
+
+Run from the repository root::
+
+    python -m app.backend.benchmarks.serialization --rows 2000
+"""
+
+import argparse
+import random
+import timeit
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, List, Tuple
+
+from app.backend.response_cache import encode_fast, encode_standard
+from app.backend.routers import dashboard as dashboard_router
+from app.backend.services import dashboard_service as svc
+
+MONTH = "2025-11"
+_WORDS = [
+    "ремонт", "асфальтобетонного", "покрытия", "очистка", "обочин", "от", "мусора", "ямочный",
+    "механизированная", "уборка", "проезжей", "части", "покос", "травы", "замена", "бортового",
+    "камня", "нанесение", "разметки", "противогололёдными", "материалами", "обработка", "тротуаров",
+]
+_TYPES_OF_WORK = ["Содержание", "Ремонт", "Уборка", "Озеленение", "Разметка", None]
+_UNITS = ["м2", "м", "шт", "т", "км", None]
+
+
+def _description(rnd: random.Random, index: int) -> str:
+    return " ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(4, 10))).capitalize() + f" №{index}"
+
+
+def _amount(rnd: random.Random) -> int:
+    return rnd.randint(0, 5_000_000)
+
+
+def build_payloads(rows: int, seed: int = 1) -> List[Tuple[str, Any, Any]]:
+    """Return (name, response_model, service output) for every dashboard response."""
+    rnd = random.Random(seed)
+    descriptions = [_description(rnd, i) for i in range(rows)]
+    days = [f"{MONTH}-{d:02d}" for d in range(1, 31)]
+
+    bundle = {
+        "month_key": MONTH,
+        "plan_leto": _amount(rnd) * 20, "plan_zima": _amount(rnd) * 10,
+        "plan_vnereglament": None, "plan_total": None,
+        "fact_leto": _amount(rnd) * 18, "fact_zima": _amount(rnd) * 9, "fact_vnereglament": None,
+        "fact_total": _amount(rnd) * 30, "contract_amount": 1_250_000_000,
+        "fact_total_all_months": 640_000_000, "sum_fact_vnereglament": _amount(rnd) * 5,
+        # items arrive from json_agg, so amounts are plain floats/ints
+        "items": [
+            {
+                "month_start": f"{MONTH}-01",
+                "smeta": rnd.choice(["Лето", "Зима", "Внерегламент ч.1"]),
+                "work_name": description,
+                "planned_amount": round(rnd.uniform(0, 3_000_000), 2),
+                "fact_amount": round(rnd.uniform(0, 3_000_000), 2),
+            }
+            for description in descriptions
+        ],
+    }
+    aggregate = svc.MonthAggregate.from_bundle(MONTH, bundle)
+    months = [f"{y}-{m:02d}" for y in (2026, 2025) for m in range(12, 0, -1)]
+    plan_fact_rows = [
+        {"description": d, "plan": _amount(rnd), "fact": _amount(rnd)} for d in descriptions
+    ]
+    typed_rows = sorted(
+        (
+            {"type_of_work": rnd.choice(_TYPES_OF_WORK), "description": d, "plan": _amount(rnd), "fact": _amount(rnd)}
+            for d in descriptions
+        ),
+        key=lambda r: (r["type_of_work"] is None, r["type_of_work"] or "", -r["fact"]),
+    )
+    page_plan_rows = [
+        {"id_smeta": rnd.randint(1, 4), "description": d, "type_of_work": rnd.choice(_TYPES_OF_WORK),
+         "plan": rnd.uniform(0, 1e6), "fact": rnd.uniform(0, 1e6)}
+        for d in descriptions
+    ]
+    page_fact_rows = (
+        [{"breakdown": "date", "date": day, "amount": rnd.uniform(0, 1e7)} for day in days]
+        + [{"breakdown": "type_of_work", "type_of_work": t, "amount": rnd.uniform(0, 1e8)} for t in _TYPES_OF_WORK]
+        + [dict(r, breakdown="smeta", amount=r["fact"]) for r in page_plan_rows]
+    )
+
+    payloads = [
+        ("combined", svc.assemble_combined_dashboard(MONTH, months, {"loaded_at": datetime(2025, 11, 20, 6, 0)}, aggregate)),
+        ("monthly/summary", svc.build_monthly_summary(MONTH, aggregate)),
+        ("monthly/by-smeta", svc.build_monthly_by_smeta(MONTH, aggregate)),
+        ("monthly/page", svc.assemble_monthly_page(MONTH, aggregate, page_plan_rows, page_fact_rows)),
+        ("monthly/daily-revenue", {"month": MONTH, "rows": [{"date": day, "amount": _amount(rnd)} for day in days]}),
+        ("monthly/smeta-details", svc.assemble_monthly_smeta_details(MONTH, "leto", plan_fact_rows)),
+        ("monthly/smeta-details-with-types", svc.assemble_smeta_details_with_types(MONTH, "leto", typed_rows)),
+        ("monthly/smeta-description-daily", {
+            "month": MONTH, "smeta_key": "leto", "description": descriptions[0],
+            "rows": [{"date": day, "volume": _amount(rnd) // 1000, "unit": "м2", "amount": _amount(rnd)} for day in days],
+        }),
+        ("monthly/fact-by-type-of-work", svc.assemble_fact_by_type_of_work(
+            MONTH, [{"type_of_work": t or "Не указано", "amount": _amount(rnd)} for t in _TYPES_OF_WORK],
+        )),
+        ("daily", svc.assemble_daily(f"{MONTH}-05", [
+            {"description": d, "unit": rnd.choice(_UNITS), "volume": _amount(rnd) // 1000, "amount": _amount(rnd)}
+            for d in descriptions
+        ])),
+        ("last-loaded", {"loaded_at": "2025-11-20T06:00:00"}),
+        ("months", months),
+        ("months/catalog", [{"month": m, "has_plan": True, "has_fact": m <= MONTH} for m in months]),
+    ]
+    models = {route.path.removeprefix("/") or "combined": route.response_model for route in dashboard_router.router.routes}
+    return [(name, models[name], content) for name, content in payloads]
+
+
+def _measure(fn: Callable[[], bytes], repeat: int) -> Tuple[float, float]:
+    """Best time per call in microseconds and peak traced allocation in KiB."""
+    number = max(1, repeat)
+    best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best * 1e6, peak / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000, help="rows in list responses (items, details, daily)")
+    parser.add_argument("--repeat", type=int, default=20, help="encodes per timing run")
+    args = parser.parse_args(argv)
+
+    header = f"{'response':34} {'bytes':>9} {'std µs':>10} {'fast µs':>10} {'speedup':>8} {'std KiB':>9} {'fast KiB':>9}  same"
+    print(header)
+    print("-" * len(header))
+    for name, model, content in build_payloads(args.rows):
+        standard = encode_standard(model, content)
+        fast = encode_fast(content)
+        std_us, std_kib = _measure(lambda: encode_standard(model, content), args.repeat)
+        fast_us, fast_kib = _measure(lambda: encode_fast(content), args.repeat)
+        print(
+            f"{name:34} {len(standard):9d} {std_us:10.1f} {fast_us:10.1f} {std_us / fast_us:7.1f}x "
+            f"{std_kib:9.1f} {fast_kib:9.1f}  {'yes' if fast == standard else 'NO'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
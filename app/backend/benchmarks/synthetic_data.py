@@ -0,0 +1,296 @@
+"""Synthetic SKPDI data set for benchmarks, loaded into a local Postgres.
+
+Creates the dimension and fact tables from ``docs/Postgres DB.md`` with generated rows
+at a configurable scale (date range, number of work descriptions and statuses, report
+rows per day), then builds the materialized views exactly as ``docs/materialized_views.md``
+defines them (its ``sql`` blocks are executed in order) plus the indexes the backend
+relies on. ``mv_ruad_plan`` is not documented, so it is defined here from
+``skpdi_plan_agg`` × ``work_description`` × ``prices_2025`` (planned_volume * price).
+
+Meant for a throwaway database::
+
+    python -m app.backend.benchmarks.synthetic_data --dsn postgresql://localhost/skpdi_bench \\
+        --reset --start 2024-01-01 --days 730 --descriptions 800 --rows-per-day 400
+"""
+
+import argparse
+import io
+import random
+import re
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterable, List, Sequence
+
+import psycopg2
+
+DOCS_DIR = Path(__file__).resolve().parents[3] / "docs"
+
+SMETAS = [(1, "Лето"), (2, "Зима"), (3, "Внерегламент ч.1"), (4, "Внерегламент ч.2")]
+SMETA_WEIGHTS = [0.45, 0.3, 0.15, 0.1]
+UNITS = ["м2", "м", "шт", "т", "км", "м3", "100 м2"]
+TYPES_OF_WORK = [
+    "Содержание проезжей части", "Ремонт покрытия", "Уборка", "Озеленение", "Разметка",
+    "Обслуживание ТСОДД", "Зимнее содержание", "Водоотвод", "Мосты и путепроводы", "Тротуары",
+]
+BASE_STATUSES = ["Новая", "На рассмотрении", "Рассмотрено", "Отклонено"]
+REVIEWED_STATUS = 3  # the backend only counts id_status = 3 ('Рассмотрено')
+_WORDS = [
+    "ремонт", "асфальтобетонного", "покрытия", "очистка", "обочин", "от", "мусора", "ямочный",
+    "механизированная", "уборка", "проезжей", "части", "покос", "травы", "замена", "бортового",
+    "камня", "нанесение", "разметки", "обработка", "противогололёдными", "материалами", "тротуаров",
+    "остановочных", "павильонов", "дорожных", "знаков", "ограждений", "водоотводных", "лотков",
+]
+MONTH_NAMES = [
+    "Январь", "Февраль", "Март", "Апрель", "Май", "Июнь",
+    "Июль", "Август", "Сентябрь", "Октябрь", "Ноябрь", "Декабрь",
+]
+
+SCHEMA_SQL = """
+    CREATE TABLE type_of_smeta (smeta_code text, id_smeta BIGINT PRIMARY KEY);
+    CREATE TABLE smeta_section (smeta_section text, id_smeta numeric, id_smeta_section BIGINT PRIMARY KEY);
+    CREATE TABLE type_of_work (type_work text, id_type_of_work BIGINT PRIMARY KEY);
+    CREATE TABLE unit_list (unit text, id_unit BIGINT PRIMARY KEY);
+    CREATE TABLE work_description (
+        description text, id_description BIGINT PRIMARY KEY, id_unit BIGINT, id_smeta BIGINT,
+        id_smeta_section BIGINT, id_type_of_work BIGINT
+    );
+    CREATE TABLE status_of_work (status text, id_status BIGINT PRIMARY KEY);
+    CREATE TABLE section_of_road (
+        section_of_road text, "id_section of road" BIGINT PRIMARY KEY, category_of_road text,
+        distance numeric, width_of_road numeric, area numeric, register_number text
+    );
+    CREATE TABLE dates_table (
+        date date PRIMARY KEY, month_name text, month_number INT, year INT, day_of_week INT,
+        is_weekend BOOLEAN, year_month text, month_name_short text
+    );
+    CREATE TABLE skpdi_report_raw (
+        id_plan INT, id_done_work INT, date_of_work date, time_of_closing time, id_status BIGINT,
+        "id_section of road" BIGINT, id_description BIGINT, volume_done numeric, comments text
+    );
+    CREATE TABLE prices_2025 (id_smeta BIGINT, id_smeta_section BIGINT, id_description BIGINT, price numeric);
+    CREATE TABLE skpdi_plan_agg (
+        month_start date, description text, unit text, planned_volume numeric, source_files text,
+        loaded_at timestamp
+    );
+    CREATE TABLE last_loaded (last_loaded timestamp without time zone);
+    CREATE TABLE fact_pik_amount (
+        date_of_work date, smeta_code text, smeta_section text, description text, volume_done numeric
+    );
+    CREATE TABLE podolsk_mad_2025_contract_amount (contract_amount numeric);
+    CREATE TABLE podolsk_mad_2026_1sthalf_contract_amount (contract_amount numeric);
+    """
+
+RUAD_PLAN_SQL = """
+    CREATE MATERIALIZED VIEW mv_ruad_plan AS
+    SELECT pa.month_start,
+        wd.id_description,
+        wd.id_smeta,
+        pa.planned_volume * p.price AS planned_amount
+    FROM skpdi_plan_agg pa
+        JOIN work_description wd ON wd.description = pa.description
+        LEFT JOIN prices_2025 p ON p.id_description = wd.id_description
+            AND p.id_smeta = wd.id_smeta AND p.id_smeta_section = wd.id_smeta_section
+    """
+
+# Indexes listed in docs/Postgres DB.md (their definitions are not documented)
+INDEXES_SQL = """
+    CREATE INDEX mv_fact_daily_amounts_date_status3_idx ON mv_fact_daily_amounts (date_done) WHERE id_status = 3;
+    CREATE INDEX mv_fact_daily_amounts_date_desc_status3_idx ON mv_fact_daily_amounts (date_done, description) WHERE id_status = 3;
+    CREATE INDEX mv_fact_daily_amounts_date_smeta_status3_idx ON mv_fact_daily_amounts (date_done, id_smeta) WHERE id_status = 3;
+    CREATE INDEX mv_plan_vs_fact_monthly_ids_month_idx ON mv_plan_vs_fact_monthly_ids (month_start);
+    CREATE INDEX mv_plan_vs_fact_monthly_ids_month_smeta_idx ON mv_plan_vs_fact_monthly_ids (month_start, id_smeta);
+    CREATE INDEX mv_plan_vs_fact_monthly_ids_month_smeta_desc_idx ON mv_plan_vs_fact_monthly_ids (month_start, id_smeta, description);
+    CREATE UNIQUE INDEX mv_plan_fact_monthly_backend_ids_month_key_uq ON mv_plan_fact_monthly_backend_ids (month_key);
+    CREATE INDEX mv_plan_fact_monthly_backend_ids_month_facttotal_idx ON mv_plan_fact_monthly_backend_ids (month_key, fact_total);
+    """
+
+DROP_SQL = """
+    DROP MATERIALIZED VIEW IF EXISTS mv_months_catalog, mv_fact_dates_catalog, mv_plan_fact_monthly_backend_ids,
+        mv_plan_vs_fact_monthly_ids, mv_fact_daily_amounts, mv_ruad_plan CASCADE;
+    DROP TABLE IF EXISTS type_of_smeta, smeta_section, type_of_work, unit_list, work_description, status_of_work,
+        section_of_road, dates_table, skpdi_report_raw, prices_2025, skpdi_plan_agg, last_loaded, fact_pik_amount,
+        podolsk_mad_2025_contract_amount, podolsk_mad_2026_1sthalf_contract_amount CASCADE;
+    """
+
+
+@dataclass(frozen=True)
+class Scale:
+    start: date
+    days: int
+    descriptions: int
+    statuses: int
+    rows_per_day: int
+    sections_per_smeta: int = 6
+    plan_coverage: float = 0.6
+    seed: int = 1
+
+    @property
+    def months(self) -> List[date]:
+        months, day = [], self.start.replace(day=1)
+        end = self.start + timedelta(days=self.days)
+        while day < end:
+            months.append(day)
+            day = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return months
+
+
+def materialized_view_sql() -> List[str]:
+    """The ``sql`` blocks of ``docs/materialized_views.md``, in document (= rebuild) order."""
+    text = (DOCS_DIR / "materialized_views.md").read_text(encoding="utf-8")
+    return re.findall(r"```sql\n(.*?)```", text, flags=re.S)
+
+
+def _copy(cur, table: str, columns: Sequence[str], rows: Iterable[Sequence]):
+    """COPY ``rows`` into ``table`` (text format; None becomes NULL)."""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join("\\N" if v is None else str(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+    cols = ", ".join(f'"{c}"' for c in columns)
+    cur.copy_expert(f"COPY {table} ({cols}) FROM STDIN", buf)
+
+
+def _description(rnd: random.Random, index: int) -> str:
+    words = " ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(3, 9)))
+    return f"{words.capitalize()} (позиция {index})"
+
+
+def generate(cur, scale: Scale):
+    """Fill the tables of an empty schema with generated rows."""
+    rnd = random.Random(scale.seed)
+
+    _copy(cur, "type_of_smeta", ["smeta_code", "id_smeta"], [(code, id_) for id_, code in SMETAS])
+    sections = []
+    for id_smeta, code in SMETAS:
+        for n in range(1, scale.sections_per_smeta + 1):
+            sections.append((f"{code}: раздел {n}", id_smeta, id_smeta * 100 + n))
+    _copy(cur, "smeta_section", ["smeta_section", "id_smeta", "id_smeta_section"], sections)
+    _copy(cur, "type_of_work", ["type_work", "id_type_of_work"], [(t, i) for i, t in enumerate(TYPES_OF_WORK, 1)])
+    _copy(cur, "unit_list", ["unit", "id_unit"], [(u, i) for i, u in enumerate(UNITS, 1)])
+    statuses = [(BASE_STATUSES[i - 1] if i <= len(BASE_STATUSES) else f"Статус {i}", i) for i in range(1, max(scale.statuses, 3) + 1)]
+    _copy(cur, "status_of_work", ["status", "id_status"], statuses)
+    _copy(
+        cur, "section_of_road",
+        ["section_of_road", "id_section of road", "category_of_road", "distance", "width_of_road", "area", "register_number"],
+        [(f"Участок {i}", i, rnd.choice(["II", "III", "IV"]), round(rnd.uniform(0.5, 12), 3), 7.5, round(rnd.uniform(3000, 90000), 1), f"46-250 ОП МР {i:03d}")
+         for i in range(1, 61)],
+    )
+
+    descriptions = []
+    for id_description in range(1, scale.descriptions + 1):
+        id_smeta = rnd.choices([s[0] for s in SMETAS], weights=SMETA_WEIGHTS)[0]
+        descriptions.append((
+            _description(rnd, id_description),
+            id_description,
+            rnd.randint(1, len(UNITS)) if rnd.random() > 0.02 else None,
+            id_smeta,
+            id_smeta * 100 + rnd.randint(1, scale.sections_per_smeta),
+            rnd.randint(1, len(TYPES_OF_WORK)) if rnd.random() > 0.05 else None,
+        ))
+    _copy(cur, "work_description",
+          ["description", "id_description", "id_unit", "id_smeta", "id_smeta_section", "id_type_of_work"], descriptions)
+    prices = {d[1]: round(rnd.lognormvariate(7, 1.3), 2) for d in descriptions}
+    _copy(cur, "prices_2025", ["id_smeta", "id_smeta_section", "id_description", "price"],
+          [(d[3], d[4], d[1], prices[d[1]]) for d in descriptions])
+
+    days = [scale.start + timedelta(days=i) for i in range(scale.days)]
+    _copy(cur, "dates_table",
+          ["date", "month_name", "month_number", "year", "day_of_week", "is_weekend", "year_month", "month_name_short"],
+          [(d, MONTH_NAMES[d.month - 1], d.month, d.year, d.isoweekday(), d.isoweekday() >= 6,
+            d.strftime("%Y-%m"), MONTH_NAMES[d.month - 1][:3]) for d in days])
+
+    # Each description is active in some seasons only, like summer/winter works
+    active = [d for d in descriptions]
+    status_ids = [s[1] for s in statuses]
+    status_weights = [0.7 if s == REVIEWED_STATUS else 0.3 / (len(status_ids) - 1) for s in status_ids]
+
+    def report_rows():
+        done = 0
+        for day in days:
+            winter = day.month in (11, 12, 1, 2, 3)
+            pool = [d for d in active if (d[3] == 2) == winter or d[3] in (3, 4)] or active
+            for _ in range(max(0, int(rnd.gauss(scale.rows_per_day, scale.rows_per_day * 0.2)))):
+                d = rnd.choice(pool)
+                done += 1
+                yield (
+                    done // 5 + 1, done, day, f"{rnd.randint(6, 22):02d}:{rnd.randint(0, 59):02d}:00",
+                    rnd.choices(status_ids, weights=status_weights)[0], rnd.randint(1, 60), d[1],
+                    round(rnd.uniform(0.1, 400), 3), None,
+                )
+
+    _copy(cur, "skpdi_report_raw",
+          ["id_plan", "id_done_work", "date_of_work", "time_of_closing", "id_status", "id_section of road",
+           "id_description", "volume_done", "comments"], report_rows())
+
+    loaded_at = datetime.now().replace(microsecond=0)
+    unit_names = {i: u for i, u in enumerate(UNITS, 1)}
+    _copy(cur, "skpdi_plan_agg",
+          ["month_start", "description", "unit", "planned_volume", "source_files", "loaded_at"],
+          [(month, d[0], unit_names.get(d[2]), round(rnd.uniform(10, 3000), 3), "synthetic.xlsx", loaded_at)
+           for month in scale.months for d in descriptions if rnd.random() < scale.plan_coverage])
+    _copy(cur, "last_loaded", ["last_loaded"], [(loaded_at,)])
+    _copy(cur, "podolsk_mad_2025_contract_amount", ["contract_amount"], [(rnd.randint(10**8, 10**9),) for _ in range(12)])
+    _copy(cur, "podolsk_mad_2026_1sthalf_contract_amount", ["contract_amount"], [(rnd.randint(10**8, 10**9),) for _ in range(6)])
+
+
+def build(dsn: str, scale: Scale, reset: bool = False) -> dict:
+    """Create the schema, generate the data and build the MVs; returns row counts and timings."""
+    timings = {}
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn, conn.cursor() as cur:
+            if reset:
+                cur.execute(DROP_SQL)
+            started = time.perf_counter()
+            cur.execute(SCHEMA_SQL)
+            generate(cur, scale)
+            timings["generate_s"] = round(time.perf_counter() - started, 2)
+
+            started = time.perf_counter()
+            cur.execute(RUAD_PLAN_SQL)
+            for statement in materialized_view_sql():
+                cur.execute(statement)
+                if "CREATE MATERIALIZED VIEW mv_plan_fact_monthly_backend_ids" in statement:
+                    cur.execute(INDEXES_SQL)
+            timings["materialized_views_s"] = round(time.perf_counter() - started, 2)
+
+            cur.execute("ANALYZE")
+            counts = {}
+            for table in ("work_description", "skpdi_report_raw", "skpdi_plan_agg", "mv_fact_daily_amounts",
+                          "mv_plan_vs_fact_monthly_ids", "mv_months_catalog"):
+                cur.execute(f"SELECT count(*) FROM {table}")
+                counts[table] = cur.fetchone()[0]
+    finally:
+        conn.close()
+    return {"rows": counts, **timings}
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 1, 1), help="first day of data")
+    parser.add_argument("--days", type=int, default=365, help="number of days of report data")
+    parser.add_argument("--descriptions", type=int, default=600, help="number of work descriptions")
+    parser.add_argument("--statuses", type=int, default=4, help="number of work statuses (id 3 = reviewed)")
+    parser.add_argument("--rows-per-day", type=int, default=300, help="mean skpdi_report_raw rows per day")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def scale_from_args(args) -> Scale:
+    return Scale(start=args.start, days=args.days, descriptions=args.descriptions, statuses=args.statuses,
+                 rows_per_day=args.rows_per_day, seed=args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load a synthetic SKPDI data set into a local Postgres")
+    parser.add_argument("--dsn", required=True, help="DSN of a throwaway database")
+    parser.add_argument("--reset", action="store_true", help="drop the benchmark tables and MVs first")
+    add_scale_arguments(parser)
+    args = parser.parse_args(argv)
+    result = build(args.dsn, scale_from_args(args), reset=args.reset)
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
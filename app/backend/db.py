@@ -1,17 +1,165 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Iterator
+from collections import deque
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
 import os
+import sys
 import time
+import weakref
 import psycopg2
-from psycopg2 import pool
+from psycopg2 import extensions, pool
 from psycopg2.extras import RealDictCursor
 import threading
+from psycopg import AsyncClientCursor, errors as pg_errors
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
 
-_pool: Optional[pool.ThreadedConnectionPool] = None
+from app.backend import metrics, query_log, request_timing
+
+
+class FairConnectionPool:
+    """Thread-safe psycopg2 connection pool with a FIFO wait queue.
+
+    Threads that find the pool exhausted queue up on a condition variable and are
+    served strictly in arrival order as soon as a connection is returned, instead of
+    polling. Returned connections stay open for reuse up to `maxconn`. Acquire wait,
+    checkout duration, pool occupancy and timeouts are exported as Prometheus metrics.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, dsn: str):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.dsn = dsn
+        self.closed = False
+        self._idle: List[Any] = []
+        self._opened = 0
+        self._in_use = 0
+        self._waiters: deque = deque()
+        self._checked_out_at: Dict[int, float] = {}
+        self._cond = threading.Condition(threading.Lock())
+        metrics.DB_POOL_MAX_CONNECTIONS.set(maxconn)
+        for _ in range(minconn):
+            self._idle.append(psycopg2.connect(dsn))
+            self._opened += 1
+        self._update_gauges()
+
+    def _update_gauges(self):
+        metrics.DB_POOL_CONNECTIONS_IN_USE.set(self._in_use)
+        metrics.DB_POOL_CONNECTIONS_IDLE.set(len(self._idle))
+        metrics.DB_POOL_WAITERS.set(len(self._waiters))
+
+    def getconn(self, timeout: float):
+        """Check out a connection, waiting up to `timeout` seconds in FIFO order.
+
+        Raises psycopg2.pool.PoolError on timeout or if the pool is closed.
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        ticket = object()
+        with self._cond:
+            if self.closed:
+                raise pool.PoolError("connection pool is closed")
+            self._waiters.append(ticket)
+            try:
+                while self._waiters[0] is not ticket or self._in_use >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        metrics.DB_POOL_ACQUIRE_TIMEOUTS.inc()
+                        raise pool.PoolError(f"timed out after {timeout}s waiting for a DB connection")
+                    self._update_gauges()
+                    self._cond.wait(remaining)
+                    if self.closed:
+                        raise pool.PoolError("connection pool is closed")
+                self._in_use += 1
+                conn = self._idle.pop() if self._idle else None
+            finally:
+                self._waiters.remove(ticket)
+                # The next waiter in line may be able to proceed now
+                self._cond.notify_all()
+                self._update_gauges()
+
+        metrics.DB_POOL_ACQUIRE_WAIT_SECONDS.observe(time.monotonic() - start)
+        if conn is None:
+            try:
+                conn = psycopg2.connect(self.dsn)
+            except Exception:
+                self._release_slot(opened_delta=0)
+                raise
+            with self._cond:
+                self._opened += 1
+        self._checked_out_at[id(conn)] = time.monotonic()
+        return conn
+
+    def putconn(self, conn):
+        started = self._checked_out_at.pop(id(conn), None)
+        if started is not None:
+            metrics.DB_POOL_CHECKOUT_SECONDS.observe(time.monotonic() - started)
+
+        keep = not self.closed and not conn.closed
+        if keep:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                # server connection lost
+                keep = False
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                # connection in error or in transaction
+                try:
+                    conn.rollback()
+                except Exception:
+                    keep = False
+        if not keep:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._release_slot(opened_delta=0 if keep else -1, conn=conn if keep else None)
+
+    def _release_slot(self, opened_delta: int, conn=None):
+        with self._cond:
+            self._in_use -= 1
+            self._opened += opened_delta
+            if conn is not None:
+                self._idle.append(conn)
+            self._cond.notify_all()
+            self._update_gauges()
+
+    def closeall(self):
+        with self._cond:
+            self.closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "minconn": self.minconn,
+                "maxconn": self.maxconn,
+                "num_opened": self._opened,
+                "num_free": len(self._idle),
+                "num_used": self._in_use,
+                "num_waiting": len(self._waiters),
+            }
+
+
+_pool: Optional[FairConnectionPool] = None
 _lock = threading.Lock()
+_async_pool: Optional[AsyncConnectionPool] = None
+# statement_timeout currently set on each async connection (they run in autocommit)
+_async_statement_timeouts: "weakref.WeakKeyDictionary[Any, Optional[int]]" = weakref.WeakKeyDictionary()
+
+
+def _acquire_timeout() -> float:
+    env_timeout = os.environ.get("DB_POOL_ACQUIRE_TIMEOUT")
+    return float(env_timeout) if env_timeout else 5.0
 
 
 def init_db(dsn: str, minconn: int | None = None, maxconn: int | None = None):
-    """Initialize a threaded connection pool.
+    """Initialize the fair connection pool.
 
     If `minconn`/`maxconn` are not provided, try to read `DB_POOL_MIN`/`DB_POOL_MAX`
     from environment variables. Defaults to min=1, max=10.
@@ -23,7 +171,7 @@ def init_db(dsn: str, minconn: int | None = None, maxconn: int | None = None):
             env_max = os.environ.get("DB_POOL_MAX")
             minc = minconn if minconn is not None else int(env_min) if env_min else 1
             maxc = maxconn if maxconn is not None else int(env_max) if env_max else 10
-            _pool = psycopg2.pool.ThreadedConnectionPool(minc, maxc, dsn)
+            _pool = FairConnectionPool(minc, maxc, dsn)
 
 
 def close_db():
@@ -34,33 +182,15 @@ def close_db():
             _pool = None
 
 
-def _get_conn_raw():
-    """Return a raw connection from the pool or raise RuntimeError if uninitialized."""
-    global _pool
-    if _pool is None:
-        raise RuntimeError("DB pool is not initialized")
-    return _pool.getconn()
-
-
-def get_conn(timeout: float = 5.0, retry_interval: float = 0.05):
-    """Get a connection from pool with retries until `timeout` seconds.
+def get_conn(timeout: float | None = None):
+    """Get a connection from the pool, waiting up to `timeout` seconds.
 
+    The timeout defaults to `DB_POOL_ACQUIRE_TIMEOUT` (5 seconds).
     Raises psycopg2.pool.PoolError if no connection becomes available.
     """
-    start = time.time()
-    last_exc: Exception | None = None
-    while True:
-        try:
-            return _get_conn_raw()
-        except Exception as e:
-            # If pool is not initialized, raise immediately
-            if isinstance(e, RuntimeError):
-                raise
-            last_exc = e
-            if time.time() - start >= timeout:
-                # re-raise the last exception (likely PoolError)
-                raise
-            time.sleep(retry_interval)
+    if _pool is None:
+        raise RuntimeError("DB pool is not initialized")
+    return _pool.getconn(_acquire_timeout() if timeout is None else timeout)
 
 
 def put_conn(conn):
@@ -71,35 +201,151 @@ def put_conn(conn):
 
 
 def pool_status() -> Dict[str, Any]:
-    """Return diagnostic information about the pool (best-effort).
-
-    Uses internal attributes if available; never required for normal operation.
-    """
-    global _pool
+    """Return diagnostic information about the pool."""
     if _pool is None:
         return {"initialized": False}
-    status: Dict[str, Any] = {"initialized": True}
+    return {"initialized": True, **_pool.status()}
+
+
+# --- Request-scoped query execution ---
+#
+# An HTTP request runs its queries inside a ``QueryScope`` (see ``query_scope``): every
+# statement gets the scope's ``statement_timeout`` and registers its connection while it
+# runs, so ``QueryScope.cancel()`` (the client disconnected) can send a backend cancel
+# for the queries in flight and make the scope's later queries fail fast. The scope is a
+# contextvar, so it follows the request into the threadpool and ``run_concurrently``.
+
+
+class QueryCancelled(Exception):
+    """The query was cancelled because the request that issued it was abandoned."""
+
+
+class QueryScope:
+    """Statement timeout and in-flight connections of one request."""
+
+    def __init__(self, statement_timeout_ms: Optional[int] = None):
+        self.statement_timeout_ms = statement_timeout_ms
+        self.cancelled = False
+        self._running: set = set()
+        self._lock = threading.Lock()
+
+    def _register(self, conn) -> bool:
+        with self._lock:
+            if self.cancelled:
+                return False
+            self._running.add(conn)
+            return True
+
+    def _unregister(self, conn):
+        with self._lock:
+            self._running.discard(conn)
+
+    def cancel(self):
+        """Cancel the queries running for this scope; later queries raise ``QueryCancelled``."""
+        with self._lock:
+            self.cancelled = True
+            running = list(self._running)
+        for conn in running:
+            try:
+                conn.cancel()
+            except Exception:
+                pass
+
+
+_query_scope: ContextVar[Optional[QueryScope]] = ContextVar("query_scope", default=None)
+
+
+@contextmanager
+def query_scope(statement_timeout_ms: Optional[int] = None) -> Iterator[QueryScope]:
+    """Run the queries of the enclosed block (and of threads/tasks it starts) in a new scope."""
+    scope = QueryScope(statement_timeout_ms)
+    token = _query_scope.set(scope)
     try:
-        status["minconn"] = getattr(_pool, "minconn", None)
-        status["maxconn"] = getattr(_pool, "maxconn", None)
-        # private attributes may exist
-        status["num_free"] = len(getattr(_pool, "_pool", []))
-        status["num_used"] = len(getattr(_pool, "_used", []))
-    except Exception:
-        pass
-    return status
+        yield scope
+    finally:
+        _query_scope.reset(token)
+
+
+def current_scope() -> Optional[QueryScope]:
+    return _query_scope.get()
+
+
+def detached_context() -> Context:
+    """Copy of the current context with a fresh scope (same statement timeout).
+
+    For work shared with other requests: cancelling the current request's scope does
+    not cancel the queries started in the returned context.
+    """
+    context = copy_context()
+    scope = _query_scope.get()
+    if scope is not None:
+        context.run(_query_scope.set, QueryScope(scope.statement_timeout_ms))
+    return context
+
+
+def scope_cancelled() -> bool:
+    scope = _query_scope.get()
+    return scope is not None and scope.cancelled
+
+
+def _caller_label() -> str:
+    """``<repo module>.<function>`` of the repository function issuing the query."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get("__name__") == __name__:
+        frame = frame.f_back
+    if frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.backend.repositories."):
+            return f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+    return "other"
+
+
+def _interrupted(label: str, scope: Optional[QueryScope], exc: Exception) -> Exception:
+    """Count a cancelled/timed out query; return the exception to raise."""
+    if scope is not None and scope.cancelled:
+        metrics.DB_QUERIES_INTERRUPTED.labels(function=label, reason="cancelled").inc()
+        return QueryCancelled(label)
+    metrics.DB_QUERIES_INTERRUPTED.labels(function=label, reason="timeout").inc()
+    return exc
+
+
+def _skip_cancelled(label: str):
+    metrics.DB_QUERIES_INTERRUPTED.labels(function=label, reason="skipped").inc()
+    raise QueryCancelled(label)
 
 
 def query(sql: str, params: tuple = ()):  # returns list[dict]
+    label = _caller_label()
+    scope = _query_scope.get()
+    if scope is not None and scope.cancelled:
+        _skip_cancelled(label)
+    statement = sql
+    if scope is not None and scope.statement_timeout_ms:
+        # Same round trip; SET LOCAL ends with the transaction that putconn rolls back
+        statement = "SET LOCAL statement_timeout = %d; %s" % (int(scope.statement_timeout_ms), sql)
+    acquire_started = time.perf_counter()
     conn = get_conn()
+    pool_wait = time.perf_counter() - acquire_started
     try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(sql, params)
-            try:
-                rows = cur.fetchall()
-            except psycopg2.ProgrammingError:
-                rows = []
+        if scope is not None and not scope._register(conn):
+            _skip_cancelled(label)
+        try:
+            started = time.perf_counter()
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(statement, params)
+                try:
+                    rows = cur.fetchall()
+                except psycopg2.ProgrammingError:
+                    rows = []
+            finished = time.perf_counter()
+            request_timing.query_timed(pool_wait, started, finished)
+            query_log.observe(label, sql, params, finished - started, rows, explain=explain)
             return rows
+        except extensions.QueryCanceledError as exc:
+            raise _interrupted(label, scope, exc) from exc
+        finally:
+            if scope is not None:
+                scope._unregister(conn)
     finally:
         put_conn(conn)
 
@@ -107,3 +353,148 @@ def query(sql: str, params: tuple = ()):  # returns list[dict]
 def query_one(sql: str, params: tuple = ()):  # returns dict or None
     rows = query(sql, params)
     return rows[0] if rows else None
+
+
+def _stream_batch_rows() -> int:
+    env_rows = os.environ.get("DB_STREAM_BATCH_ROWS")
+    return int(env_rows) if env_rows else 2000
+
+
+def server_cursor(sql: str, params: tuple = (), itersize: Optional[int] = None, statement_timeout_ms: Optional[int] = None):
+    """Named (server-side) cursor over ``sql`` on a pooled connection, for streaming large results.
+
+    Use as a context manager and read with ``fetchmany(cur.itersize)`` (``itersize``
+    defaults to ``DB_STREAM_BATCH_ROWS``, 2000): rows stay in Postgres until fetched, so memory does not grow with the result. The connection is
+    held (and its transaction open) until the block exits. ``statement_timeout_ms``
+    limits each fetch; the caller passes it because streaming outlives the request's
+    ``QueryScope``.
+    """
+    return _server_cursor(_caller_label(), sql, params, itersize or _stream_batch_rows(), statement_timeout_ms)
+
+
+@contextmanager
+def _server_cursor(label: str, sql: str, params: tuple, itersize: int, statement_timeout_ms: Optional[int]):
+    conn = get_conn()
+    started = time.perf_counter()
+    try:
+        if statement_timeout_ms:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL statement_timeout = %d" % int(statement_timeout_ms))
+        with conn.cursor(name=f"stream_{id(conn):x}") as cur:
+            cur.itersize = itersize
+            try:
+                cur.execute(sql, params)
+                yield cur
+            except extensions.QueryCanceledError as exc:
+                raise _interrupted(label, None, exc) from exc
+    finally:
+        metrics.DB_QUERY_SECONDS.labels(function=label).observe(time.perf_counter() - started)
+        put_conn(conn)
+
+
+def explain(sql: str, params: tuple = (), timeout_ms: int = 30000) -> List[str]:
+    """Run ``EXPLAIN (ANALYZE, BUFFERS)`` for a query on its own connection; returns plan lines.
+
+    Used by ``query_log`` for slow queries (for both data paths: the SQL is the same).
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SET LOCAL statement_timeout = %d; EXPLAIN (ANALYZE, BUFFERS) %s" % (int(timeout_ms), sql),
+                params,
+            )
+            return [row[0] for row in cur.fetchall()]
+    finally:
+        put_conn(conn)
+
+
+# --- Async data path (psycopg 3) ---
+#
+# Enabled with DB_ASYNC=1. Routes then await `aquery`/`aquery_one` directly on the
+# event loop instead of running the sync path in Starlette's threadpool, so request
+# concurrency is bounded by DB connections rather than threadpool threads. The sync
+# pool above stays initialized for background work (e.g. the data version watcher).
+
+
+def async_enabled() -> bool:
+    """Return True if the async pool is initialized and routes should use it."""
+    return _async_pool is not None
+
+
+def async_requested() -> bool:
+    """Return True if the async data path is enabled via DB_ASYNC."""
+    return os.environ.get("DB_ASYNC", "").lower() in ("1", "true", "yes", "on")
+
+
+async def init_async_db(dsn: str, minconn: int | None = None, maxconn: int | None = None):
+    """Initialize the async connection pool.
+
+    Pool sizes follow the same `DB_POOL_MIN`/`DB_POOL_MAX` defaults as `init_db`.
+    Connections use client-side parameter binding so the same SQL (e.g. `DATE %s`)
+    runs unchanged on both paths.
+    """
+    global _async_pool
+    if _async_pool is not None:
+        return
+    env_min = os.environ.get("DB_POOL_MIN")
+    env_max = os.environ.get("DB_POOL_MAX")
+    minc = minconn if minconn is not None else int(env_min) if env_min else 1
+    maxc = maxconn if maxconn is not None else int(env_max) if env_max else 10
+    async_pool = AsyncConnectionPool(
+        dsn,
+        min_size=minc,
+        max_size=maxc,
+        kwargs={"autocommit": True, "row_factory": dict_row, "cursor_factory": AsyncClientCursor},
+        open=False,
+    )
+    await async_pool.open()
+    _async_pool = async_pool
+
+
+async def close_async_db():
+    global _async_pool
+    async_pool, _async_pool = _async_pool, None
+    if async_pool is not None:
+        await async_pool.close()
+
+
+async def aquery(sql: str, params: tuple = (), timeout: float = 5.0):  # returns list[dict]
+    if _async_pool is None:
+        raise RuntimeError("Async DB pool is not initialized")
+    label = _caller_label()
+    scope = _query_scope.get()
+    if scope is not None and scope.cancelled:
+        _skip_cancelled(label)
+    statement_timeout = scope.statement_timeout_ms if scope is not None else None
+    acquire_started = time.perf_counter()
+    async with _async_pool.connection(timeout=timeout) as conn:
+        pool_wait = time.perf_counter() - acquire_started
+        if scope is not None and not scope._register(conn):
+            _skip_cancelled(label)
+        try:
+            async with conn.cursor() as cur:
+                if _async_statement_timeouts.get(conn) != statement_timeout:
+                    # Session-level, so only sent when the budget differs from the last query's
+                    await cur.execute(
+                        "SET statement_timeout = %d" % int(statement_timeout) if statement_timeout
+                        else "RESET statement_timeout"
+                    )
+                    _async_statement_timeouts[conn] = statement_timeout
+                started = time.perf_counter()
+                await cur.execute(sql, params)
+                rows = await cur.fetchall() if cur.description is not None else []
+            finished = time.perf_counter()
+            request_timing.query_timed(pool_wait, started, finished)
+            query_log.observe(label, sql, params, finished - started, rows, explain=explain)
+            return rows
+        except pg_errors.QueryCanceled as exc:
+            raise _interrupted(label, scope, exc) from exc
+        finally:
+            if scope is not None:
+                scope._unregister(conn)
+
+
+async def aquery_one(sql: str, params: tuple = ()):  # returns dict or None
+    rows = await aquery(sql, params)
+    return rows[0] if rows else None
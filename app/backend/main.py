@@ -1,7 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from psycopg import errors as pg_errors
+from psycopg2.extensions import QueryCanceledError
+from psycopg2.pool import PoolError
+from psycopg_pool import PoolTimeout
+from app.backend.routers.admin import router as admin_router
 from app.backend.routers.dashboard import router as dashboard_router
+from app.backend.routers.reports import router as reports_router
 from app.backend import db
+from app.backend.admission import AdmissionControlMiddleware
+from app.backend.request_timing import RequestTimingMiddleware
+from app.backend.services import data_version, reports
 from prometheus_fastapi_instrumentator import Instrumentator
 import os
 
@@ -9,6 +19,10 @@ app = FastAPI(title="SKPDI Dashboard Backend")
 
 # Подключаем роутер дашборда
 app.include_router(dashboard_router, prefix="/api/dashboard")
+# Обновление MV и прогрев кэшей (только при заданном ADMIN_TOKEN)
+app.include_router(admin_router, prefix="/api/admin")
+# PDF-отчёты за месяц: рендер в фоновом пуле, вне admission control
+app.include_router(reports_router, prefix="/api/reports")
 
 # CORS: читаем разрешённые origin'ы из переменной окружения ALLOWED_ORIGINS (comma-separated)
 allowed = os.environ.get("ALLOWED_ORIGINS", "*")
@@ -17,12 +31,21 @@ if allowed and allowed != "":
 else:
     origins = ["*"]
 
+# Ограничение конкурентности запросов к API: при перегрузке быстрый 503 с Retry-After.
+# Добавляется до CORS, чтобы CORS-заголовки были и на этих 503.
+app.add_middleware(AdmissionControlMiddleware, path_prefix="/api/dashboard")
+
+# Server-Timing по фазам запроса (очередь, кэш, пул, SQL, Python, сериализация); снаружи
+# admission control, чтобы ожидание в очереди тоже учитывалось
+app.add_middleware(RequestTimingMiddleware, path_prefix="/api")
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "Server-Timing", "Content-Disposition"],
 )
 
 # === Prometheus metrics ===
@@ -34,15 +57,47 @@ Instrumentator().instrument(app).expose(
 )
 
 
+@app.exception_handler(PoolError)
+@app.exception_handler(PoolTimeout)
+async def db_pool_exhausted(request: Request, exc: Exception):
+    # Не дождались соединения из пула — это перегрузка, а не ошибка сервера
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, retry later"},
+        headers={"Retry-After": os.environ.get("ADMISSION_RETRY_AFTER", "1")},
+    )
+
+
+@app.exception_handler(QueryCanceledError)
+@app.exception_handler(pg_errors.QueryCanceled)
+async def db_statement_timeout(request: Request, exc: Exception):
+    # Запрос превысил statement_timeout эндпойнта
+    return JSONResponse(status_code=504, content={"detail": "Database query timed out"})
+
+
+@app.exception_handler(db.QueryCancelled)
+async def db_query_cancelled(request: Request, exc: Exception):
+    # Клиент уже отключился, ответ никто не прочитает (499 — как в nginx)
+    return Response(status_code=499)
+
+
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     dsn = os.environ.get("DB_DSN")
     if dsn:
         db.init_db(dsn)
+        # DB_ASYNC=1 включает асинхронный пул и нативные async-обработчики
+        if db.async_requested():
+            await db.init_async_db(dsn)
+        # Один фоновый watcher на процесс следит за last_loaded и сбрасывает кэши
+        data_version.start_watcher(dsn)
 
 
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
+    data_version.stop_watcher()
+    reports.stop_workers()
+    await db.close_async_db()
     db.close_db()
 
 
@@ -0,0 +1,220 @@
+"""Application Prometheus metrics.
+
+Metrics are registered in the default ``prometheus_client`` registry, so they are
+served by the ``/metrics`` endpoint exposed by ``Instrumentator`` in ``main.py``
+next to the HTTP metrics.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# --- DB connection pool ---
+
+_POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_POOL_CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+DB_POOL_ACQUIRE_WAIT_SECONDS = Histogram(
+    "db_pool_acquire_wait_seconds",
+    "Time spent waiting for a connection from the DB pool",
+    buckets=_POOL_WAIT_BUCKETS,
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time a connection stays checked out of the DB pool",
+    buckets=_POOL_CHECKOUT_BUCKETS,
+)
+DB_POOL_ACQUIRE_TIMEOUTS = Counter(
+    "db_pool_acquire_timeouts",
+    "Connection requests that timed out waiting for the DB pool",
+)
+DB_POOL_CONNECTIONS_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "DB pool connections currently checked out",
+)
+DB_POOL_CONNECTIONS_IDLE = Gauge(
+    "db_pool_connections_idle",
+    "Open DB pool connections waiting to be checked out",
+)
+DB_POOL_WAITERS = Gauge(
+    "db_pool_waiters",
+    "Threads queued for a DB pool connection",
+)
+DB_POOL_MAX_CONNECTIONS = Gauge(
+    "db_pool_max_connections",
+    "Configured DB pool size (DB_POOL_MAX)",
+)
+
+# --- Queries ---
+
+_QUERY_SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_QUERY_ROWS_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+_QUERY_BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds",
+    "Query execution time (including fetch) per repository function",
+    ["function"],
+    buckets=_QUERY_SECONDS_BUCKETS,
+)
+DB_QUERY_ROWS = Histogram(
+    "db_query_rows",
+    "Rows returned per query, per repository function",
+    ["function"],
+    buckets=_QUERY_ROWS_BUCKETS,
+)
+DB_QUERY_RESULT_BYTES = Histogram(
+    "db_query_result_bytes",
+    "Approximate result size per query, per repository function",
+    ["function"],
+    buckets=_QUERY_BYTES_BUCKETS,
+)
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries",
+    "Queries slower than the slow-query threshold, per repository function",
+    ["function"],
+)
+
+DB_QUERIES_INTERRUPTED = Counter(
+    "db_queries_interrupted",
+    "Queries cancelled for a disconnected client, skipped after it, or stopped by statement_timeout",
+    ["function", "reason"],
+)
+
+# --- Response cache ---
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests",
+    "API responses served from (hit) or added to (miss) the encoded response cache",
+    ["result"],
+)
+RESPONSE_CACHE_NOT_MODIFIED = Counter(
+    "response_cache_not_modified",
+    "Requests answered with 304 Not Modified via If-None-Match",
+)
+
+# --- Response compression ---
+
+_COMPRESSION_SECONDS_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+_COMPRESSION_RATIO_BUCKETS = (1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 15.0, 20.0, 30.0)
+
+RESPONSE_COMPRESSION_SECONDS = Histogram(
+    "response_compression_seconds",
+    "CPU time spent compressing a cached response variant",
+    ["encoding"],
+    buckets=_COMPRESSION_SECONDS_BUCKETS,
+)
+RESPONSE_COMPRESSION_RATIO = Histogram(
+    "response_compression_ratio",
+    "Raw size divided by compressed size of a cached response variant",
+    ["encoding"],
+    buckets=_COMPRESSION_RATIO_BUCKETS,
+)
+RESPONSE_ENCODING_RESPONSES = Counter(
+    "response_encoding_responses",
+    "Cached API responses sent, by Content-Encoding (identity when uncompressed)",
+    ["encoding"],
+)
+
+# --- Admission control ---
+
+_ADMISSION_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Requests waiting for admission",
+    ["route_class"],
+)
+ADMISSION_ACTIVE = Gauge(
+    "admission_active",
+    "Admitted requests currently running",
+    ["route_class"],
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds",
+    "Time a request waited for admission",
+    ["route_class"],
+    buckets=_ADMISSION_WAIT_BUCKETS,
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected",
+    "Requests rejected with 503 by admission control",
+    ["route_class", "reason"],
+)
+
+# --- Materialized view refresh ---
+
+_MV_REFRESH_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 1800.0)
+
+MV_REFRESH_SECONDS = Histogram(
+    "mv_refresh_seconds",
+    "Duration of REFRESH MATERIALIZED VIEW per view",
+    ["view"],
+    buckets=_MV_REFRESH_BUCKETS,
+)
+MV_REFRESH_RUNS = Counter(
+    "mv_refresh_runs",
+    "Materialized view refresh runs by result (ok, failed, busy)",
+    ["result"],
+)
+CACHE_PREWARM_SECONDS = Histogram(
+    "cache_prewarm_seconds",
+    "Time to rebuild the dashboard caches of the latest months after a data version change",
+    buckets=_MV_REFRESH_BUCKETS,
+)
+
+# --- Incremental aggregates ---
+
+_AGGREGATE_UPDATE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 1200.0)
+
+AGGREGATE_UPDATE_SECONDS = Histogram(
+    "aggregate_update_seconds",
+    "Time to recompute the touched keys of an aggregate table",
+    ["table"],
+    buckets=_AGGREGATE_UPDATE_BUCKETS,
+)
+AGGREGATE_UPDATE_ROWS = Counter(
+    "aggregate_update_rows",
+    "Rows deleted and inserted by incremental aggregate updates",
+    ["table", "op"],
+)
+AGGREGATE_UPDATE_RUNS = Counter(
+    "aggregate_update_runs",
+    "Incremental aggregate update runs by result (ok, empty, failed)",
+    ["result"],
+)
+
+# --- SKPDI ingestion ---
+
+SKPDI_INGEST_FILES = Counter(
+    "skpdi_ingest_files",
+    "SKPDI report files by result (loaded, unchanged)",
+    ["result"],
+)
+SKPDI_INGEST_ROWS = Counter(
+    "skpdi_ingest_rows",
+    "SKPDI report rows by result (staged, rejected, inserted, replaced)",
+    ["result"],
+)
+SKPDI_INGEST_ROWS_PER_SECOND = Gauge(
+    "skpdi_ingest_rows_per_second",
+    "Parse and COPY throughput of the last SKPDI ingestion run",
+)
+
+# --- PDF reports ---
+
+_REPORT_RENDER_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+REPORT_RENDER_SECONDS = Histogram(
+    "report_render_seconds",
+    "Time to build a monthly PDF report by phase (data, pdf)",
+    ["phase"],
+    buckets=_REPORT_RENDER_BUCKETS,
+)
+REPORT_QUEUE_DEPTH = Gauge(
+    "report_queue_depth",
+    "Report jobs waiting for a render worker",
+)
+REPORT_JOBS = Counter(
+    "report_jobs",
+    "Monthly report requests by result (rendered, stored, failed, rejected)",
+    ["result"],
+)
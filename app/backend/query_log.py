@@ -0,0 +1,188 @@
+"""Per-query instrumentation of the DB layer: metrics, slow-query log and EXPLAIN capture.
+
+``db.query``/``db.aquery`` report every query here, tagged with the calling repository
+function (``dashboard_repo.get_month_summary_bundle``...):
+
+- ``db_query_seconds``, ``db_query_rows`` and ``db_query_result_bytes`` histograms per
+  function on ``/metrics`` (result bytes are approximate: the length of text values plus
+  8 bytes per other value, including values nested in JSON columns);
+- queries slower than the threshold are written to the ``app.backend.slow_queries``
+  logger as one JSON object (function, duration, rows, SQL, parameters), also passed as
+  ``extra={"slow_query": ...}`` for structured log handlers;
+- optionally the slow query is re-run as ``EXPLAIN (ANALYZE, BUFFERS)`` in a background
+  thread on its own connection and the plan is logged too, at most once per function
+  per ``explain_interval_s``.
+
+Settings come from the environment (``DB_QUERY_METRICS``, default on;
+``DB_SLOW_QUERY_MS``, default 500, ``0`` disables the log; ``DB_SLOW_QUERY_EXPLAIN``,
+default off) and can be changed at runtime, in every worker, through the JSON file named
+by ``QUERY_LOG_CONFIG``, e.g. ``{"slow_ms": 200, "explain": true}``. The file is checked
+for changes at most once per second; removing it restores the environment values.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable, List, Optional, Sequence
+
+from app.backend import metrics
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger("app.backend.slow_queries")
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class QueryLogSettings:
+    metrics: bool = True
+    slow_ms: float = 500.0
+    explain: bool = False
+    explain_interval_s: float = 60.0
+    explain_timeout_ms: int = 30000
+
+    @classmethod
+    def from_env(cls) -> "QueryLogSettings":
+        env_slow = os.environ.get("DB_SLOW_QUERY_MS")
+        return cls(
+            metrics=_env_flag("DB_QUERY_METRICS", True),
+            slow_ms=float(env_slow) if env_slow else 500.0,
+            explain=_env_flag("DB_SLOW_QUERY_EXPLAIN", False),
+        )
+
+
+class _SettingsSource:
+    """Environment settings overridden by the ``QUERY_LOG_CONFIG`` file, reloaded on change."""
+
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self):
+        self._settings = QueryLogSettings.from_env()
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> QueryLogSettings:
+        path = os.environ.get("QUERY_LOG_CONFIG")
+        if not path:
+            return self._settings
+        now = time.monotonic()
+        if now - self._checked_at < self.CHECK_INTERVAL:
+            return self._settings
+        with self._lock:
+            if now - self._checked_at >= self.CHECK_INTERVAL:
+                self._checked_at = now
+                self._reload(path)
+        return self._settings
+
+    def _reload(self, path: str):
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        settings = QueryLogSettings.from_env()
+        if mtime is not None:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    overrides = json.load(f)
+                fields = QueryLogSettings.__dataclass_fields__
+                settings = replace(settings, **{k: v for k, v in overrides.items() if k in fields})
+            except (OSError, ValueError, TypeError) as exc:
+                logger.warning("Ignoring invalid QUERY_LOG_CONFIG %s: %s", path, exc)
+        if settings != self._settings:
+            logger.info("Query log settings: %s", settings)
+        self._settings = settings
+
+
+_source = _SettingsSource()
+
+
+def settings() -> QueryLogSettings:
+    return _source.get()
+
+
+def _value_bytes(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(k) + _value_bytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_value_bytes(v) for v in value)
+    return 8
+
+
+def result_bytes(rows: Sequence[dict]) -> int:
+    """Approximate size of a result set (see the module docstring)."""
+    return sum(_value_bytes(v) for row in rows for v in row.values())
+
+
+_last_explain: dict = {}  # function -> monotonic time of the last EXPLAIN
+_explain_lock = threading.Lock()
+
+
+def _should_explain(label: str, interval: float) -> bool:
+    now = time.monotonic()
+    with _explain_lock:
+        last = _last_explain.get(label)
+        if last is not None and now - last < interval:
+            return False
+        _last_explain[label] = now
+        return True
+
+
+def _log_plan(label: str, sql: str, params: Sequence, explain: Callable[[str, Sequence, int], List[str]], timeout_ms: int):
+    try:
+        plan = explain(sql, params, timeout_ms)
+    except Exception as exc:  # noqa: BLE001 - diagnostics must never fail a request
+        slow_logger.warning("EXPLAIN failed for %s: %s", label, exc)
+        return
+    record = {"event": "slow_query_plan", "function": label, "plan": "\n".join(plan)}
+    slow_logger.warning(json.dumps(record, ensure_ascii=False), extra={"slow_query": record})
+
+
+def observe(
+    label: str,
+    sql: str,
+    params: Sequence,
+    duration: float,
+    rows: Sequence[dict],
+    explain: Optional[Callable[[str, Sequence, int], List[str]]] = None,
+):
+    """Record one successful query of repository function ``label``."""
+    current = settings()
+    if current.metrics:
+        metrics.DB_QUERY_SECONDS.labels(function=label).observe(duration)
+        metrics.DB_QUERY_ROWS.labels(function=label).observe(len(rows))
+        metrics.DB_QUERY_RESULT_BYTES.labels(function=label).observe(result_bytes(rows))
+    if current.slow_ms <= 0 or duration * 1000 < current.slow_ms:
+        return
+    metrics.DB_SLOW_QUERIES.labels(function=label).inc()
+    record = {
+        "event": "slow_query",
+        "function": label,
+        "duration_ms": round(duration * 1000, 1),
+        "rows": len(rows),
+        "sql": " ".join(sql.split()),
+        "params": [str(p) if not isinstance(p, (int, float, str, list, type(None))) else p for p in params],
+    }
+    slow_logger.warning(json.dumps(record, ensure_ascii=False, default=str), extra={"slow_query": record})
+    if current.explain and explain is not None and _should_explain(label, current.explain_interval_s):
+        threading.Thread(
+            target=_log_plan,
+            args=(label, sql, params, explain, current.explain_timeout_ms),
+            name="slow-query-explain",
+            daemon=True,
+        ).start()
@@ -2,28 +2,71 @@ from typing import List, Optional, Sequence
 
 from app.backend import db
 
+# SQL statements are module-level constants so that the async repository
+# (dashboard_repo_async) runs exactly the same queries.
+
+
+MONTHS_FROM_PLAN_VS_FACT_MONTHLY_SQL = "SELECT DISTINCT to_char(month_start, 'YYYY-MM') AS month FROM mv_plan_vs_fact_monthly_ids ORDER BY month DESC"
+
 
 def get_months_from_plan_vs_fact_monthly() -> List[dict]:
-    return db.query(
-        "SELECT DISTINCT to_char(month_start, 'YYYY-MM') AS month FROM mv_plan_vs_fact_monthly_ids ORDER BY month DESC"
-    )
+    return db.query(MONTHS_FROM_PLAN_VS_FACT_MONTHLY_SQL)
+
+
+MONTHS_FROM_PLAN_FACT_BACKEND_SQL = "SELECT DISTINCT month_key AS month FROM mv_plan_fact_monthly_backend_ids ORDER BY month DESC"
 
 
 def get_months_from_plan_fact_backend() -> List[dict]:
-    return db.query(
-        "SELECT DISTINCT month_key AS month FROM mv_plan_fact_monthly_backend_ids ORDER BY month DESC"
-    )
+    return db.query(MONTHS_FROM_PLAN_FACT_BACKEND_SQL)
+
+
+MONTHS_FROM_FACT_WITH_MONEY_SQL = "SELECT DISTINCT to_char(date_done, 'YYYY-MM') AS month FROM mv_fact_daily_amounts WHERE id_status = 3 ORDER BY month DESC"
 
 
 def get_months_from_fact_with_money() -> List[dict]:
-    return db.query(
-        "SELECT DISTINCT to_char(date_done, 'YYYY-MM') AS month FROM mv_fact_daily_amounts WHERE id_status = 3 ORDER BY month DESC"
-    )
+    return db.query(MONTHS_FROM_FACT_WITH_MONEY_SQL)
+
+
+MONTHS_CATALOG_SQL = """
+    SELECT month_key AS month, has_plan, has_fact
+    FROM mv_months_catalog
+    ORDER BY month_key DESC
+    """
+
+
+def get_months_catalog() -> List[dict]:
+    """Return every month with plan/fact availability flags from ``mv_months_catalog``.
+
+    The catalog is rebuilt together with the other materialized views, so this is a
+    small index-ordered read instead of DISTINCT scans over the large MVs.
+    """
+    return db.query(MONTHS_CATALOG_SQL)
+
+
+PLAN_FACT_MONTH_SQL = """
+    SELECT month_key,
+           COALESCE(plan_leto, 0)::int AS plan_leto,
+           COALESCE(plan_zima, 0)::int AS plan_zima,
+           COALESCE(plan_vnereglament, 0)::int AS plan_vnereglament,
+           COALESCE(plan_total, 0)::int AS plan_total,
+           COALESCE(fact_leto, 0)::int AS fact_leto,
+           COALESCE(fact_zima, 0)::int AS fact_zima,
+           COALESCE(fact_vnereglament, 0)::int AS fact_vnereglament,
+           COALESCE(fact_total, 0)::int AS fact_total
+    FROM mv_plan_fact_monthly_backend_ids
+    WHERE month_key = %s
+    """
 
 
 def get_plan_fact_month(month_key: str) -> Optional[dict]:
     return db.query_one(
-        """
+        PLAN_FACT_MONTH_SQL,
+        (month_key,),
+    )
+
+
+MONTH_SUMMARY_BUNDLE_SQL = """
+    WITH plan_fact AS (
         SELECT month_key,
                COALESCE(plan_leto, 0)::int AS plan_leto,
                COALESCE(plan_zima, 0)::int AS plan_zima,
@@ -31,13 +74,56 @@ def get_plan_fact_month(month_key: str) -> Optional[dict]:
                COALESCE(plan_total, 0)::int AS plan_total,
                COALESCE(fact_leto, 0)::int AS fact_leto,
                COALESCE(fact_zima, 0)::int AS fact_zima,
-               COALESCE(fact_vnereglament, 0)::int AS fact_vnereglament,
+               fact_vnereglament,
                COALESCE(fact_total, 0)::int AS fact_total
         FROM mv_plan_fact_monthly_backend_ids
         WHERE month_key = %s
-        """,
-        (month_key,),
+    ),
+    contract AS (
+        SELECT CASE
+            WHEN DATE %s < DATE '2026-01-01' THEN COALESCE(
+                (SELECT SUM(contract_amount) FROM podolsk_mad_2025_contract_amount), 0
+            )::int
+            ELSE COALESCE(
+                (SELECT SUM(contract_amount) FROM podolsk_mad_2026_1sthalf_contract_amount), 0
+            )::int
+        END AS contract_amount
+    ),
+    total_fact AS (
+        SELECT COALESCE(SUM(fact_total), 0)::int AS fact_total_all_months
+        FROM mv_plan_fact_monthly_backend_ids
+    ),
+    vnereglament_fact AS (
+        SELECT COALESCE(SUM(fact_amount_done), 0)::int AS sum_fact_vnereglament
+        FROM mv_plan_vs_fact_monthly_ids
+        WHERE month_start >= DATE %s
+          AND month_start < DATE %s + INTERVAL '1 month'
+          AND id_smeta IN (3, 4)
+    ),
+    monthly_items AS (
+        SELECT COALESCE(json_agg(
+            json_build_object(
+                'month_start', to_char(month_start, 'YYYY-MM-DD'),
+                'smeta', smeta_code,
+                'work_name', description,
+                'planned_amount', planned_amount,
+                'fact_amount', fact_amount_done
+            ) ORDER BY planned_amount DESC
+        ), '[]'::json) AS items
+        FROM mv_plan_vs_fact_monthly_ids
+        WHERE month_start >= DATE %s
+          AND month_start < DATE %s + INTERVAL '1 month'
     )
+    SELECT pf.month_key, pf.plan_leto, pf.plan_zima, pf.plan_vnereglament, pf.plan_total,
+           pf.fact_leto, pf.fact_zima, pf.fact_vnereglament, pf.fact_total,
+           c.contract_amount, tf.fact_total_all_months, vf.sum_fact_vnereglament,
+           mi.items
+    FROM contract c
+    CROSS JOIN total_fact tf
+    CROSS JOIN vnereglament_fact vf
+    CROSS JOIN monthly_items mi
+    LEFT JOIN plan_fact pf ON TRUE
+    """
 
 
 def get_month_summary_bundle(month_key: str) -> Optional[dict]:
@@ -49,82 +135,41 @@ def get_month_summary_bundle(month_key: str) -> Optional[dict]:
     Returns items as JSON array to avoid separate get_monthly_items query.
     """
     return db.query_one(
-        """
-        WITH plan_fact AS (
-            SELECT month_key,
-                   COALESCE(plan_leto, 0)::int AS plan_leto,
-                   COALESCE(plan_zima, 0)::int AS plan_zima,
-                   COALESCE(plan_vnereglament, 0)::int AS plan_vnereglament,
-                   COALESCE(plan_total, 0)::int AS plan_total,
-                   COALESCE(fact_leto, 0)::int AS fact_leto,
-                   COALESCE(fact_zima, 0)::int AS fact_zima,
-                   fact_vnereglament,
-                   COALESCE(fact_total, 0)::int AS fact_total
-            FROM mv_plan_fact_monthly_backend_ids
-            WHERE month_key = %s
-        ),
-        contract AS (
-            SELECT CASE
-                WHEN DATE %s < DATE '2026-01-01' THEN COALESCE(
-                    (SELECT SUM(contract_amount) FROM podolsk_mad_2025_contract_amount), 0
-                )::int
-                ELSE COALESCE(
-                    (SELECT SUM(contract_amount) FROM podolsk_mad_2026_1sthalf_contract_amount), 0
-                )::int
-            END AS contract_amount
-        ),
-        total_fact AS (
-            SELECT COALESCE(SUM(fact_total), 0)::int AS fact_total_all_months
-            FROM mv_plan_fact_monthly_backend_ids
-        ),
-        vnereglament_fact AS (
-            SELECT COALESCE(SUM(fact_amount_done), 0)::int AS sum_fact_vnereglament
-            FROM mv_plan_vs_fact_monthly_ids
-            WHERE month_start >= DATE %s
-              AND month_start < DATE %s + INTERVAL '1 month'
-              AND id_smeta IN (3, 4)
-        ),
-        monthly_items AS (
-            SELECT COALESCE(json_agg(
-                json_build_object(
-                    'month_start', to_char(month_start, 'YYYY-MM-DD'),
-                    'smeta', smeta_code,
-                    'work_name', description,
-                    'planned_amount', planned_amount,
-                    'fact_amount', fact_amount_done
-                ) ORDER BY planned_amount DESC
-            ), '[]'::json) AS items
-            FROM mv_plan_vs_fact_monthly_ids
-            WHERE month_start >= DATE %s
-              AND month_start < DATE %s + INTERVAL '1 month'
-        )
-        SELECT pf.month_key, pf.plan_leto, pf.plan_zima, pf.plan_vnereglament, pf.plan_total,
-               pf.fact_leto, pf.fact_zima, pf.fact_vnereglament, pf.fact_total,
-               c.contract_amount, tf.fact_total_all_months, vf.sum_fact_vnereglament,
-               mi.items
-        FROM contract c
-        CROSS JOIN total_fact tf
-        CROSS JOIN vnereglament_fact vf
-        CROSS JOIN monthly_items mi
-        LEFT JOIN plan_fact pf ON TRUE
-        """,
+        MONTH_SUMMARY_BUNDLE_SQL,
         (month_key, month_key + '-01', month_key + '-01', month_key + '-01', month_key + '-01', month_key + '-01'),
     )
 
 
+SUM_FACT_VNEREGLAMENT_SQL = """
+    SELECT COALESCE(SUM(fact_amount_done),0)::int AS s
+    FROM mv_plan_vs_fact_monthly_ids
+    WHERE month_start >= DATE %s
+      AND month_start < DATE %s + INTERVAL '1 month'
+      AND id_smeta IN (3,4)
+    """
+
+
 def sum_fact_vnereglament(month_key: str) -> Optional[dict]:
     return db.query_one(
-        """
-        SELECT COALESCE(SUM(fact_amount_done),0)::int AS s
-        FROM mv_plan_vs_fact_monthly_ids
-        WHERE month_start >= DATE %s
-          AND month_start < DATE %s + INTERVAL '1 month'
-          AND id_smeta IN (3,4)
-        """,
+        SUM_FACT_VNEREGLAMENT_SQL,
         (month_key + '-01', month_key + '-01'),
     )
 
 
+CONTRACT_AMOUNT_BY_MONTH_SQL = """
+    SELECT CASE
+        WHEN DATE %s < DATE '2026-01-01' THEN COALESCE(
+            (SELECT SUM(contract_amount) FROM podolsk_mad_2025_contract_amount), 0
+        )::int
+        ELSE COALESCE(
+            (SELECT SUM(contract_amount) FROM podolsk_mad_2026_1sthalf_contract_amount), 0
+        )::int
+    END AS sum
+    """
+
+CONTRACT_AMOUNT_DEFAULT_SQL = "SELECT COALESCE(SUM(contract_amount),0)::int AS sum FROM podolsk_mad_2025_contract_amount"
+
+
 def get_contract_amount_sum(month_key: Optional[str] = None) -> Optional[dict]:
     """Return total contract amount choosing table by month.
 
@@ -132,22 +177,14 @@ def get_contract_amount_sum(month_key: Optional[str] = None) -> Optional[dict]:
     """
     if month_key:
         return db.query_one(
-            """
-            SELECT CASE
-                WHEN DATE %s < DATE '2026-01-01' THEN COALESCE(
-                    (SELECT SUM(contract_amount) FROM podolsk_mad_2025_contract_amount), 0
-                )::int
-                ELSE COALESCE(
-                    (SELECT SUM(contract_amount) FROM podolsk_mad_2026_1sthalf_contract_amount), 0
-                )::int
-            END AS sum
-            """,
+            CONTRACT_AMOUNT_BY_MONTH_SQL,
             (month_key + '-01',),
         )
     # Fallback: default to 2025 table if no month provided
-    return db.query_one(
-        "SELECT COALESCE(SUM(contract_amount),0)::int AS sum FROM podolsk_mad_2025_contract_amount"
-    )
+    return db.query_one(CONTRACT_AMOUNT_DEFAULT_SQL)
+
+
+TOTAL_FACT_AMOUNT_SQL = "SELECT COALESCE(SUM(fact_total),0)::int AS sum FROM mv_plan_fact_monthly_backend_ids"
 
 
 def get_total_fact_amount() -> Optional[dict]:
@@ -155,29 +192,80 @@ def get_total_fact_amount() -> Optional[dict]:
 
     Uses the plan_fact backend table which contains monthly fact_total values.
     """
-    return db.query_one("SELECT COALESCE(SUM(fact_total),0)::int AS sum FROM mv_plan_fact_monthly_backend_ids")
+    return db.query_one(TOTAL_FACT_AMOUNT_SQL)
+
+
+MONTHLY_ITEMS_SQL = """
+    SELECT to_char(month_start, 'YYYY-MM-DD') AS month_start, smeta_code AS smeta, description AS work_name, planned_amount, fact_amount_done AS fact_amount
+    FROM mv_plan_vs_fact_monthly_ids
+    WHERE month_start >= DATE %s
+      AND month_start < DATE %s + INTERVAL '1 month'
+    ORDER BY planned_amount DESC
+    """
 
 
 def get_monthly_items(month_key: str) -> List[dict]:
     return db.query(
-        """
-        SELECT to_char(month_start, 'YYYY-MM-DD') AS month_start, smeta_code AS smeta, description AS work_name, planned_amount, fact_amount_done AS fact_amount
+        MONTHLY_ITEMS_SQL,
+        (month_key + '-01', month_key + '-01'),
+    )
+
+
+LAST_LOADED_SQL = """
+    SELECT last_loaded AS loaded_at
+    FROM last_loaded
+    LIMIT 1
+    """
+
+
+def get_last_loaded_row() -> Optional[dict]:
+    return db.query_one(LAST_LOADED_SQL)
+
+
+PLAN_FACT_ROWS_BY_SMETA_SQL = """
+    WITH monthly AS (
+        SELECT description, id_smeta, planned_amount, fact_amount_done
         FROM mv_plan_vs_fact_monthly_ids
         WHERE month_start >= DATE %s
           AND month_start < DATE %s + INTERVAL '1 month'
-        ORDER BY planned_amount DESC
-        """,
-        (month_key + '-01', month_key + '-01'),
+          AND id_smeta = ANY(%s)
+    ),
+    plan_rows AS (
+        SELECT description, COALESCE(SUM(planned_amount), 0)::int AS plan
+        FROM monthly
+        WHERE %s IS NOT NULL AND id_smeta = %s
+        GROUP BY description
+    ),
+    fact_rows AS (
+        SELECT description, COALESCE(SUM(fact_amount_done), 0)::int AS fact
+        FROM monthly
+        WHERE id_smeta = ANY(%s)
+        GROUP BY description
     )
+    SELECT
+        COALESCE(p.description, f.description) AS description,
+        COALESCE(p.plan, 0) AS plan,
+        COALESCE(f.fact, 0) AS fact
+    FROM plan_rows p
+    FULL JOIN fact_rows f
+        ON p.description = f.description
+    """
 
 
-def get_last_loaded_row() -> Optional[dict]:
-    return db.query_one(
-        """
-        SELECT last_loaded AS loaded_at
-        FROM last_loaded
-        LIMIT 1
-        """
+def plan_fact_rows_by_smeta_params(month_key: str, plan_smeta_id: Optional[int], smeta_ids: Sequence[int]) -> tuple:
+    """Build query parameters for ``PLAN_FACT_ROWS_BY_SMETA_SQL``."""
+    month_start = month_key + '-01'
+    smeta_ids_for_monthly = list(smeta_ids)
+    if plan_smeta_id and plan_smeta_id not in smeta_ids_for_monthly:
+        smeta_ids_for_monthly.append(plan_smeta_id)
+
+    return (
+        month_start,
+        month_start,
+        smeta_ids_for_monthly,
+        plan_smeta_id,
+        plan_smeta_id,
+        list(smeta_ids),
     )
 
 
@@ -189,145 +277,288 @@ def get_plan_fact_rows_by_smeta(month_key: str, plan_smeta_id: Optional[int], sm
     approach used in ``get_smeta_details_with_type_of_work``.
     """
 
-    month_start = month_key + '-01'
-    smeta_ids_for_monthly = list(smeta_ids)
-    if plan_smeta_id and plan_smeta_id not in smeta_ids_for_monthly:
-        smeta_ids_for_monthly.append(plan_smeta_id)
+    return db.query(PLAN_FACT_ROWS_BY_SMETA_SQL, plan_fact_rows_by_smeta_params(month_key, plan_smeta_id, smeta_ids))
+
+
+MONTH_PLAN_FACT_DETAILS_SQL = """
+    SELECT id_smeta, description, type_of_work,
+           COALESCE(SUM(planned_amount), 0) AS plan,
+           COALESCE(SUM(fact_amount_done), 0) AS fact
+    FROM mv_plan_vs_fact_monthly_ids
+    WHERE month_start >= DATE %s
+      AND month_start < DATE %s + INTERVAL '1 month'
+      AND id_smeta = ANY(%s)
+    GROUP BY id_smeta, description, type_of_work
+    """
+
+
+def get_month_plan_fact_details(month_key: str, smeta_ids: Sequence[int]) -> List[dict]:
+    """Return unrounded plan/fact sums per (id_smeta, description, type_of_work) for the month.
 
+    One pass over ``mv_plan_vs_fact_monthly_ids`` that covers the smeta details of every
+    smeta on the monthly page.
+    """
     return db.query(
-        """
-        WITH monthly AS (
-            SELECT description, id_smeta, planned_amount, fact_amount_done
-            FROM mv_plan_vs_fact_monthly_ids
-            WHERE month_start >= DATE %s
-              AND month_start < DATE %s + INTERVAL '1 month'
-              AND id_smeta = ANY(%s)
-        ),
-        plan_rows AS (
-            SELECT description, COALESCE(SUM(planned_amount), 0)::int AS plan
-            FROM monthly
-            WHERE %s IS NOT NULL AND id_smeta = %s
-            GROUP BY description
-        ),
-        fact_rows AS (
-            SELECT description, COALESCE(SUM(fact_amount_done), 0)::int AS fact
-            FROM monthly
-            WHERE id_smeta = ANY(%s)
-            GROUP BY description
-        )
-        SELECT
-            COALESCE(p.description, f.description) AS description,
-            COALESCE(p.plan, 0) AS plan,
-            COALESCE(f.fact, 0) AS fact
-        FROM plan_rows p
-        FULL JOIN fact_rows f
-            ON p.description = f.description
-        """,
-        (
-            month_start,
-            month_start,
-            smeta_ids_for_monthly,
-            plan_smeta_id,
-            plan_smeta_id,
-            list(smeta_ids),
-        ),
+        MONTH_PLAN_FACT_DETAILS_SQL,
+        (month_key + '-01', month_key + '-01', list(smeta_ids)),
     )
 
 
+MONTH_FACT_BREAKDOWN_SQL = """
+    SELECT
+        CASE
+            WHEN GROUPING(date_done) = 0 THEN 'date'
+            WHEN GROUPING(id_smeta) = 0 THEN 'smeta'
+            ELSE 'type_of_work'
+        END AS breakdown,
+        to_char(date_done, 'YYYY-MM-DD') AS date,
+        id_smeta,
+        description,
+        type_of_work,
+        COALESCE(SUM(total_amount), 0) AS amount
+    FROM mv_fact_daily_amounts
+    WHERE date_done >= DATE %s
+      AND date_done < DATE %s + INTERVAL '1 month'
+      AND id_status = 3
+    GROUP BY GROUPING SETS ((date_done), (type_of_work), (id_smeta, description, type_of_work))
+    """
+
+
+def get_month_fact_breakdown(month_key: str) -> List[dict]:
+    """Return the month's reviewed fact (id_status=3) grouped three ways in one pass.
+
+    ``breakdown`` tells the grouping set of each row: ``date`` (daily revenue),
+    ``type_of_work`` (fact by type of work) or ``smeta`` (per id_smeta, description
+    and type_of_work). Amounts are left unrounded.
+    """
+    return db.query(
+        MONTH_FACT_BREAKDOWN_SQL,
+        (month_key + '-01', month_key + '-01'),
+    )
+
+
+MONTH_FACT_SLICE_SQL = """
+    SELECT date_done, id_smeta, id_description, description, type_of_work, unit, total_volume, total_amount
+    FROM mv_fact_daily_amounts
+    WHERE date_done >= DATE %s
+      AND date_done < DATE %s + INTERVAL '1 month'
+      AND id_status = 3
+    """
+
+
+def get_month_fact_slice(month_key: str) -> List[dict]:
+    """Return the month's raw reviewed fact rows (id_status=3) for the in-memory month cube."""
+    return db.query(
+        MONTH_FACT_SLICE_SQL,
+        (month_key + '-01', month_key + '-01'),
+    )
+
+
+DESCRIPTION_DAILY_ROWS_SQL = """
+    SELECT to_char(date_done, 'YYYY-MM-DD') AS date, COALESCE(SUM(total_volume),0)::int AS volume,
+           MIN(unit) AS unit, COALESCE(SUM(total_amount),0)::int AS amount
+    FROM mv_fact_daily_amounts
+    WHERE date_done >= DATE %s
+      AND date_done < DATE %s + INTERVAL '1 month'
+      AND id_status=3
+      AND description=%s
+      AND id_smeta = ANY(%s)
+    GROUP BY date_done
+    ORDER BY date_done
+    """
+
+
 def get_description_daily_rows(month_key: str, description: str, smeta_ids: Sequence[int]) -> List[dict]:
     return db.query(
-        """
-        SELECT to_char(date_done, 'YYYY-MM-DD') AS date, COALESCE(SUM(total_volume),0)::int AS volume,
-               MIN(unit) AS unit, COALESCE(SUM(total_amount),0)::int AS amount
-        FROM mv_fact_daily_amounts
-        WHERE date_done >= DATE %s
-          AND date_done < DATE %s + INTERVAL '1 month'
-          AND id_status=3
-          AND description=%s
-          AND id_smeta = ANY(%s)
-        GROUP BY date_done
-        ORDER BY date_done
-        """,
+        DESCRIPTION_DAILY_ROWS_SQL,
         (month_key + '-01', month_key + '-01', description, list(smeta_ids)),
     )
 
 
+DESCRIPTION_DAILY_ROWS_BY_IDS_SQL = """
+    SELECT to_char(date_done, 'YYYY-MM-DD') AS date, COALESCE(SUM(total_volume),0)::int AS volume,
+           MIN(unit) AS unit, COALESCE(SUM(total_amount),0)::int AS amount
+    FROM mv_fact_daily_amounts
+    WHERE date_done >= DATE %s
+      AND date_done < DATE %s + INTERVAL '1 month'
+      AND id_status=3
+      AND id_description = ANY(%s)
+      AND id_smeta = ANY(%s)
+    GROUP BY date_done
+    ORDER BY date_done
+    """
+
+
+def get_description_daily_rows_by_ids(month_key: str, description_ids: Sequence[int], smeta_ids: Sequence[int]) -> List[dict]:
+    """Same as ``get_description_daily_rows`` but filtered on the integer ``id_description``."""
+    return db.query(
+        DESCRIPTION_DAILY_ROWS_BY_IDS_SQL,
+        (month_key + '-01', month_key + '-01', list(description_ids), list(smeta_ids)),
+    )
+
+
+WORK_DESCRIPTIONS_SQL = "SELECT id_description, description FROM work_description"
+
+
+def get_work_descriptions() -> List[dict]:
+    return db.query(WORK_DESCRIPTIONS_SQL)
+
+
+MONTHLY_DAILY_REVENUE_SQL = """
+    SELECT to_char(date_done, 'YYYY-MM-DD') AS date, COALESCE(SUM(total_amount),0)::int AS amount
+    FROM mv_fact_daily_amounts
+    WHERE date_done >= DATE %s
+      AND date_done < DATE %s + INTERVAL '1 month'
+      AND id_status=3
+    GROUP BY date_done
+    ORDER BY date_done
+    """
+
+
 def get_monthly_daily_revenue_rows(month_key: str) -> List[dict]:
     return db.query(
-        """
-        SELECT to_char(date_done, 'YYYY-MM-DD') AS date, COALESCE(SUM(total_amount),0)::int AS amount
-        FROM mv_fact_daily_amounts
-        WHERE date_done >= DATE %s
-          AND date_done < DATE %s + INTERVAL '1 month'
-          AND id_status=3
-        GROUP BY date_done
-        ORDER BY date_done
-        """,
+        MONTHLY_DAILY_REVENUE_SQL,
         (month_key + '-01', month_key + '-01'),
     )
 
 
+DAILY_ROWS_SQL = """
+    SELECT description, MIN(unit) AS unit, COALESCE(SUM(total_volume),0)::int AS volume, COALESCE(SUM(total_amount),0)::int AS amount
+    FROM mv_fact_daily_amounts
+    WHERE date_done = DATE %s
+      AND id_status=3
+    GROUP BY description
+    ORDER BY description
+    """
+
+
 def get_daily_rows(date_value: str) -> List[dict]:
     return db.query(
-        """
-        SELECT description, MIN(unit) AS unit, COALESCE(SUM(total_volume),0)::int AS volume, COALESCE(SUM(total_amount),0)::int AS amount
-        FROM mv_fact_daily_amounts
-        WHERE date_done = DATE %s
-          AND id_status=3
-        GROUP BY description
-        ORDER BY description
-        """,
+        DAILY_ROWS_SQL,
         (date_value,),
     )
 
 
+DAILY_TOTAL_SQL = """
+    SELECT COALESCE(SUM(total_amount),0)::int AS total
+    FROM mv_fact_daily_amounts
+    WHERE date_done = DATE %s
+      AND id_status=3
+    """
+
+
 def get_daily_total(date_value: str) -> Optional[dict]:
     return db.query_one(
-        """
-        SELECT COALESCE(SUM(total_amount),0)::int AS total
-        FROM mv_fact_daily_amounts
-        WHERE date_done = DATE %s
-          AND id_status=3
-        """,
+        DAILY_TOTAL_SQL,
         (date_value,),
     )
 
 
+MONTHLY_DATES_SQL = """
+    SELECT DISTINCT to_char(date_done, 'YYYY-MM-DD') AS date
+    FROM mv_fact_daily_amounts
+    WHERE date_done >= DATE %s
+      AND date_done < DATE %s + INTERVAL '1 month'
+      AND id_status=3
+    ORDER BY date
+    """
+
+
 def get_monthly_dates(month_key: str) -> List[str]:
     """Return list of distinct YYYY-MM-DD dates in the given month from fact_with_money (id_status=3)."""
     rows = db.query(
-        """
-        SELECT DISTINCT to_char(date_done, 'YYYY-MM-DD') AS date
-        FROM mv_fact_daily_amounts
-        WHERE date_done >= DATE %s
-          AND date_done < DATE %s + INTERVAL '1 month'
-          AND id_status=3
-        ORDER BY date
-        """,
+        MONTHLY_DATES_SQL,
         (month_key + '-01', month_key + '-01'),
     )
     return [r.get('date') for r in rows] if rows else []
 
 
+CATALOG_MONTHLY_DATES_SQL = """
+    SELECT to_char(date_done, 'YYYY-MM-DD') AS date
+    FROM mv_fact_dates_catalog
+    WHERE month_start = DATE %s
+    ORDER BY date_done
+    """
+
+
+def get_monthly_dates_from_catalog(month_key: str) -> List[str]:
+    """Return the month's dates with reviewed fact (id_status=3) from ``mv_fact_dates_catalog``."""
+    rows = db.query(CATALOG_MONTHLY_DATES_SQL, (month_key + '-01',))
+    return [r.get('date') for r in rows] if rows else []
+
+
+FACT_BY_TYPE_OF_WORK_SQL = """
+    SELECT
+        COALESCE(f.type_of_work, 'Не указано') AS type_of_work,
+        COALESCE(SUM(f.total_amount), 0)::int AS amount
+    FROM mv_fact_daily_amounts f
+    WHERE f.date_done >= DATE %s
+      AND f.date_done < DATE %s + INTERVAL '1 month'
+      AND f.id_status = 3
+    GROUP BY f.type_of_work
+    ORDER BY amount DESC
+    """
+
+
 def get_fact_by_type_of_work(month_key: str) -> List[dict]:
     """Return aggregated fact amounts by type_of_work for the given month.
 
     Joins mv_fact_daily_amounts, which already contains type_of_work resolved from dimensions.
     """
     return db.query(
-        """
+        FACT_BY_TYPE_OF_WORK_SQL,
+        (month_key + '-01', month_key + '-01'),
+    )
+
+
+SMETA_DETAILS_WITH_TYPE_OF_WORK_SQL = """
+    WITH plan_with_type AS (
+        SELECT
+            p.smeta_code,
+            p.id_smeta,
+            p.description,
+            p.type_of_work,
+            COALESCE(SUM(p.planned_amount), 0)::int AS plan
+        FROM mv_plan_vs_fact_monthly_ids p
+        WHERE p.month_start >= DATE %s
+          AND p.month_start < DATE %s + INTERVAL '1 month'
+          AND p.id_smeta = ANY(%s)
+        GROUP BY p.smeta_code, p.id_smeta, p.description, p.type_of_work
+    ),
+    fact_with_type AS (
         SELECT
-            COALESCE(f.type_of_work, 'Не указано') AS type_of_work,
-            COALESCE(SUM(f.total_amount), 0)::int AS amount
+            f.smeta_code,
+            f.id_smeta,
+            f.description,
+            f.type_of_work,
+            COALESCE(SUM(f.total_amount), 0)::int AS fact
         FROM mv_fact_daily_amounts f
         WHERE f.date_done >= DATE %s
           AND f.date_done < DATE %s + INTERVAL '1 month'
           AND f.id_status = 3
-        GROUP BY f.type_of_work
-        ORDER BY amount DESC
-        """,
-        (month_key + '-01', month_key + '-01'),
+          AND f.id_smeta = ANY(%s)
+        GROUP BY f.smeta_code, f.id_smeta, f.description, f.type_of_work
+    ),
+    combined AS (
+        SELECT
+            COALESCE(p.type_of_work, f.type_of_work) AS type_of_work,
+            COALESCE(p.description, f.description) AS description,
+            COALESCE(p.plan, 0) AS plan,
+            COALESCE(f.fact, 0) AS fact
+        FROM plan_with_type p
+        FULL OUTER JOIN fact_with_type f
+            ON p.id_smeta = f.id_smeta
+            AND p.description = f.description
     )
+    SELECT 
+        type_of_work,
+        description,
+        plan,
+        fact
+    FROM combined
+    WHERE plan > 1 OR fact > 1
+    ORDER BY type_of_work NULLS LAST, fact DESC
+    """
 
 
 def get_smeta_details_with_type_of_work(month_key: str, smeta_ids: Sequence[int]) -> List[dict]:
@@ -338,53 +569,184 @@ def get_smeta_details_with_type_of_work(month_key: str, smeta_ids: Sequence[int]
     """
     month_start = month_key + '-01'
     return db.query(
-        """
-        WITH plan_with_type AS (
-            SELECT
-                p.smeta_code,
-                p.id_smeta,
-                p.description,
-                p.type_of_work,
-                COALESCE(SUM(p.planned_amount), 0)::int AS plan
-            FROM mv_plan_vs_fact_monthly_ids p
-            WHERE p.month_start >= DATE %s
-              AND p.month_start < DATE %s + INTERVAL '1 month'
-              AND p.id_smeta = ANY(%s)
-            GROUP BY p.smeta_code, p.id_smeta, p.description, p.type_of_work
-        ),
-        fact_with_type AS (
-            SELECT
-                f.smeta_code,
-                f.id_smeta,
-                f.description,
-                f.type_of_work,
-                COALESCE(SUM(f.total_amount), 0)::int AS fact
-            FROM mv_fact_daily_amounts f
-            WHERE f.date_done >= DATE %s
-              AND f.date_done < DATE %s + INTERVAL '1 month'
-              AND f.id_status = 3
-              AND f.id_smeta = ANY(%s)
-            GROUP BY f.smeta_code, f.id_smeta, f.description, f.type_of_work
-        ),
-        combined AS (
-            SELECT
-                COALESCE(p.type_of_work, f.type_of_work) AS type_of_work,
-                COALESCE(p.description, f.description) AS description,
-                COALESCE(p.plan, 0) AS plan,
-                COALESCE(f.fact, 0) AS fact
-            FROM plan_with_type p
-            FULL OUTER JOIN fact_with_type f
-                ON p.id_smeta = f.id_smeta
-                AND p.description = f.description
-        )
-        SELECT 
-            type_of_work,
-            description,
-            plan,
-            fact
-        FROM combined
-        WHERE plan > 1 OR fact > 1
-        ORDER BY type_of_work NULLS LAST, fact DESC
-        """,
+        SMETA_DETAILS_WITH_TYPE_OF_WORK_SQL,
         (month_start, month_start, list(smeta_ids), month_start, month_start, list(smeta_ids)),
     )
+
+
+# --- Month ranges ---
+
+RANGE_PLAN_FACT_SQL = """
+    WITH range_months AS (
+        SELECT to_char(m, 'YYYY-MM') AS month_key
+        FROM generate_series(DATE %s, DATE %s, INTERVAL '1 month') AS m
+    ),
+    fact_before AS (
+        SELECT COALESCE(SUM(fact_total), 0)::bigint AS fact_total
+        FROM mv_plan_fact_monthly_backend_ids
+        WHERE month_key < %s
+    ),
+    vnereglament_fact AS (
+        SELECT to_char(month_start, 'YYYY-MM') AS month_key,
+               COALESCE(SUM(fact_amount_done), 0)::int AS sum_fact_vnereglament
+        FROM mv_plan_vs_fact_monthly_ids
+        WHERE month_start >= DATE %s
+          AND month_start < DATE %s + INTERVAL '1 month'
+          AND id_smeta IN (3, 4)
+        GROUP BY month_start
+    ),
+    contract AS (
+        SELECT COALESCE((SELECT SUM(contract_amount) FROM podolsk_mad_2025_contract_amount), 0)::int AS contract_2025,
+               COALESCE((SELECT SUM(contract_amount) FROM podolsk_mad_2026_1sthalf_contract_amount), 0)::int AS contract_2026
+    )
+    SELECT r.month_key,
+           COALESCE(pf.plan_leto, 0)::int AS plan_leto,
+           COALESCE(pf.plan_zima, 0)::int AS plan_zima,
+           COALESCE(pf.plan_vnereglament, 0)::int AS plan_vnereglament,
+           COALESCE(pf.plan_total, 0)::int AS plan_total,
+           COALESCE(pf.fact_leto, 0)::int AS fact_leto,
+           COALESCE(pf.fact_zima, 0)::int AS fact_zima,
+           pf.fact_vnereglament,
+           COALESCE(pf.fact_total, 0)::int AS fact_total,
+           COALESCE(vf.sum_fact_vnereglament, 0) AS sum_fact_vnereglament,
+           CASE WHEN r.month_key < '2026-01' THEN c.contract_2025 ELSE c.contract_2026 END AS contract_amount,
+           (fb.fact_total + SUM(COALESCE(pf.fact_total, 0)) OVER (ORDER BY r.month_key))::bigint AS fact_cumulative
+    FROM range_months r
+    LEFT JOIN mv_plan_fact_monthly_backend_ids pf ON pf.month_key = r.month_key
+    LEFT JOIN vnereglament_fact vf ON vf.month_key = r.month_key
+    CROSS JOIN fact_before fb
+    CROSS JOIN contract c
+    ORDER BY r.month_key
+    """
+
+
+def get_range_plan_fact(first_month: str, last_month: str) -> List[dict]:
+    """Plan/fact of every month from ``first_month`` to ``last_month`` in one pass.
+
+    One row per month of the range (zeros for months without data) with the same columns
+    as ``get_month_summary_bundle``, the contract amount of the month and
+    ``fact_cumulative`` — the fact of all months up to and including the month.
+    """
+    first, last = first_month + '-01', last_month + '-01'
+    return db.query(RANGE_PLAN_FACT_SQL, (first, last, first_month, first, last))
+
+
+def get_range_daily_revenue_rows(first_month: str, last_month: str) -> List[dict]:
+    """Same rows as ``get_monthly_daily_revenue_rows`` for every day of the months range."""
+    # MONTHLY_DAILY_REVENUE_SQL reads [first month, month after the second bound)
+    return db.query(MONTHLY_DAILY_REVENUE_SQL, (first_month + '-01', last_month + '-01'))
+
+
+# --- Streaming exports ---
+#
+# Month ranges [first month, month after the last) read through a server-side cursor
+# (``db.server_cursor``); rows come in the order they are written out.
+
+EXPORT_DAILY_ROWS_SQL = """
+    SELECT to_char(date_done, 'YYYY-MM-DD') AS date, description, MIN(unit) AS unit,
+           COALESCE(SUM(total_volume),0)::int AS volume, COALESCE(SUM(total_amount),0)::int AS amount
+    FROM mv_fact_daily_amounts
+    WHERE date_done >= DATE %s
+      AND date_done < DATE %s
+      AND id_status=3
+    GROUP BY date_done, description
+    HAVING COALESCE(SUM(total_amount),0)::int > 5
+    ORDER BY date_done, description
+    """
+
+
+def stream_daily_rows(month_start: str, month_end: str, statement_timeout_ms: Optional[int] = None):
+    """Rows of ``/daily`` for every day of the range (same ``amount > 5`` rule)."""
+    return db.server_cursor(EXPORT_DAILY_ROWS_SQL, (month_start, month_end), statement_timeout_ms=statement_timeout_ms)
+
+
+EXPORT_SMETA_DETAILS_WITH_TYPES_SQL = """
+    WITH plan_with_type AS (
+        SELECT p.month_start, p.id_smeta, p.description, p.type_of_work,
+               COALESCE(SUM(p.planned_amount), 0)::int AS plan
+        FROM mv_plan_vs_fact_monthly_ids p
+        WHERE p.month_start >= DATE %s
+          AND p.month_start < DATE %s
+          AND p.id_smeta = ANY(%s)
+        GROUP BY p.month_start, p.id_smeta, p.description, p.type_of_work
+    ),
+    fact_with_type AS (
+        SELECT f.month_start, f.id_smeta, f.description, f.type_of_work,
+               COALESCE(SUM(f.total_amount), 0)::int AS fact
+        FROM mv_fact_daily_amounts f
+        WHERE f.date_done >= DATE %s
+          AND f.date_done < DATE %s
+          AND f.id_status = 3
+          AND f.id_smeta = ANY(%s)
+        GROUP BY f.month_start, f.id_smeta, f.description, f.type_of_work
+    ),
+    combined AS (
+        SELECT
+            COALESCE(p.month_start, f.month_start) AS month_start,
+            COALESCE(p.type_of_work, f.type_of_work) AS type_of_work,
+            COALESCE(p.description, f.description) AS description,
+            COALESCE(p.plan, 0) AS plan,
+            COALESCE(f.fact, 0) AS fact
+        FROM plan_with_type p
+        FULL OUTER JOIN fact_with_type f
+            ON p.month_start = f.month_start
+            AND p.id_smeta = f.id_smeta
+            AND p.description = f.description
+    )
+    SELECT to_char(month_start, 'YYYY-MM') AS month, type_of_work, description, plan, fact
+    FROM combined
+    WHERE plan > 1 OR fact > 1
+    ORDER BY month_start, type_of_work NULLS LAST, fact DESC
+    """
+
+
+def stream_smeta_details_with_types(
+    month_start: str, month_end: str, smeta_ids: Sequence[int], statement_timeout_ms: Optional[int] = None
+):
+    """Rows of ``/monthly/smeta-details-with-types`` per month of the range."""
+    return db.server_cursor(
+        EXPORT_SMETA_DETAILS_WITH_TYPES_SQL,
+        (month_start, month_end, list(smeta_ids), month_start, month_end, list(smeta_ids)),
+        statement_timeout_ms=statement_timeout_ms,
+    )
+
+
+EXPORT_DESCRIPTION_DAILY_ROWS_SQL = """
+    SELECT to_char(date_done, 'YYYY-MM-DD') AS date, COALESCE(SUM(total_volume),0)::int AS volume,
+           MIN(unit) AS unit, COALESCE(SUM(total_amount),0)::int AS amount
+    FROM mv_fact_daily_amounts
+    WHERE date_done >= DATE %s
+      AND date_done < DATE %s
+      AND id_status=3
+      AND id_description = ANY(%s)
+      AND id_smeta = ANY(%s)
+    GROUP BY date_done
+    ORDER BY date_done
+    """
+
+
+def stream_description_daily_rows(
+    month_start: str, month_end: str, description_ids: Sequence[int], smeta_ids: Sequence[int],
+    statement_timeout_ms: Optional[int] = None,
+):
+    """Rows of ``/monthly/smeta-description-daily`` for every day of the range."""
+    return db.server_cursor(
+        EXPORT_DESCRIPTION_DAILY_ROWS_SQL,
+        (month_start, month_end, list(description_ids), list(smeta_ids)),
+        statement_timeout_ms=statement_timeout_ms,
+    )
+
+
+EXPORT_MONTHLY_ITEMS_SQL = """
+    SELECT to_char(month_start, 'YYYY-MM') AS month, smeta_code AS smeta, description AS work_name,
+           planned_amount, fact_amount_done AS fact_amount
+    FROM mv_plan_vs_fact_monthly_ids
+    WHERE month_start >= DATE %s
+      AND month_start < DATE %s
+    ORDER BY month_start, planned_amount DESC
+    """
+
+
+def stream_monthly_items(month_start: str, month_end: str, statement_timeout_ms: Optional[int] = None):
+    """``items`` of the combined dashboard for every month of the range."""
+    return db.server_cursor(EXPORT_MONTHLY_ITEMS_SQL, (month_start, month_end), statement_timeout_ms=statement_timeout_ms)
@@ -0,0 +1,139 @@
+"""Async versions of the ``dashboard_repo`` queries for the DB_ASYNC data path.
+
+Every function runs the same SQL constant as its sync counterpart in
+``dashboard_repo`` through ``db.aquery``/``db.aquery_one``.
+"""
+
+from typing import List, Optional, Sequence
+
+from app.backend import db
+from app.backend.repositories import dashboard_repo as sql
+
+
+async def get_months_from_plan_vs_fact_monthly() -> List[dict]:
+    return await db.aquery(sql.MONTHS_FROM_PLAN_VS_FACT_MONTHLY_SQL)
+
+
+async def get_months_from_plan_fact_backend() -> List[dict]:
+    return await db.aquery(sql.MONTHS_FROM_PLAN_FACT_BACKEND_SQL)
+
+
+async def get_months_from_fact_with_money() -> List[dict]:
+    return await db.aquery(sql.MONTHS_FROM_FACT_WITH_MONEY_SQL)
+
+
+async def get_months_catalog() -> List[dict]:
+    return await db.aquery(sql.MONTHS_CATALOG_SQL)
+
+
+async def get_plan_fact_month(month_key: str) -> Optional[dict]:
+    return await db.aquery_one(sql.PLAN_FACT_MONTH_SQL, (month_key,))
+
+
+async def get_month_summary_bundle(month_key: str) -> Optional[dict]:
+    month_start = month_key + '-01'
+    return await db.aquery_one(
+        sql.MONTH_SUMMARY_BUNDLE_SQL,
+        (month_key, month_start, month_start, month_start, month_start, month_start),
+    )
+
+
+async def sum_fact_vnereglament(month_key: str) -> Optional[dict]:
+    return await db.aquery_one(sql.SUM_FACT_VNEREGLAMENT_SQL, (month_key + '-01', month_key + '-01'))
+
+
+async def get_contract_amount_sum(month_key: Optional[str] = None) -> Optional[dict]:
+    if month_key:
+        return await db.aquery_one(sql.CONTRACT_AMOUNT_BY_MONTH_SQL, (month_key + '-01',))
+    return await db.aquery_one(sql.CONTRACT_AMOUNT_DEFAULT_SQL)
+
+
+async def get_total_fact_amount() -> Optional[dict]:
+    return await db.aquery_one(sql.TOTAL_FACT_AMOUNT_SQL)
+
+
+async def get_monthly_items(month_key: str) -> List[dict]:
+    return await db.aquery(sql.MONTHLY_ITEMS_SQL, (month_key + '-01', month_key + '-01'))
+
+
+async def get_last_loaded_row() -> Optional[dict]:
+    return await db.aquery_one(sql.LAST_LOADED_SQL)
+
+
+async def get_plan_fact_rows_by_smeta(month_key: str, plan_smeta_id: Optional[int], smeta_ids: Sequence[int]) -> List[dict]:
+    return await db.aquery(
+        sql.PLAN_FACT_ROWS_BY_SMETA_SQL,
+        sql.plan_fact_rows_by_smeta_params(month_key, plan_smeta_id, smeta_ids),
+    )
+
+
+async def get_month_plan_fact_details(month_key: str, smeta_ids: Sequence[int]) -> List[dict]:
+    return await db.aquery(
+        sql.MONTH_PLAN_FACT_DETAILS_SQL,
+        (month_key + '-01', month_key + '-01', list(smeta_ids)),
+    )
+
+
+async def get_month_fact_breakdown(month_key: str) -> List[dict]:
+    return await db.aquery(sql.MONTH_FACT_BREAKDOWN_SQL, (month_key + '-01', month_key + '-01'))
+
+
+async def get_month_fact_slice(month_key: str) -> List[dict]:
+    return await db.aquery(sql.MONTH_FACT_SLICE_SQL, (month_key + '-01', month_key + '-01'))
+
+
+async def get_description_daily_rows(month_key: str, description: str, smeta_ids: Sequence[int]) -> List[dict]:
+    return await db.aquery(
+        sql.DESCRIPTION_DAILY_ROWS_SQL,
+        (month_key + '-01', month_key + '-01', description, list(smeta_ids)),
+    )
+
+
+async def get_description_daily_rows_by_ids(month_key: str, description_ids: Sequence[int], smeta_ids: Sequence[int]) -> List[dict]:
+    return await db.aquery(
+        sql.DESCRIPTION_DAILY_ROWS_BY_IDS_SQL,
+        (month_key + '-01', month_key + '-01', list(description_ids), list(smeta_ids)),
+    )
+
+
+async def get_monthly_daily_revenue_rows(month_key: str) -> List[dict]:
+    return await db.aquery(sql.MONTHLY_DAILY_REVENUE_SQL, (month_key + '-01', month_key + '-01'))
+
+
+async def get_daily_rows(date_value: str) -> List[dict]:
+    return await db.aquery(sql.DAILY_ROWS_SQL, (date_value,))
+
+
+async def get_daily_total(date_value: str) -> Optional[dict]:
+    return await db.aquery_one(sql.DAILY_TOTAL_SQL, (date_value,))
+
+
+async def get_monthly_dates(month_key: str) -> List[str]:
+    rows = await db.aquery(sql.MONTHLY_DATES_SQL, (month_key + '-01', month_key + '-01'))
+    return [r.get('date') for r in rows] if rows else []
+
+
+async def get_monthly_dates_from_catalog(month_key: str) -> List[str]:
+    rows = await db.aquery(sql.CATALOG_MONTHLY_DATES_SQL, (month_key + '-01',))
+    return [r.get('date') for r in rows] if rows else []
+
+
+async def get_fact_by_type_of_work(month_key: str) -> List[dict]:
+    return await db.aquery(sql.FACT_BY_TYPE_OF_WORK_SQL, (month_key + '-01', month_key + '-01'))
+
+
+async def get_smeta_details_with_type_of_work(month_key: str, smeta_ids: Sequence[int]) -> List[dict]:
+    month_start = month_key + '-01'
+    return await db.aquery(
+        sql.SMETA_DETAILS_WITH_TYPE_OF_WORK_SQL,
+        (month_start, month_start, list(smeta_ids), month_start, month_start, list(smeta_ids)),
+    )
+
+
+async def get_range_plan_fact(first_month: str, last_month: str) -> List[dict]:
+    first, last = first_month + '-01', last_month + '-01'
+    return await db.aquery(sql.RANGE_PLAN_FACT_SQL, (first, last, first_month, first, last))
+
+
+async def get_range_daily_revenue_rows(first_month: str, last_month: str) -> List[dict]:
+    return await db.aquery(sql.MONTHLY_DAILY_REVENUE_SQL, (first_month + '-01', last_month + '-01'))
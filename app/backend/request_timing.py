@@ -0,0 +1,197 @@
+"""Request-scoped timing of where an API request spends its time.
+
+``RequestTimingMiddleware`` opens a ``RequestTiming`` per request in a contextvar (which
+follows the request into the threadpool and ``run_concurrently``); the layers below add
+to it:
+
+- ``queue`` — waiting for admission (``admission``);
+- ``cache`` — response cache lookup (``response_cache``); hits and misses are counted
+  for it and for the service-layer caches;
+- ``pool`` — waiting for DB connections and ``sql`` — executing and fetching queries,
+  summed over all queries of the request (``db``);
+- ``app`` — Python work of the builder: its wall time minus the time during which at
+  least one of its queries was waiting or running (post-processing such as
+  ``compute_plan_fact`` or the description registry loops);
+- ``serialize`` / ``compress`` — encoding and compressing the response;
+- ``total`` — from the request reaching the middleware to the response start.
+
+The phases are sent as a ``Server-Timing`` header (shown by browser devtools), with
+the number of SQL statements and cache hits/misses in its ``desc`` fields.
+``SERVER_TIMING=0`` turns the header off; ``REQUEST_LOG=1`` also writes one JSON line
+per request to the ``app.backend.access`` logger with the same fields.
+"""
+
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+access_logger = logging.getLogger("app.backend.access")
+
+_PHASES = ("queue", "cache", "pool", "sql", "app", "serialize", "compress")
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+class RequestTiming:
+    """Phase durations and counters of one request (thread-safe)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+        self._db_intervals: List[Tuple[float, float]] = []
+        self._lock = Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.durations[name] += seconds
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self.counts[name] += n
+
+    def db_interval(self, start: float, end: float):
+        with self._lock:
+            self._db_intervals.append((start, end))
+
+    def db_wall(self) -> float:
+        """Wall time covered by at least one DB wait or query (intervals may overlap)."""
+        with self._lock:
+            intervals = sorted(self._db_intervals)
+        covered, cur_start, cur_end = 0.0, None, None
+        for start, end in intervals:
+            if cur_end is None or start > cur_end:
+                if cur_end is not None:
+                    covered += cur_end - cur_start
+                cur_start, cur_end = start, end
+            else:
+                cur_end = max(cur_end, end)
+        if cur_end is not None:
+            covered += cur_end - cur_start
+        return covered
+
+    def build_finished(self, seconds: float):
+        """Record the builder's wall time; its non-DB part is the ``app`` phase."""
+        self.add("app", max(0.0, seconds - self.db_wall()))
+
+    def fields(self, total: float) -> Dict[str, object]:
+        phases = {name: round(self.durations[name] * 1000, 2) for name in _PHASES if name in self.durations}
+        phases["total"] = round(total * 1000, 2)
+        return {"timings_ms": phases, **{name: self.counts[name] for name in sorted(self.counts)}}
+
+    def server_timing(self, total: float) -> str:
+        entries = []
+        for name in _PHASES:
+            if name not in self.durations:
+                continue
+            entry = f"{name};dur={self.durations[name] * 1000:.2f}"
+            if name == "sql":
+                entry += f';desc="{self.counts["sql_statements"]} statements"'
+            elif name == "cache":
+                # response cache and service-layer caches together
+                hits = self.counts["cache_hits"] + self.counts["service_cache_hits"]
+                misses = self.counts["cache_misses"] + self.counts["service_cache_misses"]
+                entry += f';desc="{hits} hits, {misses} misses"'
+            entries.append(entry)
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def current() -> Optional[RequestTiming]:
+    return _timing.get()
+
+
+def add(name: str, seconds: float):
+    timing = _timing.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+def incr(name: str, n: int = 1):
+    timing = _timing.get()
+    if timing is not None:
+        timing.incr(name, n)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Add the time spent in the enclosed block to phase ``name`` of the current request."""
+    timing = _timing.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - started)
+
+
+def query_timed(pool_wait: float, started: float, finished: float):
+    """Account one query: pool wait, execution time, and its wall-clock interval."""
+    timing = _timing.get()
+    if timing is None:
+        return
+    timing.add("pool", pool_wait)
+    timing.add("sql", finished - started)
+    timing.incr("sql_statements")
+    timing.db_interval(started - pool_wait, finished)
+
+
+class RequestTimingMiddleware:
+    """ASGI middleware measuring requests under ``path_prefix``."""
+
+    def __init__(self, app: ASGIApp, path_prefix: str = "/api"):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.header = _env_flag("SERVER_TIMING", True)
+        self.log = _env_flag("REQUEST_LOG", False)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix) or not (self.header or self.log):
+            await self.app(scope, receive, send)
+            return
+        timing = RequestTiming()
+        token = _timing.set(timing)
+        status = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.header:
+                    total = time.perf_counter() - timing.started
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timing.server_timing(total).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timing.reset(token)
+            if self.log:
+                record = {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "status": status,
+                    **timing.fields(time.perf_counter() - timing.started),
+                }
+                access_logger.info(json.dumps(record, ensure_ascii=False), extra={"access": record})
@@ -0,0 +1,302 @@
+"""Cache of encoded API responses with ETag / ``If-None-Match`` support.
+
+Dashboard responses only change when the data version moves, so the final JSON bytes
+of each (path, query, data version) are produced once: validated against the route's
+``response_model`` and encoded exactly like FastAPI would do it, then stored together
+with a strong ETag. Cache hits skip pydantic and the JSON encoder, and a request whose
+``If-None-Match`` matches the ETag gets an empty ``304 Not Modified``.
+
+The key also holds the UTC date, because ``avg_daily_revenue`` depends on today's
+date, and entries expire after the service caches' TTL
+(``dashboard_service._VERSIONED_TTL_SECONDS``). A missed version change therefore
+serves stale bytes no longer than the service layer would.
+
+``RESPONSE_CACHE_MAX_ENTRIES`` bounds the number of cached responses per process
+(default 512, ``0`` disables caching but keeps ETag/304 handling).
+
+With ``RESPONSE_JSON=orjson`` responses are encoded by ``orjson`` straight from the
+service-layer dicts, skipping the response_model validation. The service layer only
+emits JSON-native values in typed fields, and ``Decimal``/``date`` inside untyped
+``items`` are encoded like pydantic does (``str(Decimal)``, ISO dates), so the bytes
+match the standard path. The few float spellings where ``orjson`` and ``json.dumps``
+differ (exponent notation, |x| < 1e-4) and values ``orjson`` cannot encode make that
+response fall back to the standard encoder.
+
+Compression is negotiated on ``Accept-Encoding`` (``br`` preferred over ``gzip`` at
+equal q). Compressed variants are stored on the cached entry next to the raw bytes,
+so a hot response is compressed once per data version, in the threadpool. Settings:
+``RESPONSE_COMPRESSION=0`` turns compression off, ``RESPONSE_COMPRESS_MIN_BYTES`` is
+the smallest body worth compressing (default 1024), ``RESPONSE_BROTLI_QUALITY`` and
+``RESPONSE_GZIP_LEVEL`` set the levels (default 5 and 6). Each variant has its own
+ETag, and every cached response carries ``Vary: Accept-Encoding``.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from decimal import Decimal
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import brotli
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.backend import metrics, request_timing
+from app.backend.services import data_version
+from app.backend.services.dashboard_service import _VERSIONED_TTL_SECONDS
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of ``If-None-Match`` against our ETag (RFC 9110, 13.1.2)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def compression_enabled() -> bool:
+    return os.environ.get("RESPONSE_COMPRESSION", "1").lower() not in ("0", "false", "no", "off")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def compress_min_bytes() -> int:
+    return _env_int("RESPONSE_COMPRESS_MIN_BYTES", 1024)
+
+
+_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "br": lambda body: brotli.compress(body, quality=_env_int("RESPONSE_BROTLI_QUALITY", 5)),
+    "gzip": lambda body: gzip.compress(body, compresslevel=_env_int("RESPONSE_GZIP_LEVEL", 6), mtime=0),
+}
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick ``br`` or ``gzip`` from an ``Accept-Encoding`` header; None means identity."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in _COMPRESSORS:  # dict order is the preference order on equal q
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CachedResponse:
+    """Encoded response body, its compressed variants and their strong ETags."""
+
+    __slots__ = ("body", "etag", "variants")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+        # encoding -> compressed bytes, or None when compression did not make it smaller
+        self.variants: Dict[str, Optional[bytes]] = {}
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        return self.etag if encoding is None else '"%s-%s"' % (self.etag.strip('"'), encoding)
+
+    def encoding_for(self, request: Request) -> Optional[str]:
+        """Content coding to serve this body with, per the request and the size threshold."""
+        if not compression_enabled() or len(self.body) < compress_min_bytes():
+            return None
+        return negotiate_encoding(request.headers.get("accept-encoding"))
+
+    def compress(self, encoding: str):
+        """Store the ``encoding`` variant of the body (runs once per entry and encoding)."""
+        if encoding in self.variants:
+            return
+        started = time.perf_counter()
+        compressed = _COMPRESSORS[encoding](self.body)
+        metrics.RESPONSE_COMPRESSION_SECONDS.labels(encoding=encoding).observe(time.perf_counter() - started)
+        metrics.RESPONSE_COMPRESSION_RATIO.labels(encoding=encoding).observe(len(self.body) / max(len(compressed), 1))
+        self.variants[encoding] = compressed if len(compressed) < len(self.body) else None
+
+    def to_response(self, request: Request, encoding: Optional[str] = None) -> Response:
+        """Build the response for ``encoding``; call ``compress(encoding)`` first."""
+        headers = {"ETag": self.etag_for(encoding), "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            metrics.RESPONSE_CACHE_NOT_MODIFIED.inc()
+            return Response(status_code=304, headers=headers)
+        body = self.variants.get(encoding) if encoding is not None else None
+        if body is None:
+            body = self.body
+            encoding = None
+        else:
+            headers["Content-Encoding"] = encoding
+        metrics.RESPONSE_ENCODING_RESPONSES.labels(encoding=encoding or "identity").inc()
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """LRU of ``CachedResponse`` entries keyed by (data version, UTC date, path, query).
+
+    Entries expire ``ttl_seconds`` after they were stored.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float = _VERSIONED_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[CachedResponse, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expires_at = item
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, entry: CachedResponse):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (entry, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _max_entries() -> int:
+    env_max = os.environ.get("RESPONSE_CACHE_MAX_ENTRIES")
+    return int(env_max) if env_max else 512
+
+
+_cache = ResponseCache(_max_entries())
+
+
+@data_version.on_change
+def _invalidate():
+    _cache.invalidate()
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def fast_json_enabled() -> bool:
+    return os.environ.get("RESPONSE_JSON", "").lower() == "orjson"
+
+
+def encode_standard(response_model: Any, content: Any) -> bytes:
+    """Validate ``content`` against ``response_model`` and encode it like FastAPI."""
+    if response_model is not None:
+        adapter = _adapter(response_model)
+        content = adapter.dump_python(adapter.validate_python(content), mode="json")
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+# Numbers that json.dumps spells differently: exponent notation or 0.0000x (orjson has no
+# exponent there). Anchored to value positions so hex ids like "3e41..." do not match.
+_FLOAT_MISMATCH = re.compile(rb"[:,\[]-?[0-9]+(?:\.[0-9]+)?e|[:,\[]-?0\.0000")
+
+
+def _orjson_default(value: Any):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def encode_fast(content: Any) -> Optional[bytes]:
+    """Encode trusted service-layer output with orjson; None if it would differ from the standard path."""
+    try:
+        body = orjson.dumps(content, default=_orjson_default)
+    except TypeError:
+        return None
+    if _FLOAT_MISMATCH.search(body):
+        return None
+    return body
+
+
+def encode(request: Request, content: Any) -> bytes:
+    """Encode ``content`` for the route, using the fast path when enabled and safe."""
+    if fast_json_enabled():
+        body = encode_fast(content)
+        if body is not None:
+            return body
+    response_model = getattr(request.scope.get("route"), "response_model", None)
+    return encode_standard(response_model, content)
+
+
+def request_key(request: Request) -> Tuple:
+    return (
+        data_version.current_version(),
+        datetime.utcnow().date(),
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+    )
+
+
+def is_cached(request: Request) -> bool:
+    """Whether the response for ``request`` can be served from the cache right now."""
+    return _cache.get(request_key(request)) is not None
+
+
+async def respond(request: Request, build: Callable[[], Awaitable[Any]]) -> Response:
+    """Serve the request from the response cache, building and encoding it on a miss."""
+    key = request_key(request)
+    with request_timing.phase("cache"):
+        entry = _cache.get(key)
+    if entry is None:
+        metrics.RESPONSE_CACHE_REQUESTS.labels(result="miss").inc()
+        request_timing.incr("cache_misses")
+        started = time.perf_counter()
+        content = await build()
+        timing = request_timing.current()
+        if timing is not None:
+            timing.build_finished(time.perf_counter() - started)
+        with request_timing.phase("serialize"):
+            entry = CachedResponse(encode(request, content))
+        _cache.put(key, entry)
+    else:
+        metrics.RESPONSE_CACHE_REQUESTS.labels(result="hit").inc()
+        request_timing.incr("cache_hits")
+    encoding = entry.encoding_for(request)
+    if (
+        encoding is not None
+        and encoding not in entry.variants
+        and not _etag_matches(request.headers.get("if-none-match"), entry.etag_for(encoding))
+    ):
+        with request_timing.phase("compress"):
+            await run_in_threadpool(entry.compress, encoding)
+    return entry.to_response(request, encoding)
@@ -0,0 +1,50 @@
+"""Administrative endpoints.
+
+Disabled (404) unless ``ADMIN_TOKEN`` is set; requests must then send
+``Authorization: Bearer <ADMIN_TOKEN>``.
+"""
+
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.backend.services import mv_refresh
+
+router = APIRouter()
+
+
+def require_admin(authorization: Optional[str] = Header(None)):
+    token = os.environ.get("ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, value = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(value.encode(), token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
+
+
+@router.post("/mv-refresh", status_code=202, dependencies=[Depends(require_admin)])
+async def start_mv_refresh(
+    response: Response,
+    wait: bool = Query(False, description="Run in the request and return the result"),
+    concurrently: bool = Query(True, description="REFRESH ... CONCURRENTLY where a unique index allows it"),
+):
+    """Refresh the materialized views, move ``last_loaded`` and pre-warm the caches."""
+    if wait:
+        try:
+            result = await run_in_threadpool(mv_refresh.refresh, concurrently=concurrently)
+        except mv_refresh.RefreshInProgress:
+            raise HTTPException(status_code=409, detail="Another refresh is running")
+        response.status_code = 200 if result.error is None else 500
+        return result.to_dict()
+    if not mv_refresh.start_background(concurrently):
+        raise HTTPException(status_code=409, detail="Another refresh is running")
+    return {"status": "started"}
+
+
+@router.get("/mv-refresh", dependencies=[Depends(require_admin)])
+def mv_refresh_status():
+    """State of the refresh started from this worker and the result of its last run."""
+    return mv_refresh.status()
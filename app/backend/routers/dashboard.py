@@ -1,5 +1,13 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+import asyncio
+import logging
+import os
+import anyio
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from app.backend import db, response_cache
 
 from app.backend.schemas.dashboard import (
     CombinedDashboardResponse,
@@ -7,55 +15,188 @@ from app.backend.schemas.dashboard import (
     LoadedAtResponse,
     MonthlyBySmetaResponse,
     MonthlyDailyRevenueResponse,
+    MonthlyPageResponse,
     MonthlySmetaDescriptionDailyResponse,
     MonthlySmetaDetailsResponse,
     MonthlySummaryResponse,
+    MonthCatalogRow,
+    DailyRevenueRangeResponse,
+    MonthlyRangeResponse,
     TypeOfWorkResponse,
     SmetaDetailsWithTypesResponse,
 )
-from app.backend.services import dashboard_service
+from app.backend.services import dashboard_service, dashboard_service_async, export
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# statement_timeout budget (ms) of the queries behind each endpoint. DB_STATEMENT_TIMEOUT_MS
+# sets the default (10000, 0 = no limit), DB_STATEMENT_TIMEOUTS overrides single endpoints,
+# e.g. "monthly_page=30000,daily=5000". Both are read once at import; malformed values are
+# logged and ignored.
+_STATEMENT_TIMEOUTS_MS = {
+    "combined_dashboard": 20000,
+    "monthly_page": 20000,
+    "monthly_smeta_details_with_types": 15000,
+}
+
+
+def _parse_timeout_ms(value: str) -> Optional[int]:
+    try:
+        timeout = int(value)
+    except ValueError:
+        return None
+    return timeout if timeout >= 0 else None
+
+
+def _parse_statement_timeouts(raw: str) -> Dict[str, int]:
+    timeouts = dict(_STATEMENT_TIMEOUTS_MS)
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        timeout = _parse_timeout_ms(value.strip())
+        if not name.strip() or timeout is None:
+            logger.warning("Ignoring malformed DB_STATEMENT_TIMEOUTS entry %r", item.strip())
+            continue
+        timeouts[name.strip()] = timeout
+    return timeouts
+
+
+def _parse_default_timeout_ms(raw: Optional[str]) -> int:
+    if not raw:
+        return 10000
+    timeout = _parse_timeout_ms(raw.strip())
+    if timeout is None:
+        logger.warning("Ignoring malformed DB_STATEMENT_TIMEOUT_MS %r, using 10000", raw)
+        return 10000
+    return timeout
+
+
+_STATEMENT_TIMEOUTS = _parse_statement_timeouts(os.environ.get("DB_STATEMENT_TIMEOUTS", ""))
+_DEFAULT_STATEMENT_TIMEOUT_MS = _parse_default_timeout_ms(os.environ.get("DB_STATEMENT_TIMEOUT_MS"))
+
+
+def _statement_timeout_ms(request: Request) -> Optional[int]:
+    endpoint = request.scope.get("endpoint")
+    name = getattr(endpoint, "__name__", "")
+    return _STATEMENT_TIMEOUTS.get(name, _DEFAULT_STATEMENT_TIMEOUT_MS) or None
+
+
+async def _wait_for_disconnect(request: Request):
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _cancel_on_disconnect(request: Request, scope: db.QueryScope, work):
+    """Await ``work``; if the client disconnects first, cancel its queries and raise ``QueryCancelled``."""
+    work = asyncio.ensure_future(work)
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({work, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        disconnect.cancel()
+    if not work.done():
+        # The sync builder keeps its thread until its current query is cancelled
+        await run_in_threadpool(scope.cancel)
+        work.cancel()
+        work.add_done_callback(lambda t: t.cancelled() or t.exception())
+        raise db.QueryCancelled(request.url.path)
+    return work.result()
+
+
+async def _dispatch(request: Request, async_fn, sync_fn, *args, **kwargs):
+    """Run the async builder when DB_ASYNC is on, otherwise the sync one in the threadpool.
+
+    Keeping both paths behind one set of endpoints lets them be benchmarked side by side.
+    The encoded result is served through ``response_cache`` (ETag / 304 support). Queries
+    run with the endpoint's statement_timeout and are cancelled if the client goes away.
+    """
+    async def _run():
+        if db.async_enabled():
+            return await async_fn(*args, **kwargs)
+        return await run_in_threadpool(sync_fn, *args, **kwargs)
+
+    async def _build():
+        with db.query_scope(_statement_timeout_ms(request)) as scope:
+            return await _cancel_on_disconnect(request, scope, _run())
+
+    return await response_cache.respond(request, _build)
 
 
 @router.get("", response_model=CombinedDashboardResponse)
-def combined_dashboard(month: Optional[str] = Query(None, description="YYYY-MM or YYYY-MM-DD (optional)")):
-    return dashboard_service.build_combined_dashboard(month)
+async def combined_dashboard(request: Request, month: Optional[str] = Query(None, description="YYYY-MM or YYYY-MM-DD (optional)")):
+    return await _dispatch(request, dashboard_service_async.build_combined_dashboard, dashboard_service.build_combined_dashboard, month)
 
 
 @router.get("/monthly/summary", response_model=MonthlySummaryResponse)
-def monthly_summary(month: str = Query(..., description="YYYY-MM")):
+async def monthly_summary(request: Request, month: str = Query(..., description="YYYY-MM")):
     month_key = dashboard_service.normalize_month(month)
-    return dashboard_service.build_monthly_summary(month_key)
+    return await _dispatch(request, dashboard_service_async.build_monthly_summary, dashboard_service.build_monthly_summary, month_key)
 
 
 @router.get("/months", response_model=list)
-def available_months(limit: Optional[int] = Query(None, ge=1, le=120, description="Максимальное количество месяцев")):
-    return dashboard_service.fetch_available_months(limit=limit)
+async def available_months(request: Request, limit: Optional[int] = Query(None, ge=1, le=120, description="Максимальное количество месяцев")):
+    return await _dispatch(request, dashboard_service_async.fetch_available_months, dashboard_service.fetch_available_months, limit=limit)
+
+
+@router.get("/months/catalog", response_model=List[MonthCatalogRow])
+async def months_catalog(request: Request, limit: Optional[int] = Query(None, ge=1, le=120, description="Максимальное количество месяцев")):
+    """Months with data (newest first) and whether each has plan and/or fact."""
+    return await _dispatch(request, dashboard_service_async.fetch_months_catalog, dashboard_service.fetch_months_catalog, limit=limit)
+
+
+@router.get("/monthly/page", response_model=MonthlyPageResponse)
+async def monthly_page(request: Request, month: str = Query(..., description="YYYY-MM")):
+    """Everything the monthly dashboard shows for a month in one response."""
+    return await _dispatch(request, dashboard_service_async.build_monthly_page, dashboard_service.build_monthly_page, month)
 
 
 @router.get("/monthly/by-smeta", response_model=MonthlyBySmetaResponse)
-def monthly_by_smeta(month: str = Query(..., description="YYYY-MM")):
-    return dashboard_service.build_monthly_by_smeta(month)
+async def monthly_by_smeta(request: Request, month: str = Query(..., description="YYYY-MM")):
+    return await _dispatch(request, dashboard_service_async.build_monthly_by_smeta, dashboard_service.build_monthly_by_smeta, month)
 
 
 @router.get("/monthly/daily-revenue", response_model=MonthlyDailyRevenueResponse)
-def monthly_daily_revenue(month: str = Query(..., description="YYYY-MM")):
-    return dashboard_service.build_monthly_daily_revenue(month)
+async def monthly_daily_revenue(request: Request, month: str = Query(..., description="YYYY-MM")):
+    return await _dispatch(request, dashboard_service_async.build_monthly_daily_revenue, dashboard_service.build_monthly_daily_revenue, month)
+
+
+@router.get("/monthly/range", response_model=MonthlyRangeResponse)
+async def monthly_range(
+    request: Request,
+    month_from: str = Query(..., alias="from", description="YYYY-MM"),
+    month_to: Optional[str] = Query(None, alias="to", description="YYYY-MM, inclusive (default: from)"),
+):
+    """Plan/fact by smeta and cumulative fact vs contract for every month of the range."""
+    return await _dispatch(request, dashboard_service_async.build_monthly_range, dashboard_service.build_monthly_range, month_from, month_to)
+
+
+@router.get("/monthly/daily-revenue/range", response_model=DailyRevenueRangeResponse)
+async def monthly_daily_revenue_range(
+    request: Request,
+    month_from: str = Query(..., alias="from", description="YYYY-MM"),
+    month_to: Optional[str] = Query(None, alias="to", description="YYYY-MM, inclusive (default: from)"),
+):
+    """Revenue of every day of the range (rows of /monthly/daily-revenue, month after month)."""
+    return await _dispatch(
+        request, dashboard_service_async.build_daily_revenue_range, dashboard_service.build_daily_revenue_range, month_from, month_to
+    )
 
 
 @router.get("/monthly/dates", response_model=list)
-def monthly_dates(month: str = Query(..., description="YYYY-MM")):
-    return dashboard_service.fetch_monthly_dates(month)
+async def monthly_dates(request: Request, month: str = Query(..., description="YYYY-MM")):
+    return await _dispatch(request, dashboard_service_async.fetch_monthly_dates, dashboard_service.fetch_monthly_dates, month)
 
 
 @router.get("/monthly/smeta-details", response_model=MonthlySmetaDetailsResponse)
-def monthly_smeta_details(month: str = Query(..., description="YYYY-MM"), smeta_key: str = Query(...)):
-    return dashboard_service.build_monthly_smeta_details(month, smeta_key)
+async def monthly_smeta_details(request: Request, month: str = Query(..., description="YYYY-MM"), smeta_key: str = Query(...)):
+    return await _dispatch(request, dashboard_service_async.build_monthly_smeta_details, dashboard_service.build_monthly_smeta_details, month, smeta_key)
 
 
 @router.get("/monthly/smeta-description-daily", response_model=MonthlySmetaDescriptionDailyResponse)
-def monthly_smeta_description_daily(
+async def monthly_smeta_description_daily(
+    request: Request,
     month: str = Query(..., description="YYYY-MM"),
     smeta_key: str = Query(...),
     description_id: str = Query(..., description="Short 12-char hash ID of the description")
@@ -65,29 +206,115 @@ def monthly_smeta_description_daily(
     Use description_id (12-char hash) for URL-safe requests.
     The description_id is returned in the smeta-details endpoint.
     """
-    return dashboard_service.build_monthly_smeta_description_daily_by_id(month, smeta_key, description_id)
+    return await _dispatch(request, dashboard_service_async.build_monthly_smeta_description_daily_by_id, dashboard_service.build_monthly_smeta_description_daily_by_id, month, smeta_key, description_id)
 
 
 @router.get("/last-loaded", response_model=LoadedAtResponse)
-def last_loaded():
-    return dashboard_service.build_last_loaded()
+async def last_loaded(request: Request):
+    return await _dispatch(request, dashboard_service_async.build_last_loaded, dashboard_service.build_last_loaded)
 
 
 @router.get("/daily", response_model=DailyResponse)
-def daily(date: Optional[str] = Query(None, alias="date", description="YYYY-MM-DD"), day: Optional[str] = Query(None, alias="day", description="YYYY-MM-DD")):
+async def daily(request: Request, date: Optional[str] = Query(None, alias="date", description="YYYY-MM-DD"), day: Optional[str] = Query(None, alias="day", description="YYYY-MM-DD")):
     date_value = date or day
     if not date_value:
         raise HTTPException(status_code=400, detail="date is required")
-    return dashboard_service.build_daily(date_value)
+    return await _dispatch(request, dashboard_service_async.build_daily, dashboard_service.build_daily, date_value)
 
 
 @router.get("/monthly/fact-by-type-of-work", response_model=TypeOfWorkResponse)
-def monthly_fact_by_type_of_work(month: str = Query(..., description="YYYY-MM")):
+async def monthly_fact_by_type_of_work(request: Request, month: str = Query(..., description="YYYY-MM")):
     """Get fact amounts aggregated by type of work for the given month."""
-    return dashboard_service.build_fact_by_type_of_work(month)
+    return await _dispatch(request, dashboard_service_async.build_fact_by_type_of_work, dashboard_service.build_fact_by_type_of_work, month)
 
 
 @router.get("/monthly/smeta-details-with-types", response_model=SmetaDetailsWithTypesResponse)
-def monthly_smeta_details_with_types(month: str = Query(..., description="YYYY-MM"), smeta_key: str = Query(...)):
+async def monthly_smeta_details_with_types(request: Request, month: str = Query(..., description="YYYY-MM"), smeta_key: str = Query(...)):
     """Get smeta details with type_of_work grouping for hierarchical display."""
-    return dashboard_service.build_smeta_details_with_types(month, smeta_key)
+    return await _dispatch(request, dashboard_service_async.build_smeta_details_with_types, dashboard_service.build_smeta_details_with_types, month, smeta_key)
+
+
+async def _iterate_chunks(first: bytes, chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    try:
+        yield first
+        while True:
+            chunk = await run_in_threadpool(next, chunks, None)
+            if chunk is None:
+                return
+            if chunk:
+                yield chunk
+    finally:
+        # Also when the client went away: closing the generator returns its DB connection
+        with anyio.CancelScope(shield=True):
+            await run_in_threadpool(chunks.close)
+
+
+async def _stream_export(request: Request, build, *args) -> StreamingResponse:
+    """Open the export (validation, DB cursor) before the response starts, then stream it.
+
+    Errors up to the first chunk (bad parameters, pool exhausted) still get a proper
+    status code; the rows are fetched batch by batch while the body is being sent.
+    """
+    def _open():
+        stream = build(*args, statement_timeout_ms=_statement_timeout_ms(request))
+        try:
+            return stream, next(stream.chunks)
+        except BaseException:
+            stream.chunks.close()
+            raise
+
+    stream, first = await run_in_threadpool(_open)
+    return StreamingResponse(
+        _iterate_chunks(first, stream.chunks),
+        media_type=stream.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{stream.filename}"'},
+    )
+
+
+@router.get("/export/daily")
+async def export_daily(
+    request: Request,
+    month_from: str = Query(..., alias="from", description="YYYY-MM"),
+    month_to: Optional[str] = Query(None, alias="to", description="YYYY-MM, inclusive (default: from)"),
+    format: str = Query("csv", description="csv or xlsx"),
+):
+    """Rows of /daily for every day of the months, as a CSV or XLSX download."""
+    return await _stream_export(request, export.daily_rows, month_from, month_to, format)
+
+
+@router.get("/export/smeta-details-with-types")
+async def export_smeta_details_with_types(
+    request: Request,
+    month_from: str = Query(..., alias="from", description="YYYY-MM"),
+    month_to: Optional[str] = Query(None, alias="to", description="YYYY-MM, inclusive (default: from)"),
+    smeta_key: str = Query(...),
+    format: str = Query("csv", description="csv or xlsx"),
+):
+    """Rows of /monthly/smeta-details-with-types per month, as a CSV or XLSX download."""
+    return await _stream_export(request, export.smeta_details_with_types, month_from, month_to, smeta_key, format)
+
+
+@router.get("/export/smeta-description-daily")
+async def export_smeta_description_daily(
+    request: Request,
+    month_from: str = Query(..., alias="from", description="YYYY-MM"),
+    month_to: Optional[str] = Query(None, alias="to", description="YYYY-MM, inclusive (default: from)"),
+    smeta_key: str = Query(...),
+    description_id: str = Query(..., description="Short 12-char hash ID of the description"),
+    format: str = Query("csv", description="csv or xlsx"),
+):
+    """Daily rows of one work description over the months, as a CSV or XLSX download."""
+    return await _stream_export(
+        request, export.description_daily_rows, month_from, month_to, smeta_key, description_id, format
+    )
+
+
+@router.get("/export/items")
+async def export_items(
+    request: Request,
+    month_from: str = Query(..., alias="from", description="YYYY-MM"),
+    month_to: Optional[str] = Query(None, alias="to", description="YYYY-MM, inclusive (default: from)"),
+    format: str = Query("csv", description="csv or xlsx"),
+):
+    """``items`` of the combined dashboard for every month, as a CSV or XLSX download."""
+    return await _stream_export(request, export.monthly_items, month_from, month_to, format)
@@ -0,0 +1,63 @@
+"""Monthly PDF reports (see ``services/reports.py``).
+
+``POST /monthly?month=YYYY-MM`` queues the report of the current data version and
+returns its job (``202``, or ``200`` when the PDF is already stored); the job is polled
+at ``GET /{job_id}`` and the file is downloaded from ``GET /{job_id}/pdf``.
+"""
+
+import os
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import FileResponse
+
+from app.backend.services import reports
+
+router = APIRouter()
+
+
+def _job_response(job: reports.ReportJob) -> dict:
+    body = job.to_dict()
+    body["download_url"] = f"/api/reports/{job.job_id}/pdf" if job.status == "done" else None
+    return body
+
+
+@router.post("/monthly", status_code=202)
+def submit_monthly_report(response: Response, month: str = Query(..., description="YYYY-MM")):
+    """Queue the monthly report; repeated calls return the same job until the data changes."""
+    try:
+        job = reports.submit(month)
+    except reports.QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Report queue is full, retry later",
+            headers={"Retry-After": os.environ.get("REPORT_RETRY_AFTER", "5")},
+        )
+    if job.status == "done":
+        response.status_code = 200
+    return _job_response(job)
+
+
+@router.get("/{job_id}")
+def report_job_status(job_id: str):
+    job = reports.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown report job")
+    return _job_response(job)
+
+
+@router.get("/{job_id}/pdf")
+def download_report(job_id: str):
+    path = reports.stored_path(job_id)
+    if path is None:
+        job = reports.get_job(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Unknown report job")
+        raise HTTPException(status_code=409, detail=f"Report is {job.status}")
+    month_key = job_id.split("_", 1)[0]
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        filename=f"report_{month_key}.pdf",
+        # The content of a job id never changes
+        headers={"Cache-Control": "private, max-age=86400, immutable"},
+    )
@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -96,6 +96,12 @@ class CombinedDashboardResponse(BaseModel):
     available_months: List[str]
 
 
+class MonthCatalogRow(BaseModel):
+    month: str
+    has_plan: Optional[bool]  # None when the months catalog MV is unavailable
+    has_fact: bool
+
+
 class LoadedAtResponse(BaseModel):
     loaded_at: Optional[str]
 
@@ -143,3 +149,47 @@ class SmetaDetailsWithTypesResponse(BaseModel):
     month: str
     smeta_key: str
     rows: List[SmetaDetailWithTypeRow]
+
+
+class MonthlyPageResponse(BaseModel):
+    month: str
+    summary: MonthlySummaryResponse
+    by_smeta: MonthlyBySmetaResponse
+    daily_revenue: MonthlyDailyRevenueResponse
+    fact_by_type_of_work: TypeOfWorkResponse
+    smeta_details: Dict[str, MonthlySmetaDetailsResponse]
+    smeta_details_with_types: Dict[str, SmetaDetailsWithTypesResponse]
+
+
+class RangeContract(BaseModel):
+    summa_contract: int
+    fact_cumulative: int  # fact of every month up to and including this one
+    contract_planfact_pct: Optional[float]
+
+
+class RangeMonth(BaseModel):
+    month: str
+    plan_total: int
+    fact_total: int
+    delta: int
+    cards: List[SmetaCard]
+    contract: RangeContract
+
+
+class RangeTotals(BaseModel):
+    plan_total: int
+    fact_total: int
+    delta: int
+
+
+class MonthlyRangeResponse(BaseModel):
+    month_from: str
+    month_to: str
+    months: List[RangeMonth]
+    totals: RangeTotals
+
+
+class DailyRevenueRangeResponse(BaseModel):
+    month_from: str
+    month_to: str
+    rows: List[MonthlyDailyRevenueRow]
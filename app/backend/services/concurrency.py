@@ -0,0 +1,126 @@
+"""Concurrent execution of independent repository calls within one request.
+
+``run_concurrently`` (sync path) and ``arun_concurrently`` (DB_ASYNC path) run a few
+independent zero-argument callables at the same time, each on its own pool checkout,
+and return their results in order. A cold request then costs roughly its slowest
+query instead of the sum of all of them.
+
+Both helpers cap the number of calls running at once per invocation
+(``DB_FANOUT_LIMIT``, default 3) and stop on the first error: calls that have not
+started yet are skipped and the error is re-raised to the caller.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Optional
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _default_limit() -> int:
+    env_limit = os.environ.get("DB_FANOUT_LIMIT")
+    return max(1, int(env_limit)) if env_limit else 3
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            env_workers = os.environ.get("DB_FANOUT_WORKERS")
+            workers = int(env_workers) if env_workers else 16
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-fanout")
+        return _executor
+
+
+class _Batch:
+    """Shared state of one ``run_concurrently`` call.
+
+    Calls are claimed one at a time by the caller thread and by up to ``limit - 1``
+    executor workers. The caller only ever waits for calls that are already running,
+    so nested fan-outs make progress even when every executor thread is busy.
+    """
+
+    def __init__(self, calls: List[Callable[[], Any]]):
+        self.calls = calls
+        # Each call runs in a copy of the caller's context (request-scoped contextvars)
+        self.contexts = [contextvars.copy_context() for _ in calls]
+        self.results: List[Any] = [None] * len(calls)
+        self.error: Optional[BaseException] = None
+        self._next = 0
+        self._running = 0
+        self._cond = threading.Condition()
+
+    def _claim(self) -> Optional[int]:
+        with self._cond:
+            if self.error is not None or self._next >= len(self.calls):
+                return None
+            index = self._next
+            self._next += 1
+            self._running += 1
+            return index
+
+    def work(self):
+        while (index := self._claim()) is not None:
+            try:
+                self.results[index] = self.contexts[index].run(self.calls[index])
+            except BaseException as exc:  # noqa: BLE001 - re-raised by the caller
+                with self._cond:
+                    if self.error is None:
+                        self.error = exc
+            finally:
+                with self._cond:
+                    self._running -= 1
+                    self._cond.notify_all()
+
+    def wait(self):
+        with self._cond:
+            while self._running:
+                self._cond.wait()
+
+
+def run_concurrently(*calls: Callable[[], Any], limit: Optional[int] = None) -> List[Any]:
+    """Run independent calls concurrently and return their results in order."""
+    if len(calls) <= 1:
+        return [call() for call in calls]
+    limit = limit or _default_limit()
+    batch = _Batch(list(calls))
+    executor = _get_executor()
+    for _ in range(min(limit, len(calls)) - 1):
+        executor.submit(batch.work)
+    batch.work()
+    batch.wait()
+    if batch.error is not None:
+        raise batch.error
+    return batch.results
+
+
+async def arun_concurrently(*calls: Callable[[], Awaitable[Any]], limit: Optional[int] = None) -> List[Any]:
+    """Async counterpart of ``run_concurrently``; each call returns an awaitable."""
+    if len(calls) <= 1:
+        return [await call() for call in calls]
+    semaphore = asyncio.Semaphore(limit or _default_limit())
+
+    async def _run(call):
+        async with semaphore:
+            return await call()
+
+    tasks = [asyncio.ensure_future(_run(call)) for call in calls]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    except BaseException:
+        # The caller was cancelled: do not leave orphaned queries behind
+        for task in tasks:
+            task.cancel()
+        raise
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    errors = [task.exception() for task in tasks if not task.cancelled() and task.exception() is not None]
+    if errors:
+        raise errors[0]
+    return [task.result() for task in tasks]
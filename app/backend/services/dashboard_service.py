@@ -1,14 +1,28 @@
-import hashlib
+import asyncio
+import logging
+import os
 from calendar import monthrange
+from dataclasses import dataclass
 from datetime import datetime
-from threading import RLock
+from decimal import ROUND_HALF_UP, Decimal
+from threading import Event, Lock, RLock, Thread
 from time import monotonic
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from fastapi import HTTPException
 
+from app.backend import db, metrics, request_timing
 from app.backend.repositories import dashboard_repo
+from app.backend.services import data_version, month_cube
+from app.backend.services.concurrency import run_concurrently
+from app.backend.services.description_registry import (  # noqa: F401 - re-exported
+    generate_description_id,
+    register_description,
+    resolve_description_id,
+    resolve_description_ids,
+)
 
+logger = logging.getLogger(__name__)
 
 SMETA_LABELS = {
     "leto": "Лето",
@@ -19,56 +33,209 @@ SMETA_LABELS = {
 _SENTINEL = object()
 
 
-class _TTLCache:
-    """Simple TTL cache for a single value."""
+def _resolve_future(fut: "asyncio.Future"):
+    if not fut.done():
+        fut.set_result(None)
 
-    def __init__(self, ttl_seconds: int):
-        self.ttl_seconds = ttl_seconds
-        self._value = _SENTINEL
-        self._expires_at = 0.0
-        self._lock = RLock()
 
-    def get_or_set(self, factory):
-        now = monotonic()
+def _shared_task(coro) -> "asyncio.Task":
+    # Not bound to the QueryScope of the request that happened to miss first
+    return asyncio.get_running_loop().create_task(coro, context=db.detached_context())
+
+
+class _InFlight:
+    """A pending computation shared by all callers that missed on the same key.
+
+    Both threads (``event``) and coroutines (``wait_async``) can wait on it, so the
+    sync and async data paths share one single-flight cache.
+    """
+
+    __slots__ = ("event", "value", "error", "task", "_waiters", "_lock")
+
+    def __init__(self):
+        self.event = Event()
+        self.value: Any = _SENTINEL
+        self.error: Optional[BaseException] = None
+        self.task: Optional["asyncio.Task"] = None
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Future"]] = []
+        self._lock = Lock()
+
+    def set(self):
         with self._lock:
-            if self._value is not _SENTINEL and now < self._expires_at:
-                return self._value
-            self._value = factory()
-            self._expires_at = now + self.ttl_seconds
-            return self._value
+            self.event.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, fut in waiters:
+            loop.call_soon_threadsafe(_resolve_future, fut)
 
-    def invalidate(self):
+    async def wait_async(self):
+        loop = asyncio.get_running_loop()
         with self._lock:
-            self._value = _SENTINEL
-            self._expires_at = 0.0
+            if self.event.is_set():
+                return
+            fut = loop.create_future()
+            self._waiters.append((loop, fut))
+        await fut
 
 
 class _KeyedTTLCache:
-    """TTL cache with keyed entries for caching by parameters (e.g., month, smeta_key)."""
+    """TTL cache with keyed entries for caching by parameters (e.g., month, smeta_key).
+
+    Factories run outside the cache lock with per-key single-flight: concurrent
+    misses on one key share a single computation, while hits and other keys never
+    wait on it. With ``stale_seconds > 0`` an expired entry is still served for up
+    to that long (stale-while-revalidate) and refreshed in a background thread.
+    """
 
-    def __init__(self, ttl_seconds: int, max_entries: int = 100):
+    def __init__(self, ttl_seconds: int, max_entries: int = 100, stale_seconds: int = 0):
         self.ttl_seconds = ttl_seconds
         self.max_entries = max_entries
+        self.stale_seconds = stale_seconds
         self._cache: Dict[Tuple, Tuple[Any, float]] = {}  # key -> (value, expires_at)
+        self._in_flight: Dict[Tuple, _InFlight] = {}
+        # Bumped on invalidate so computations started earlier do not store stale results
+        self._generation = 0
         self._lock = RLock()
 
     def get_or_set(self, key: Tuple, factory):
+        while True:
+            try:
+                return self._get_or_set(key, factory)
+            except db.QueryCancelled:
+                # The shared computation was cancelled with the request of another
+                # (disconnected) caller; compute it again unless this request is gone too
+                if db.scope_cancelled():
+                    raise
+
+    async def aget_or_set(self, key: Tuple, factory):
+        """Async counterpart of ``get_or_set``; ``factory`` returns an awaitable.
+
+        The computation runs in its own task, in a query scope of its own with the
+        caller's statement timeout (``db.detached_context``), so a cancelled or
+        disconnected caller does not cancel it for the other callers waiting on the
+        same key.
+        """
+        while True:
+            try:
+                return await self._aget_or_set(key, factory)
+            except db.QueryCancelled:
+                if db.scope_cancelled():
+                    raise
+
+    def peek(self, key: Tuple, default=None):
+        """Return the fresh cached value of ``key`` without computing it, else ``default``."""
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is None or monotonic() >= entry[1]:
+            return default
+        request_timing.incr("service_cache_hits")
+        return entry[0]
+
+    def _get_or_set(self, key: Tuple, factory):
         now = monotonic()
         with self._lock:
-            if key in self._cache:
-                value, expires_at = self._cache[key]
+            entry = self._cache.get(key)
+            if entry is not None:
+                value, expires_at = entry
                 if now < expires_at:
+                    request_timing.incr("service_cache_hits")
+                    return value
+                if now < expires_at + self.stale_seconds:
+                    if key not in self._in_flight:
+                        flight = self._in_flight[key] = _InFlight()
+                        Thread(
+                            target=self._compute,
+                            args=(key, factory, flight, self._generation, True),
+                            name="cache-refresh",
+                            daemon=True,
+                        ).start()
+                    request_timing.incr("service_cache_hits")
                     return value
-            # Evict expired entries and limit cache size
-            self._evict_expired(now)
+            request_timing.incr("service_cache_misses")
+            flight = self._in_flight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._in_flight[key] = _InFlight()
+            generation = self._generation
+
+        if is_leader:
+            self._compute(key, factory, flight, generation)
+        else:
+            flight.event.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    async def _aget_or_set(self, key: Tuple, factory):
+        now = monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if now < expires_at:
+                    request_timing.incr("service_cache_hits")
+                    return value
+                if now < expires_at + self.stale_seconds:
+                    if key not in self._in_flight:
+                        flight = self._in_flight[key] = _InFlight()
+                        flight.task = _shared_task(self._acompute(key, factory, flight, self._generation, True))
+                    request_timing.incr("service_cache_hits")
+                    return value
+            request_timing.incr("service_cache_misses")
+            flight = self._in_flight.get(key)
+            if flight is None:
+                flight = self._in_flight[key] = _InFlight()
+                flight.task = _shared_task(self._acompute(key, factory, flight, self._generation))
+
+        await flight.wait_async()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _compute(self, key: Tuple, factory, flight: _InFlight, generation: int, background: bool = False):
+        """Run ``factory`` for ``key`` and publish the result to every waiter."""
+        try:
             value = factory()
-            self._cache[key] = (value, now + self.ttl_seconds)
-            return value
+        except BaseException as exc:  # noqa: BLE001 - re-raised by every waiter
+            self._fail(key, flight, exc, background)
+        else:
+            self._store(key, flight, value, generation)
+        finally:
+            self._finish(key, flight)
+
+    async def _acompute(self, key: Tuple, factory, flight: _InFlight, generation: int, background: bool = False):
+        try:
+            value = await factory()
+        except BaseException as exc:  # noqa: BLE001 - re-raised by every waiter
+            self._fail(key, flight, exc, background)
+        else:
+            self._store(key, flight, value, generation)
+        finally:
+            self._finish(key, flight)
+
+    def _fail(self, key: Tuple, flight: _InFlight, exc: BaseException, background: bool):
+        flight.error = exc
+        if background:
+            # The stale value keeps being served; the next expired hit retries
+            logger.error("Background cache refresh failed for key %r", key, exc_info=exc)
+
+    def _store(self, key: Tuple, flight: _InFlight, value: Any, generation: int):
+        flight.value = value
+        now = monotonic()
+        with self._lock:
+            if generation == self._generation:
+                self._evict_expired(now)
+                self._cache[key] = (value, now + self.ttl_seconds)
+
+    def _finish(self, key: Tuple, flight: _InFlight):
+        with self._lock:
+            if self._in_flight.get(key) is flight:
+                del self._in_flight[key]
+        flight.set()
 
     def _evict_expired(self, now: float):
-        """Remove expired entries and limit cache size."""
+        """Remove entries past their stale window and limit cache size."""
         # Remove expired
-        expired_keys = [k for k, (_, exp) in self._cache.items() if now >= exp]
+        expired_keys = [k for k, (_, exp) in self._cache.items() if now >= exp + self.stale_seconds]
         for k in expired_keys:
             del self._cache[k]
         # If still over limit, remove oldest entries
@@ -79,59 +246,97 @@ class _KeyedTTLCache:
 
     def invalidate(self, key: Optional[Tuple] = None):
         with self._lock:
+            self._generation += 1
             if key is None:
                 self._cache.clear()
-            elif key in self._cache:
-                del self._cache[key]
-
-
-_MONTHS_CACHE = _TTLCache(ttl_seconds=300)
-_LAST_LOADED_CACHE = _TTLCache(ttl_seconds=60)
-
-# Keyed caches for heavy responses (TTL=120s to balance freshness and performance)
-_COMBINED_DASHBOARD_CACHE = _KeyedTTLCache(ttl_seconds=120, max_entries=24)
-_DAILY_REVENUE_CACHE = _KeyedTTLCache(ttl_seconds=120, max_entries=24)
-_SMETA_DETAILS_CACHE = _KeyedTTLCache(ttl_seconds=120, max_entries=50)
-_SMETA_DETAILS_TYPES_CACHE = _KeyedTTLCache(ttl_seconds=120, max_entries=50)
-
-# Cache for description -> id and id -> description mapping
-# This is an in-memory cache that builds up during the application lifetime
-_description_id_map: Dict[str, str] = {}  # description -> id
-_id_description_map: Dict[str, str] = {}  # id -> description
-_desc_map_lock = RLock()
-
-
-def generate_description_id(description: str) -> str:
-    """Generate a short, URL-safe ID from description using SHA256 hash.
-    
-    The ID is 12 characters long (base16), which gives us ~2.8 * 10^14 
-    possible values - more than enough for our use case while keeping 
-    URLs reasonably short.
+                self._in_flight.clear()
+            else:
+                self._cache.pop(key, None)
+                self._in_flight.pop(key, None)
+
+
+# Response caches are keyed by the data version (see data_version) and dropped together
+# when it moves, so the TTLs below are only a safety net for a stalled watcher.
+_VERSIONED_TTL_SECONDS = 3600
+
+_MONTHS_CACHE = _KeyedTTLCache(ttl_seconds=_VERSIONED_TTL_SECONDS, max_entries=1)
+# Fallback for requests served before the watcher has read last_loaded
+_LAST_LOADED_CACHE = _KeyedTTLCache(ttl_seconds=60, max_entries=1)
+
+# Longest range served by the range endpoints
+RANGE_MAX_MONTHS = 36
+# Months a range stores next to the ones the single-month endpoints keep hot: a range of
+# RANGE_MAX_MONTHS must not evict them, nor its own older months
+_RANGE_CACHE_MONTHS = RANGE_MAX_MONTHS + 24
+
+# Keyed caches for heavy responses. Expired entries are served for another 10 minutes
+# while a background refresh runs.
+_MONTH_AGGREGATE_CACHE = _KeyedTTLCache(ttl_seconds=_VERSIONED_TTL_SECONDS, max_entries=24, stale_seconds=600)
+_COMBINED_DASHBOARD_CACHE = _KeyedTTLCache(ttl_seconds=_VERSIONED_TTL_SECONDS, max_entries=24, stale_seconds=600)
+# Shared with the daily revenue ranges, hence room for a whole range
+_DAILY_REVENUE_CACHE = _KeyedTTLCache(
+    ttl_seconds=_VERSIONED_TTL_SECONDS, max_entries=_RANGE_CACHE_MONTHS, stale_seconds=600
+)
+_SMETA_DETAILS_CACHE = _KeyedTTLCache(ttl_seconds=_VERSIONED_TTL_SECONDS, max_entries=50, stale_seconds=600)
+_SMETA_DETAILS_TYPES_CACHE = _KeyedTTLCache(ttl_seconds=_VERSIONED_TTL_SECONDS, max_entries=50, stale_seconds=600)
+_MONTHLY_PAGE_CACHE = _KeyedTTLCache(ttl_seconds=_VERSIONED_TTL_SECONDS, max_entries=12, stale_seconds=600)
+# Month ranges: per-month entries are shared by every range that covers the month, so a
+# sliding range only queries the months it has not seen yet
+_RANGE_MONTH_CACHE = _KeyedTTLCache(ttl_seconds=_VERSIONED_TTL_SECONDS, max_entries=_RANGE_CACHE_MONTHS)
+_RANGE_CACHE = _KeyedTTLCache(ttl_seconds=_VERSIONED_TTL_SECONDS, max_entries=24, stale_seconds=600)
+# Columnar month slices for the drill-downs, only filled with MONTH_CUBE=1 (see month_cube)
+_MONTH_CUBE_CACHE = _KeyedTTLCache(ttl_seconds=_VERSIONED_TTL_SECONDS, max_entries=month_cube.cached_months())
+
+
+@data_version.on_change
+def _invalidate_caches():
+    """Drop every response cache at once when the data version moves."""
+    _MONTHS_CACHE.invalidate()
+    _LAST_LOADED_CACHE.invalidate()
+    for cache in (
+        _MONTH_AGGREGATE_CACHE,
+        _COMBINED_DASHBOARD_CACHE,
+        _DAILY_REVENUE_CACHE,
+        _SMETA_DETAILS_CACHE,
+        _SMETA_DETAILS_TYPES_CACHE,
+        _MONTHLY_PAGE_CACHE,
+        _MONTH_CUBE_CACHE,
+        _RANGE_MONTH_CACHE,
+        _RANGE_CACHE,
+    ):
+        cache.invalidate()
+
+
+def _versioned_key(*parts) -> Tuple:
+    """Build a cache key bound to the current data version."""
+    return (data_version.current_version(), *parts)
+
+
+def _dated_key(*parts) -> Tuple:
+    """Versioned key that also rolls over at UTC midnight.
+
+    For results that embed ``avg_daily_revenue``: it divides by the days elapsed
+    today, so it changes with the date even when the data version does not.
     """
-    if not description:
-        return ""
-    # Use SHA256 and take first 12 hex chars (48 bits = plenty of uniqueness)
-    hash_bytes = hashlib.sha256(description.encode('utf-8')).hexdigest()[:12]
-    return hash_bytes
+    return _versioned_key(*parts, datetime.utcnow().date())
 
 
-def register_description(description: str) -> str:
-    """Register a description and return its ID. Thread-safe."""
-    if not description:
-        return ""
-    desc_id = generate_description_id(description)
-    with _desc_map_lock:
-        _description_id_map[description] = desc_id
-        _id_description_map[desc_id] = description
-    return desc_id
+def _get_month_cube(month_key: str) -> Optional[month_cube.MonthCube]:
+    """Return the month's fact cube, or None when drill-downs should query Postgres."""
+    if not month_cube.enabled():
+        return None
+    return _MONTH_CUBE_CACHE.get_or_set(
+        _versioned_key(month_key),
+        lambda: month_cube.MonthCube(month_key, dashboard_repo.get_month_fact_slice(month_key)),
+    )
 
 
-def resolve_description_id(desc_id: str) -> Optional[str]:
-    """Resolve a description ID back to the original description string."""
-    if not desc_id:
-        return None
-    with _desc_map_lock:
-        return _id_description_map.get(desc_id)
+def _get_last_loaded_row() -> Optional[dict]:
+    """Return the last_loaded row, preferring the value tracked by the version watcher."""
+    loaded_at = data_version.current_loaded_at()
+    if loaded_at is not None:
+        return {"loaded_at": loaded_at}
+    return _LAST_LOADED_CACHE.get_or_set((), dashboard_repo.get_last_loaded_row)
 
 
 def smeta_key_to_ids(smeta_key: str) -> Sequence[int]:
@@ -156,37 +361,92 @@ def normalize_month(month: str) -> str:
     raise HTTPException(status_code=400, detail="invalid month format")
 
 
-def fetch_available_months(limit: Optional[int] = None) -> List[str]:
-    def _load_months():
-        months_set = set()
-        sources = [
-            dashboard_repo.get_months_from_plan_vs_fact_monthly,
-            dashboard_repo.get_months_from_plan_fact_backend,
-            dashboard_repo.get_months_from_fact_with_money,
-        ]
-
-        for source in sources:
+def normalize_month_range(month_from: str, month_to: Optional[str] = None) -> Tuple[str, str]:
+    """Validate a ``from``/``to`` pair of months (``to`` defaults to ``from``); both YYYY-MM."""
+    first = normalize_month(month_from)
+    last = normalize_month(month_to) if month_to else first
+    if last < first:
+        raise HTTPException(status_code=400, detail="invalid month range")
+    return first, last
+
+
+def merge_month_rows(row_sets: Sequence[Sequence[dict]]) -> List[str]:
+    """Merge month rows from several sources into a sorted (newest first) list of YYYY-MM."""
+    months_set = set()
+    for rows in row_sets:
+        for r in rows:
+            raw_month = r.get("month") or r.get("month_key") or r.get("month_start")
+            if not raw_month:
+                continue
             try:
-                rows = source()
-            except Exception:
+                normalized = normalize_month(str(raw_month))
+            except HTTPException:
                 continue
+            months_set.add(normalized)
+
+    return sorted(months_set, reverse=True)
 
-            for r in rows:
-                raw_month = r.get("month") or r.get("month_key") or r.get("month_start")
-                if not raw_month:
-                    continue
-                try:
-                    normalized = normalize_month(str(raw_month))
-                except HTTPException:
-                    continue
-                months_set.add(normalized)
 
-        return sorted(months_set, reverse=True)
+def _rows_or_empty(source):
+    """Wrap a months source so that a failing source contributes no rows."""
+    def _load():
+        try:
+            return source()
+        except Exception:
+            return []
+    return _load
 
-    months = _MONTHS_CACHE.get_or_set(_load_months)
+
+def catalog_rows(rows: Sequence[dict]) -> List[dict]:
+    """Normalize ``mv_months_catalog`` rows to ``{month, has_plan, has_fact}`` (newest first)."""
+    catalog = {}
+    for r in rows:
+        try:
+            month = normalize_month(str(r.get("month") or ""))
+        except HTTPException:
+            continue
+        catalog[month] = {"month": month, "has_plan": bool(r.get("has_plan")), "has_fact": bool(r.get("has_fact"))}
+    return [catalog[m] for m in sorted(catalog, reverse=True)]
+
+
+def catalog_rows_from_legacy(row_sets: Sequence[Sequence[dict]]) -> List[dict]:
+    """Build catalog rows from the three legacy month sources.
+
+    The plan/fact MVs list months with either plan or fact, so ``has_plan`` stays
+    unknown (None); ``has_fact`` comes from the fact source, which is the last set.
+    """
+    fact_months = set(merge_month_rows(row_sets[-1:]))
+    return [
+        {"month": month, "has_plan": None, "has_fact": month in fact_months}
+        for month in merge_month_rows(row_sets)
+    ]
+
+
+def _load_months_catalog() -> List[dict]:
+    try:
+        return catalog_rows(dashboard_repo.get_months_catalog())
+    except Exception:
+        logger.warning("mv_months_catalog is not available, falling back to DISTINCT month scans", exc_info=True)
+    sources = [
+        dashboard_repo.get_months_from_plan_vs_fact_monthly,
+        dashboard_repo.get_months_from_plan_fact_backend,
+        dashboard_repo.get_months_from_fact_with_money,
+    ]
+    # The three DISTINCT scans are independent, run them side by side
+    row_sets = run_concurrently(*(_rows_or_empty(source) for source in sources))
+    return catalog_rows_from_legacy(row_sets)
+
+
+def fetch_months_catalog(limit: Optional[int] = None) -> List[dict]:
+    """Return months with data (newest first) and whether each has plan and/or fact."""
+    catalog = _MONTHS_CACHE.get_or_set(_versioned_key(), _load_months_catalog)
     if limit is not None:
-        return months[:limit]
-    return months
+        return catalog[:limit]
+    return catalog
+
+
+def fetch_available_months(limit: Optional[int] = None) -> List[str]:
+    return [row["month"] for row in fetch_months_catalog(limit)]
 
 
 def validate_month(month: str):
@@ -232,12 +492,13 @@ def compute_plan_fact(month: str, plan_fact_row: Optional[dict] = None):
             r = dashboard_repo.sum_fact_vnereglament(month_key)
             fact_vnereglament = r.get("s") if r else 0
     else:
-        fact_vnereglament = fact_vnereglament or 0
+        # The backend MV keeps this column as numeric: emit a plain int like the other amounts
+        fact_vnereglament = _round_amount(fact_vnereglament)
 
     fact_total = row.get("fact_total") or (fact_leto + fact_zima + fact_vnereglament)
 
     return {
-        "month_key": row.get("month_key", month_key),
+        "month_key": row.get("month_key") or month_key,
         "plan_leto": plan_leto,
         "plan_zima": plan_zima,
         "plan_vnereglament": plan_vnereglament,
@@ -267,23 +528,69 @@ def compute_avg_daily_revenue(month_key: str, fact_total: int):
     return int(fact_total / denom) if denom else 0
 
 
-def build_monthly_summary(month_key: str, bundle: Optional[dict] = None):
-    plan_fact = compute_plan_fact(month_key, plan_fact_row=bundle)
-    summa_contract = compute_contract_amount(month_key, bundle)
+@dataclass(frozen=True)
+class MonthAggregate:
+    """Plan/fact figures of one month shared by the summary, by-smeta and combined responses.
+
+    Built from a single ``get_month_summary_bundle`` round trip and cached per
+    (data version, month), so these endpoints never query the month separately.
+    """
+
+    month_key: str
+    plan_fact: Dict[str, Any]
+    contract_amount: int
+    fact_total_all_months: int
+    items: List[dict]
+
+    @classmethod
+    def from_bundle(cls, month_key: str, bundle: Optional[dict], items: Optional[List[dict]] = None) -> "MonthAggregate":
+        """Build the aggregate from a bundle row; ``items`` is used if the bundle has none."""
+        bundle = dict(bundle) if bundle else {"month_key": month_key, "sum_fact_vnereglament": 0}
+        bundle_items = bundle.get("items")
+        if bundle_items is not None:
+            # items already comes as a list from PostgreSQL json_agg
+            items = bundle_items if isinstance(bundle_items, list) else []
+        return cls(
+            month_key=month_key,
+            plan_fact=compute_plan_fact(month_key, plan_fact_row=bundle),
+            contract_amount=bundle.get("contract_amount") or 0,
+            fact_total_all_months=bundle.get("fact_total_all_months") or 0,
+            items=items or [],
+        )
+
+
+def needs_monthly_items(bundle: Optional[dict]) -> bool:
+    """Whether the bundle lacks items and ``get_monthly_items`` must be queried."""
+    return not bundle or bundle.get("items") is None
+
+
+def _load_month_aggregate(month_key: str) -> MonthAggregate:
+    bundle = dashboard_repo.get_month_summary_bundle(month_key)
+    items = dashboard_repo.get_monthly_items(month_key) if needs_monthly_items(bundle) else None
+    return MonthAggregate.from_bundle(month_key, bundle, items)
+
+
+def get_month_aggregate(month: str) -> MonthAggregate:
+    """Return the month aggregate cached per data version and month."""
+    month_key = normalize_month(month)
+    return _MONTH_AGGREGATE_CACHE.get_or_set(
+        _versioned_key(month_key),
+        lambda: _load_month_aggregate(month_key),
+    )
+
+
+def build_monthly_summary(month_key: str, aggregate: Optional[MonthAggregate] = None):
+    aggregate = aggregate or get_month_aggregate(month_key)
+    plan_fact = aggregate.plan_fact
+    summa_contract = aggregate.contract_amount
     # For the contract card, use total executed amount across all available months
     # (do not filter by the selected month). This provides a cumulative 'Выполнено' value.
-    if bundle:
-        total_fact_all_months = bundle.get("fact_total_all_months") or 0
-    else:
-        total_fact_all_months = 0
-    if not total_fact_all_months and not bundle:
-        total_fact_row = dashboard_repo.get_total_fact_amount()
-        total_fact_all_months = total_fact_row["sum"] if total_fact_row else 0
+    total_fact_all_months = aggregate.fact_total_all_months
     contract_planfact_pct = float(total_fact_all_months / summa_contract) if summa_contract else None
-    avg_daily_revenue = compute_avg_daily_revenue(month_key, plan_fact["fact_total"])
+    avg_daily_revenue = compute_avg_daily_revenue(aggregate.month_key, plan_fact["fact_total"])
 
     return {
-        "month": month_key,
+        "month": aggregate.month_key,
         "contract": {
             "summa_contract": summa_contract,
             # show cumulative fact_total across all months for the contract card
@@ -299,8 +606,13 @@ def build_monthly_summary(month_key: str, bundle: Optional[dict] = None):
     }
 
 
-def build_monthly_by_smeta(month: str, plan_fact: Optional[dict] = None):
-    plan_fact = plan_fact or compute_plan_fact(month)
+def build_monthly_by_smeta(month: str, aggregate: Optional[MonthAggregate] = None):
+    aggregate = aggregate or get_month_aggregate(month)
+    return {"month": aggregate.month_key, "cards": smeta_cards(aggregate.plan_fact)}
+
+
+def smeta_cards(plan_fact: Dict[str, Any]) -> List[dict]:
+    """Plan/fact cards of the three smetas from a ``compute_plan_fact`` result."""
     cards = []
     plan_keys = {
         "leto": ("plan_leto", "fact_leto"),
@@ -317,11 +629,43 @@ def build_monthly_by_smeta(month: str, plan_fact: Optional[dict] = None):
                 "delta": plan_fact[fact_key] - plan_fact[plan_key],
             }
         )
-    return {"month": plan_fact["month_key"], "cards": cards}
+    return cards
 
 
-def _build_combined_dashboard_uncached(month_key: Optional[str]):
-    """Internal uncached implementation of combined dashboard builder."""
+def format_loaded_at(row: Optional[dict]) -> Optional[str]:
+    """Format the ``loaded_at`` value of a last_loaded row as ISO string."""
+    if not row:
+        return None
+    loaded = row.get("loaded_at")
+    if loaded is None:
+        return None
+    try:
+        return loaded.isoformat()
+    except Exception:
+        return str(loaded)
+
+
+def require_smeta_ids(smeta_key: str) -> Sequence[int]:
+    smeta_ids = smeta_key_to_ids(smeta_key)
+    if not smeta_ids:
+        raise HTTPException(status_code=400, detail="invalid smeta_key")
+    return smeta_ids
+
+
+def validate_date(date_value: str):
+    try:
+        datetime.strptime(date_value, "%Y-%m-%d")
+    except Exception:
+        raise HTTPException(status_code=400, detail="invalid date format")
+
+
+def assemble_combined_dashboard(
+    month_key: Optional[str],
+    available_months: List[str],
+    last_updated_row: Optional[dict],
+    aggregate: Optional[MonthAggregate] = None,
+):
+    """Build the combined dashboard response from the month aggregate and shared rows."""
     summary = {
         "planned_amount": None,
         "fact_amount": None,
@@ -333,14 +677,12 @@ def _build_combined_dashboard_uncached(month_key: Optional[str]):
         "average_daily_revenue": None,
         "daily_revenue": None,
     }
-    items: List[dict] = []
     cards: List[dict] = []
-    available_months = fetch_available_months(limit=24)
+    items: List[dict] = []
 
-    if month_key:
-        bundle = dashboard_repo.get_month_summary_bundle(month_key)
-        plan_fact = compute_plan_fact(month_key, plan_fact_row=bundle)
-        contract_amount = compute_contract_amount(month_key, bundle)
+    if month_key and aggregate is not None:
+        plan_fact = aggregate.plan_fact
+        contract_amount = aggregate.contract_amount
         contract_completion_pct = (float(plan_fact["fact_total"]) / contract_amount) if contract_amount else None
         avg_daily_revenue = compute_avg_daily_revenue(month_key, plan_fact["fact_total"])
 
@@ -357,31 +699,16 @@ def _build_combined_dashboard_uncached(month_key: Optional[str]):
             }
         )
 
-        # Use items from bundle (JSON array) instead of separate query
-        bundle_items = bundle.get("items") if bundle else None
-        if bundle_items is not None:
-            # items already comes as a list from PostgreSQL json_agg
-            items = bundle_items if isinstance(bundle_items, list) else []
-        else:
-            items = dashboard_repo.get_monthly_items(month_key)
+        items = aggregate.items
         # build cards for the three smeta categories (leto, zima, vnereglement)
         try:
-            cards = build_monthly_by_smeta(month_key, plan_fact)["cards"]
+            cards = build_monthly_by_smeta(month_key, aggregate)["cards"]
         except Exception:
             cards = []
 
-    last_updated_row = _LAST_LOADED_CACHE.get_or_set(dashboard_repo.get_last_loaded_row)
-    last_updated = None
-    if last_updated_row:
-        loaded = last_updated_row.get("loaded_at")
-        try:
-            last_updated = loaded.isoformat()
-        except Exception:
-            last_updated = str(loaded)
-
     return {
         "month": month_key or None,
-        "last_updated": last_updated,
+        "last_updated": format_loaded_at(last_updated_row),
         "summary": summary,
         "items": items,
         "cards": cards if month_key else [],
@@ -390,84 +717,115 @@ def _build_combined_dashboard_uncached(month_key: Optional[str]):
     }
 
 
+def _build_combined_dashboard_uncached(month_key: Optional[str]):
+    """Internal uncached implementation of combined dashboard builder."""
+    # Months list, month aggregate and last_loaded are independent: fetch them concurrently
+    available_months, aggregate, last_updated_row = run_concurrently(
+        lambda: fetch_available_months(limit=24),
+        lambda: get_month_aggregate(month_key) if month_key else None,
+        _get_last_loaded_row,
+    )
+    return assemble_combined_dashboard(month_key, available_months, last_updated_row, aggregate)
+
+
 def build_combined_dashboard(month: Optional[str]):
-    """Build combined dashboard with TTL caching by month."""
+    """Build combined dashboard cached per data version, month and UTC date."""
     month_key = normalize_month(month) if month else None
-    cache_key = (month_key,)
+    cache_key = _dated_key(month_key)
     return _COMBINED_DASHBOARD_CACHE.get_or_set(
         cache_key,
         lambda: _build_combined_dashboard_uncached(month_key)
     )
 
 
-def _build_monthly_smeta_details_uncached(month_key: str, smeta_key: str):
-    """Internal uncached implementation of monthly smeta details builder."""
-    smeta_ids = smeta_key_to_ids(smeta_key)
-    if not smeta_ids:
-        raise HTTPException(status_code=400, detail="invalid smeta_key")
-
-    include_plan = smeta_key != "vnereglement"
-    plan_smeta_id = smeta_ids[0] if include_plan else None
-
-    combined_rows = dashboard_repo.get_plan_fact_rows_by_smeta(month_key, plan_smeta_id, smeta_ids)
-
+def assemble_monthly_smeta_details(month_key: str, smeta_key: str, combined_rows: List[dict]):
     rows = []
     for r in combined_rows:
         plan_value = r.get("plan") or 0
         fact_value = r.get("fact") or 0
         if plan_value > 1 or fact_value > 1:
-            row = {
-                "description": r.get("description"),
-                "plan": plan_value,
-                "fact": fact_value,
-                "delta": fact_value - plan_value,
-            }
-            # Register description and add description_id to the row
-            row["description_id"] = register_description(row["description"])
-            rows.append(row)
+            description = r.get("description")
+            # Keys follow SmetaDetailRow field order so the fast JSON path matches the model
+            rows.append(
+                {
+                    "description": description,
+                    "description_id": register_description(description),
+                    "plan": plan_value,
+                    "fact": fact_value,
+                    "delta": fact_value - plan_value,
+                }
+            )
 
     return {"month": month_key, "smeta_key": smeta_key, "rows": rows}
 
 
+def smeta_details_plan_id(smeta_key: str, smeta_ids: Sequence[int]) -> Optional[int]:
+    """Return the smeta id carrying plan values (vnereglement has no plan)."""
+    include_plan = smeta_key != "vnereglement"
+    return smeta_ids[0] if include_plan else None
+
+
+def _build_monthly_smeta_details_uncached(month_key: str, smeta_key: str):
+    """Internal uncached implementation of monthly smeta details builder."""
+    smeta_ids = require_smeta_ids(smeta_key)
+    plan_smeta_id = smeta_details_plan_id(smeta_key, smeta_ids)
+
+    combined_rows = dashboard_repo.get_plan_fact_rows_by_smeta(month_key, plan_smeta_id, smeta_ids)
+    return assemble_monthly_smeta_details(month_key, smeta_key, combined_rows)
+
+
 def build_monthly_smeta_details(month: str, smeta_key: str):
-    """Build monthly smeta details with TTL caching by month and smeta_key."""
+    """Build monthly smeta details cached per data version, month and smeta_key."""
     month_key = normalize_month(month)
-    cache_key = (month_key, smeta_key)
+    cache_key = _versioned_key(month_key, smeta_key)
     return _SMETA_DETAILS_CACHE.get_or_set(
         cache_key,
         lambda: _build_monthly_smeta_details_uncached(month_key, smeta_key)
     )
 
 
-def build_monthly_smeta_description_daily_by_id(month: str, smeta_key: str, description_id: str):
-    """Build smeta description daily data using description_id instead of full description string."""
+def resolve_description_or_404(description_id: str) -> str:
     description = resolve_description_id(description_id)
     if not description:
-        raise HTTPException(status_code=404, detail="description_id not found - please load smeta details first")
-    return build_monthly_smeta_description_daily(month, smeta_key, description)
+        raise HTTPException(status_code=404, detail="description_id not found")
+    return description
+
+
+def build_monthly_smeta_description_daily_by_id(month: str, smeta_key: str, description_id: str):
+    """Build smeta description daily data using description_id instead of full description string."""
+    description = resolve_description_or_404(description_id)
+    return build_monthly_smeta_description_daily(month, smeta_key, description, resolve_description_ids(description_id))
 
 
-def build_monthly_smeta_description_daily(month: str, smeta_key: str, description: str):
+def build_monthly_smeta_description_daily(
+    month: str, smeta_key: str, description: str, description_ids: Sequence[int] = ()
+):
+    """Daily rows of one description; ``description_ids`` lets the query filter on id_description."""
     month_key = normalize_month(month)
-    smeta_ids = smeta_key_to_ids(smeta_key)
-    if not smeta_ids:
-        raise HTTPException(status_code=400, detail="invalid smeta_key")
+    smeta_ids = require_smeta_ids(smeta_key)
 
-    rows = dashboard_repo.get_description_daily_rows(month_key, description, smeta_ids)
+    cube = _get_month_cube(month_key)
+    if cube is not None:
+        rows = cube.description_daily_rows(description, smeta_ids)
+    elif description_ids:
+        rows = dashboard_repo.get_description_daily_rows_by_ids(month_key, description_ids, smeta_ids)
+    else:
+        rows = dashboard_repo.get_description_daily_rows(month_key, description, smeta_ids)
 
     return {"month": month_key, "smeta_key": smeta_key, "description": description, "rows": rows}
 
 
 def _build_monthly_daily_revenue_uncached(month_key: str):
     """Internal uncached implementation of monthly daily revenue builder."""
-    rows = dashboard_repo.get_monthly_daily_revenue_rows(month_key)
+    cube = _get_month_cube(month_key)
+    rows = cube.daily_revenue_rows() if cube is not None else dashboard_repo.get_monthly_daily_revenue_rows(month_key)
     return {"month": month_key, "rows": rows}
 
 
 def build_monthly_daily_revenue(month: str):
-    """Build monthly daily revenue with TTL caching by month."""
+    """Build monthly daily revenue cached per data version and month."""
     month_key = normalize_month(month)
-    cache_key = (month_key,)
+    cache_key = _versioned_key(month_key)
     return _DAILY_REVENUE_CACHE.get_or_set(
         cache_key,
         lambda: _build_monthly_daily_revenue_uncached(month_key)
@@ -477,17 +835,17 @@ def build_monthly_daily_revenue(month: str):
 def fetch_monthly_dates(month: str):
     """Return list of available dates (YYYY-MM-DD) for the given month."""
     month_key = normalize_month(month)
-    return dashboard_repo.get_monthly_dates(month_key)
-
-
-def build_daily(date_value: str):
+    cube = _get_month_cube(month_key)
+    if cube is not None:
+        return cube.dates()
     try:
-        datetime.strptime(date_value, "%Y-%m-%d")
+        return dashboard_repo.get_monthly_dates_from_catalog(month_key)
     except Exception:
-        raise HTTPException(status_code=400, detail="invalid date format")
+        logger.warning("mv_fact_dates_catalog is not available, falling back to mv_fact_daily_amounts", exc_info=True)
+    return dashboard_repo.get_monthly_dates(month_key)
 
-    rows = dashboard_repo.get_daily_rows(date_value)
 
+def assemble_daily(date_value: str, rows: List[dict]):
     # Business rule: include only rows where amount > 5
     filtered_rows = [r for r in rows if r.get("amount", 0) > 5]
 
@@ -496,24 +854,18 @@ def build_daily(date_value: str):
     return {"date": date_value, "rows": filtered_rows, "total": {"amount": total_amount}}
 
 
+def build_daily(date_value: str):
+    validate_date(date_value)
+    cube = _get_month_cube(date_value[:7])
+    rows = cube.daily_rows(date_value) if cube is not None else dashboard_repo.get_daily_rows(date_value)
+    return assemble_daily(date_value, rows)
+
+
 def build_last_loaded():
-    row = _LAST_LOADED_CACHE.get_or_set(dashboard_repo.get_last_loaded_row)
-    if not row:
-        return {"loaded_at": None}
-    loaded = row.get("loaded_at")
-    if loaded is None:
-        return {"loaded_at": None}
-    try:
-        return {"loaded_at": loaded.isoformat()}
-    except Exception:
-        return {"loaded_at": str(loaded)}
+    return {"loaded_at": format_loaded_at(_get_last_loaded_row())}
 
 
-def build_fact_by_type_of_work(month: str):
-    """Build aggregated fact amounts by type_of_work for modal display."""
-    month_key = normalize_month(month)
-    rows = dashboard_repo.get_fact_by_type_of_work(month_key)
-    
+def assemble_fact_by_type_of_work(month_key: str, rows: List[dict]):
     # Calculate total
     total = sum(r.get("amount", 0) for r in rows)
     
@@ -524,14 +876,15 @@ def build_fact_by_type_of_work(month: str):
     }
 
 
-def _build_smeta_details_with_types_uncached(month_key: str, smeta_key: str):
-    """Internal uncached implementation of smeta details with types builder."""
-    smeta_ids = smeta_key_to_ids(smeta_key)
-    if not smeta_ids:
-        raise HTTPException(status_code=400, detail="invalid smeta_key")
+def build_fact_by_type_of_work(month: str):
+    """Build aggregated fact amounts by type_of_work for modal display."""
+    month_key = normalize_month(month)
+    cube = _get_month_cube(month_key)
+    rows = cube.fact_by_type_of_work() if cube is not None else dashboard_repo.get_fact_by_type_of_work(month_key)
+    return assemble_fact_by_type_of_work(month_key, rows)
 
-    raw_rows = dashboard_repo.get_smeta_details_with_type_of_work(month_key, smeta_ids)
-    
+
+def assemble_smeta_details_with_types(month_key: str, smeta_key: str, raw_rows: List[dict]):
     # For vnereglement, set plan to 0
     is_vnereg = smeta_key == "vnereglement"
     
@@ -556,11 +909,344 @@ def _build_smeta_details_with_types_uncached(month_key: str, smeta_key: str):
     }
 
 
+def _build_smeta_details_with_types_uncached(month_key: str, smeta_key: str):
+    """Internal uncached implementation of smeta details with types builder."""
+    smeta_ids = require_smeta_ids(smeta_key)
+    cube = _get_month_cube(month_key)
+    if cube is not None:
+        # Only the plan half still comes from Postgres (mv_plan_vs_fact_monthly_ids)
+        plan_fact_rows = dashboard_repo.get_month_plan_fact_details(month_key, smeta_ids)
+        return smeta_details_with_types_from_rows(month_key, smeta_key, plan_fact_rows, cube.smeta_fact_rows(smeta_ids))
+    raw_rows = dashboard_repo.get_smeta_details_with_type_of_work(month_key, smeta_ids)
+    return assemble_smeta_details_with_types(month_key, smeta_key, raw_rows)
+
+
 def build_smeta_details_with_types(month: str, smeta_key: str):
-    """Build smeta details with type_of_work grouping with TTL caching."""
+    """Build smeta details with type_of_work grouping, cached per data version."""
     month_key = normalize_month(month)
-    cache_key = (month_key, smeta_key)
+    cache_key = _versioned_key(month_key, smeta_key)
     return _SMETA_DETAILS_TYPES_CACHE.get_or_set(
         cache_key,
         lambda: _build_smeta_details_with_types_uncached(month_key, smeta_key)
     )
+
+
+def _round_amount(value) -> int:
+    """Round an unrounded SQL sum the way ``numeric::int`` does (half away from zero)."""
+    return int(Decimal(str(value or 0)).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def page_smeta_ids() -> List[int]:
+    """All smeta ids shown on the monthly page (leto, zima and vnereglement)."""
+    return sorted({smeta_id for smeta_key in SMETA_LABELS for smeta_id in smeta_key_to_ids(smeta_key)})
+
+
+def _page_smeta_details(month_key: str, smeta_key: str, plan_fact_rows: List[dict]):
+    """Same result as ``build_monthly_smeta_details`` computed from the page's plan/fact rows."""
+    smeta_ids = smeta_key_to_ids(smeta_key)
+    plan_smeta_id = smeta_details_plan_id(smeta_key, smeta_ids)
+    plan: Dict[str, Any] = {}
+    fact: Dict[str, Any] = {}
+    for r in plan_fact_rows:
+        description = r.get("description")
+        if plan_smeta_id is not None and r.get("id_smeta") == plan_smeta_id:
+            plan[description] = plan.get(description, 0) + (r.get("plan") or 0)
+        if r.get("id_smeta") in smeta_ids:
+            fact[description] = fact.get(description, 0) + (r.get("fact") or 0)
+    combined_rows = [
+        {"description": description, "plan": _round_amount(plan.get(description)), "fact": _round_amount(fact.get(description))}
+        for description in {**plan, **fact}
+    ]
+    return assemble_monthly_smeta_details(month_key, smeta_key, combined_rows)
+
+
+def smeta_details_with_types_from_rows(month_key: str, smeta_key: str, plan_fact_rows: List[dict], smeta_fact_rows: List[dict]):
+    """Same result as ``build_smeta_details_with_types`` computed from per-smeta plan and fact rows.
+
+    Mirrors ``SMETA_DETAILS_WITH_TYPE_OF_WORK_SQL``: plan and fact are summed per
+    (id_smeta, description, type_of_work), then FULL OUTER JOINed on (id_smeta, description)
+    only, keeping the plan-side type_of_work first. NULL descriptions never join.
+    """
+    smeta_ids = smeta_key_to_ids(smeta_key)
+
+    def grouped(source: List[dict], amount_key: str) -> Dict[Tuple, Any]:
+        sums: Dict[Tuple, Any] = {}
+        for r in source:
+            if r.get("id_smeta") in smeta_ids:
+                key = (r.get("id_smeta"), r.get("description"), r.get("type_of_work"))
+                sums[key] = sums.get(key, 0) + (r.get(amount_key) or 0)
+        return {key: _round_amount(amount) for key, amount in sums.items()}
+
+    # Plan comes from mv_plan_vs_fact_monthly_ids, fact from mv_fact_daily_amounts
+    plan = grouped(plan_fact_rows, "plan")
+    fact = grouped(smeta_fact_rows, "amount")
+    fact_by_work: Dict[Tuple, List[Tuple]] = {}
+    for key in fact:
+        if key[1] is not None:
+            fact_by_work.setdefault(key[:2], []).append(key)
+
+    raw_rows = []
+    joined = set()
+    for plan_key, plan_amount in plan.items():
+        matches = fact_by_work.get(plan_key[:2], []) if plan_key[1] is not None else []
+        for fact_key in matches or [None]:
+            raw_rows.append({
+                "type_of_work": plan_key[2] if plan_key[2] is not None else (fact_key[2] if fact_key else None),
+                "description": plan_key[1],
+                "plan": plan_amount,
+                "fact": fact[fact_key] if fact_key else 0,
+            })
+        joined.update(matches)
+    raw_rows.extend(
+        {"type_of_work": key[2], "description": key[1], "plan": 0, "fact": amount}
+        for key, amount in fact.items() if key not in joined
+    )
+    raw_rows = [r for r in raw_rows if r["plan"] > 1 or r["fact"] > 1]
+    raw_rows.sort(key=lambda r: (r["type_of_work"] is None, r["type_of_work"] or "", -r["fact"]))
+    return assemble_smeta_details_with_types(month_key, smeta_key, raw_rows)
+
+
+def assemble_monthly_page(month_key: str, aggregate: MonthAggregate, plan_fact_rows: List[dict], fact_rows: List[dict]):
+    """Build every widget of the monthly page from the aggregate and the two per-MV passes.
+
+    ``plan_fact_rows`` come from ``get_month_plan_fact_details`` and ``fact_rows`` from
+    ``get_month_fact_breakdown``; each section matches its standalone endpoint.
+    """
+    breakdown: Dict[str, List[dict]] = {"date": [], "type_of_work": [], "smeta": []}
+    for r in fact_rows:
+        breakdown.setdefault(r.get("breakdown"), []).append(r)
+
+    daily_rows = sorted(
+        ({"date": r.get("date"), "amount": _round_amount(r.get("amount"))} for r in breakdown["date"]),
+        key=lambda r: r["date"],
+    )
+    type_rows = sorted(
+        (
+            {"type_of_work": r.get("type_of_work") or "Не указано", "amount": _round_amount(r.get("amount"))}
+            for r in breakdown["type_of_work"]
+        ),
+        key=lambda r: r["amount"],
+        reverse=True,
+    )
+
+    return {
+        "month": month_key,
+        "summary": build_monthly_summary(month_key, aggregate),
+        "by_smeta": build_monthly_by_smeta(month_key, aggregate),
+        "daily_revenue": {"month": month_key, "rows": daily_rows},
+        "fact_by_type_of_work": assemble_fact_by_type_of_work(month_key, type_rows),
+        "smeta_details": {
+            smeta_key: _page_smeta_details(month_key, smeta_key, plan_fact_rows)
+            for smeta_key in SMETA_LABELS
+        },
+        "smeta_details_with_types": {
+            smeta_key: smeta_details_with_types_from_rows(month_key, smeta_key, plan_fact_rows, breakdown["smeta"])
+            for smeta_key in SMETA_LABELS
+        },
+    }
+
+
+def _load_month_fact_breakdown(month_key: str) -> List[dict]:
+    cube = _get_month_cube(month_key)
+    if cube is not None:
+        return cube.fact_breakdown_rows()
+    return dashboard_repo.get_month_fact_breakdown(month_key)
+
+
+def _build_monthly_page_uncached(month_key: str):
+    """Internal uncached implementation of the monthly page builder."""
+    aggregate, plan_fact_rows, fact_rows = run_concurrently(
+        lambda: get_month_aggregate(month_key),
+        lambda: dashboard_repo.get_month_plan_fact_details(month_key, page_smeta_ids()),
+        lambda: _load_month_fact_breakdown(month_key),
+    )
+    return assemble_monthly_page(month_key, aggregate, plan_fact_rows, fact_rows)
+
+
+def build_monthly_page(month: str):
+    """Build every monthly widget in one response, cached per data version, month and UTC date."""
+    month_key = normalize_month(month)
+    return _MONTHLY_PAGE_CACHE.get_or_set(
+        _dated_key(month_key),
+        lambda: _build_monthly_page_uncached(month_key),
+    )
+
+
+# --- Month ranges ---
+
+
+def range_months(month_from: str, month_to: Optional[str] = None) -> List[str]:
+    """Months (YYYY-MM) of a ``from``/``to`` range, at most ``RANGE_MAX_MONTHS``."""
+    first, last = normalize_month_range(month_from, month_to)
+    year, month = int(first[:4]), int(first[5:7])
+    months = [first]
+    while months[-1] != last:
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        months.append(f"{year:04d}-{month:02d}")
+        if len(months) > RANGE_MAX_MONTHS:
+            raise HTTPException(status_code=400, detail=f"month range is longer than {RANGE_MAX_MONTHS} months")
+    return months
+
+
+def range_cached(cache: _KeyedTTLCache, months: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+    """Per-month entries of ``months`` already in ``cache`` and the span still to query.
+
+    The span runs from the first to the last month missing from the cache, so it is
+    fetched in one query (months cached in between are simply recomputed).
+    """
+    cached = {m: cache.peek(_versioned_key(m)) for m in months}
+    missing = [i for i, m in enumerate(months) if cached[m] is None]
+    return cached, months[missing[0]:missing[-1] + 1] if missing else []
+
+
+def range_store(cache: _KeyedTTLCache, cached: Dict[str, Any], entries: Dict[str, Any]):
+    """Cache freshly computed per-month ``entries`` and add them to ``cached``."""
+    for month_key, entry in entries.items():
+        cached[month_key] = cache.get_or_set(_versioned_key(month_key), lambda entry=entry: entry)
+
+
+def assemble_range_month(month_key: str, row: Optional[dict]) -> dict:
+    """Plan/fact by smeta and cumulative fact vs contract of one month of a range."""
+    # Without a row there is no data for the month: zeros, no fallback queries
+    plan_fact = compute_plan_fact(month_key, plan_fact_row=row or {"month_key": month_key, "sum_fact_vnereglament": 0})
+    row = row or {}
+    contract_amount = row.get("contract_amount") or 0
+    fact_cumulative = int(row.get("fact_cumulative") or 0)
+    return {
+        "month": month_key,
+        "plan_total": plan_fact["plan_total"],
+        "fact_total": plan_fact["fact_total"],
+        "delta": plan_fact["fact_total"] - plan_fact["plan_total"],
+        "cards": smeta_cards(plan_fact),
+        "contract": {
+            "summa_contract": contract_amount,
+            "fact_cumulative": fact_cumulative,
+            "contract_planfact_pct": float(fact_cumulative / contract_amount) if contract_amount else None,
+        },
+    }
+
+
+def range_month_entries(span: List[str], rows: List[dict]) -> Dict[str, dict]:
+    by_month = {r.get("month_key"): r for r in rows}
+    return {month_key: assemble_range_month(month_key, by_month.get(month_key)) for month_key in span}
+
+
+def assemble_monthly_range(months: List[str], entries: Dict[str, dict]) -> dict:
+    rows = [entries[m] for m in months]
+    plan_total = sum(r["plan_total"] for r in rows)
+    fact_total = sum(r["fact_total"] for r in rows)
+    return {
+        "month_from": months[0],
+        "month_to": months[-1],
+        "months": rows,
+        "totals": {"plan_total": plan_total, "fact_total": fact_total, "delta": fact_total - plan_total},
+    }
+
+
+def daily_revenue_entries(span: List[str], rows: List[dict]) -> Dict[str, dict]:
+    """Split range daily revenue rows into ``build_monthly_daily_revenue`` results per month."""
+    entries = {month_key: {"month": month_key, "rows": []} for month_key in span}
+    for r in rows:
+        entries[r["date"][:7]]["rows"].append(r)
+    return entries
+
+
+def assemble_daily_revenue_range(months: List[str], entries: Dict[str, dict]) -> dict:
+    return {
+        "month_from": months[0],
+        "month_to": months[-1],
+        "rows": [r for m in months for r in entries[m]["rows"]],
+    }
+
+
+def _build_monthly_range_uncached(months: List[str]):
+    cached, span = range_cached(_RANGE_MONTH_CACHE, months)
+    if span:
+        rows = dashboard_repo.get_range_plan_fact(span[0], span[-1])
+        range_store(_RANGE_MONTH_CACHE, cached, range_month_entries(span, rows))
+    return assemble_monthly_range(months, cached)
+
+
+def build_monthly_range(month_from: str, month_to: Optional[str] = None):
+    """Per-month plan/fact by smeta and cumulative fact vs contract over a range of months."""
+    months = range_months(month_from, month_to)
+    return _RANGE_CACHE.get_or_set(
+        _versioned_key("monthly", months[0], months[-1]),
+        lambda: _build_monthly_range_uncached(months),
+    )
+
+
+def _build_daily_revenue_range_uncached(months: List[str]):
+    # Months are shared with build_monthly_daily_revenue through its cache
+    cached, span = range_cached(_DAILY_REVENUE_CACHE, months)
+    if span:
+        rows = dashboard_repo.get_range_daily_revenue_rows(span[0], span[-1])
+        range_store(_DAILY_REVENUE_CACHE, cached, daily_revenue_entries(span, rows))
+    return assemble_daily_revenue_range(months, cached)
+
+
+def build_daily_revenue_range(month_from: str, month_to: Optional[str] = None):
+    """Revenue of every day of a range of months."""
+    months = range_months(month_from, month_to)
+    return _RANGE_CACHE.get_or_set(
+        _versioned_key("daily_revenue", months[0], months[-1]),
+        lambda: _build_daily_revenue_range_uncached(months),
+    )
+
+
+# --- Cache pre-warming ---
+
+
+def _prewarm_months() -> int:
+    env_months = os.environ.get("CACHE_PREWARM_MONTHS")
+    return int(env_months) if env_months else 2
+
+
+def prewarm(months: Optional[int] = None) -> List[str]:
+    """Build the combined dashboard and the monthly pages of the latest months with fact.
+
+    ``months`` defaults to ``CACHE_PREWARM_MONTHS`` (2). Returns the warmed months.
+    """
+    count = _prewarm_months() if months is None else months
+    if count <= 0:
+        return []
+    started = monotonic()
+    warmed = [row["month"] for row in fetch_months_catalog() if row.get("has_fact") is not False][:count]
+    build_combined_dashboard(None)
+    for month_key in warmed:
+        build_monthly_page(month_key)
+    metrics.CACHE_PREWARM_SECONDS.observe(monotonic() - started)
+    logger.info("Pre-warmed dashboard caches for %s in %.1fs", ", ".join(warmed) or "-", monotonic() - started)
+    return warmed
+
+
+def _prewarm_in_background():
+    try:
+        prewarm()
+    except Exception:
+        logger.warning("Cache pre-warm failed", exc_info=True)
+
+
+_prewarm_lock = Lock()
+_prewarm_thread: Optional[Thread] = None
+
+
+@data_version.on_change
+def _prewarm_on_data_change():
+    """Rebuild the latest months once the data version moves (after ``_invalidate_caches``)."""
+    global _prewarm_thread
+    if _prewarm_months() > 0:
+        thread = Thread(target=_prewarm_in_background, name="cache-prewarm", daemon=True)
+        with _prewarm_lock:
+            _prewarm_thread = thread
+        thread.start()
+
+
+def wait_for_prewarm(timeout: Optional[float] = None) -> bool:
+    """Wait for the pre-warm started by the latest version change; False on timeout."""
+    with _prewarm_lock:
+        thread = _prewarm_thread
+    if thread is None:
+        return True
+    thread.join(timeout)
+    return not thread.is_alive()
@@ -0,0 +1,266 @@
+"""Async variants of the dashboard builders for the DB_ASYNC data path.
+
+Each builder awaits ``dashboard_repo_async`` instead of the sync repository and reuses
+the validation, assembly helpers and caches of ``dashboard_service``, so both paths
+return identical responses and share cached entries.
+"""
+
+from typing import List, Optional
+
+from app.backend.repositories import dashboard_repo_async
+from app.backend.services import dashboard_service as svc
+from app.backend.services import data_version, month_cube
+from app.backend.services.concurrency import arun_concurrently
+
+
+async def _get_last_loaded_row() -> Optional[dict]:
+    loaded_at = data_version.current_loaded_at()
+    if loaded_at is not None:
+        return {"loaded_at": loaded_at}
+    return await svc._LAST_LOADED_CACHE.aget_or_set((), dashboard_repo_async.get_last_loaded_row)
+
+
+async def _load_month_cube(month_key: str) -> month_cube.MonthCube:
+    return month_cube.MonthCube(month_key, await dashboard_repo_async.get_month_fact_slice(month_key))
+
+
+async def _get_month_cube(month_key: str) -> Optional[month_cube.MonthCube]:
+    if not month_cube.enabled():
+        return None
+    return await svc._MONTH_CUBE_CACHE.aget_or_set(
+        svc._versioned_key(month_key),
+        lambda: _load_month_cube(month_key),
+    )
+
+
+def _rows_or_empty(source):
+    async def _load():
+        try:
+            return await source()
+        except Exception:
+            return []
+    return _load
+
+
+async def _load_months_catalog() -> List[dict]:
+    try:
+        return svc.catalog_rows(await dashboard_repo_async.get_months_catalog())
+    except Exception:
+        svc.logger.warning("mv_months_catalog is not available, falling back to DISTINCT month scans", exc_info=True)
+    sources = [
+        dashboard_repo_async.get_months_from_plan_vs_fact_monthly,
+        dashboard_repo_async.get_months_from_plan_fact_backend,
+        dashboard_repo_async.get_months_from_fact_with_money,
+    ]
+    row_sets = await arun_concurrently(*(_rows_or_empty(source) for source in sources))
+    return svc.catalog_rows_from_legacy(row_sets)
+
+
+async def fetch_months_catalog(limit: Optional[int] = None) -> List[dict]:
+    catalog = await svc._MONTHS_CACHE.aget_or_set(svc._versioned_key(), _load_months_catalog)
+    if limit is not None:
+        return catalog[:limit]
+    return catalog
+
+
+async def fetch_available_months(limit: Optional[int] = None) -> List[str]:
+    return [row["month"] for row in await fetch_months_catalog(limit)]
+
+
+async def _load_month_aggregate(month_key: str) -> svc.MonthAggregate:
+    bundle = await dashboard_repo_async.get_month_summary_bundle(month_key)
+    items = await dashboard_repo_async.get_monthly_items(month_key) if svc.needs_monthly_items(bundle) else None
+    return svc.MonthAggregate.from_bundle(month_key, bundle, items)
+
+
+async def get_month_aggregate(month: str) -> svc.MonthAggregate:
+    month_key = svc.normalize_month(month)
+    return await svc._MONTH_AGGREGATE_CACHE.aget_or_set(
+        svc._versioned_key(month_key),
+        lambda: _load_month_aggregate(month_key),
+    )
+
+
+async def build_monthly_summary(month_key: str):
+    return svc.build_monthly_summary(month_key, await get_month_aggregate(month_key))
+
+
+async def build_monthly_by_smeta(month: str):
+    return svc.build_monthly_by_smeta(month, await get_month_aggregate(month))
+
+
+async def _no_aggregate():
+    return None
+
+
+async def _build_combined_dashboard_uncached(month_key: Optional[str]):
+    available_months, aggregate, last_updated_row = await arun_concurrently(
+        lambda: fetch_available_months(limit=24),
+        (lambda: get_month_aggregate(month_key)) if month_key else _no_aggregate,
+        _get_last_loaded_row,
+    )
+    return svc.assemble_combined_dashboard(month_key, available_months, last_updated_row, aggregate)
+
+
+async def build_combined_dashboard(month: Optional[str]):
+    month_key = svc.normalize_month(month) if month else None
+    return await svc._COMBINED_DASHBOARD_CACHE.aget_or_set(
+        svc._dated_key(month_key),
+        lambda: _build_combined_dashboard_uncached(month_key),
+    )
+
+
+async def _build_monthly_smeta_details_uncached(month_key: str, smeta_key: str):
+    smeta_ids = svc.require_smeta_ids(smeta_key)
+    plan_smeta_id = svc.smeta_details_plan_id(smeta_key, smeta_ids)
+    combined_rows = await dashboard_repo_async.get_plan_fact_rows_by_smeta(month_key, plan_smeta_id, smeta_ids)
+    return svc.assemble_monthly_smeta_details(month_key, smeta_key, combined_rows)
+
+
+async def build_monthly_smeta_details(month: str, smeta_key: str):
+    month_key = svc.normalize_month(month)
+    return await svc._SMETA_DETAILS_CACHE.aget_or_set(
+        svc._versioned_key(month_key, smeta_key),
+        lambda: _build_monthly_smeta_details_uncached(month_key, smeta_key),
+    )
+
+
+async def build_monthly_smeta_description_daily_by_id(month: str, smeta_key: str, description_id: str):
+    description = svc.resolve_description_or_404(description_id)
+    month_key = svc.normalize_month(month)
+    smeta_ids = svc.require_smeta_ids(smeta_key)
+    cube = await _get_month_cube(month_key)
+    description_ids = svc.resolve_description_ids(description_id)
+    if cube is not None:
+        rows = cube.description_daily_rows(description, smeta_ids)
+    elif description_ids:
+        rows = await dashboard_repo_async.get_description_daily_rows_by_ids(month_key, description_ids, smeta_ids)
+    else:
+        rows = await dashboard_repo_async.get_description_daily_rows(month_key, description, smeta_ids)
+    return {"month": month_key, "smeta_key": smeta_key, "description": description, "rows": rows}
+
+
+async def _build_monthly_daily_revenue_uncached(month_key: str):
+    cube = await _get_month_cube(month_key)
+    rows = cube.daily_revenue_rows() if cube is not None else await dashboard_repo_async.get_monthly_daily_revenue_rows(month_key)
+    return {"month": month_key, "rows": rows}
+
+
+async def build_monthly_daily_revenue(month: str):
+    month_key = svc.normalize_month(month)
+    return await svc._DAILY_REVENUE_CACHE.aget_or_set(
+        svc._versioned_key(month_key),
+        lambda: _build_monthly_daily_revenue_uncached(month_key),
+    )
+
+
+async def fetch_monthly_dates(month: str):
+    month_key = svc.normalize_month(month)
+    cube = await _get_month_cube(month_key)
+    if cube is not None:
+        return cube.dates()
+    try:
+        return await dashboard_repo_async.get_monthly_dates_from_catalog(month_key)
+    except Exception:
+        svc.logger.warning("mv_fact_dates_catalog is not available, falling back to mv_fact_daily_amounts", exc_info=True)
+    return await dashboard_repo_async.get_monthly_dates(month_key)
+
+
+async def build_daily(date_value: str):
+    svc.validate_date(date_value)
+    cube = await _get_month_cube(date_value[:7])
+    rows = cube.daily_rows(date_value) if cube is not None else await dashboard_repo_async.get_daily_rows(date_value)
+    return svc.assemble_daily(date_value, rows)
+
+
+async def build_last_loaded():
+    return {"loaded_at": svc.format_loaded_at(await _get_last_loaded_row())}
+
+
+async def build_fact_by_type_of_work(month: str):
+    month_key = svc.normalize_month(month)
+    cube = await _get_month_cube(month_key)
+    rows = cube.fact_by_type_of_work() if cube is not None else await dashboard_repo_async.get_fact_by_type_of_work(month_key)
+    return svc.assemble_fact_by_type_of_work(month_key, rows)
+
+
+async def _build_smeta_details_with_types_uncached(month_key: str, smeta_key: str):
+    smeta_ids = svc.require_smeta_ids(smeta_key)
+    cube = await _get_month_cube(month_key)
+    if cube is not None:
+        plan_fact_rows = await dashboard_repo_async.get_month_plan_fact_details(month_key, smeta_ids)
+        return svc.smeta_details_with_types_from_rows(month_key, smeta_key, plan_fact_rows, cube.smeta_fact_rows(smeta_ids))
+    raw_rows = await dashboard_repo_async.get_smeta_details_with_type_of_work(month_key, smeta_ids)
+    return svc.assemble_smeta_details_with_types(month_key, smeta_key, raw_rows)
+
+
+async def build_smeta_details_with_types(month: str, smeta_key: str):
+    month_key = svc.normalize_month(month)
+    return await svc._SMETA_DETAILS_TYPES_CACHE.aget_or_set(
+        svc._versioned_key(month_key, smeta_key),
+        lambda: _build_smeta_details_with_types_uncached(month_key, smeta_key),
+    )
+
+
+async def _load_month_fact_breakdown(month_key: str) -> List[dict]:
+    cube = await _get_month_cube(month_key)
+    if cube is not None:
+        return cube.fact_breakdown_rows()
+    return await dashboard_repo_async.get_month_fact_breakdown(month_key)
+
+
+async def _build_monthly_page_uncached(month_key: str):
+    aggregate, plan_fact_rows, fact_rows = await arun_concurrently(
+        lambda: get_month_aggregate(month_key),
+        lambda: dashboard_repo_async.get_month_plan_fact_details(month_key, svc.page_smeta_ids()),
+        lambda: _load_month_fact_breakdown(month_key),
+    )
+    return svc.assemble_monthly_page(month_key, aggregate, plan_fact_rows, fact_rows)
+
+
+async def build_monthly_page(month: str):
+    month_key = svc.normalize_month(month)
+    return await svc._MONTHLY_PAGE_CACHE.aget_or_set(
+        svc._dated_key(month_key),
+        lambda: _build_monthly_page_uncached(month_key),
+    )
+
+
+async def _range_store(cache, cached: dict, entries: dict):
+    # Same as svc.range_store without blocking the loop on another caller's computation
+    for month_key, entry in entries.items():
+        async def _entry(entry=entry):
+            return entry
+        cached[month_key] = await cache.aget_or_set(svc._versioned_key(month_key), _entry)
+
+
+async def _build_monthly_range_uncached(months: List[str]):
+    cached, span = svc.range_cached(svc._RANGE_MONTH_CACHE, months)
+    if span:
+        rows = await dashboard_repo_async.get_range_plan_fact(span[0], span[-1])
+        await _range_store(svc._RANGE_MONTH_CACHE, cached, svc.range_month_entries(span, rows))
+    return svc.assemble_monthly_range(months, cached)
+
+
+async def build_monthly_range(month_from: str, month_to: Optional[str] = None):
+    months = svc.range_months(month_from, month_to)
+    return await svc._RANGE_CACHE.aget_or_set(
+        svc._versioned_key("monthly", months[0], months[-1]),
+        lambda: _build_monthly_range_uncached(months),
+    )
+
+
+async def _build_daily_revenue_range_uncached(months: List[str]):
+    cached, span = svc.range_cached(svc._DAILY_REVENUE_CACHE, months)
+    if span:
+        rows = await dashboard_repo_async.get_range_daily_revenue_rows(span[0], span[-1])
+        await _range_store(svc._DAILY_REVENUE_CACHE, cached, svc.daily_revenue_entries(span, rows))
+    return svc.assemble_daily_revenue_range(months, cached)
+
+
+async def build_daily_revenue_range(month_from: str, month_to: Optional[str] = None):
+    months = svc.range_months(month_from, month_to)
+    return await svc._RANGE_CACHE.aget_or_set(
+        svc._versioned_key("daily_revenue", months[0], months[-1]),
+        lambda: _build_daily_revenue_range_uncached(months),
+    )
@@ -0,0 +1,157 @@
+"""Data version tracking for the response caches.
+
+Dashboard data only changes when the ETL writes ``last_loaded`` and rebuilds the
+materialized views. One background watcher per process follows that value, either by
+polling it or by listening on a Postgres ``LISTEN/NOTIFY`` channel, and the response
+caches are keyed by it: entries stay valid until the version moves and are all dropped
+at once when it does. Requests only read the in-memory value and never hit the DB for it.
+"""
+
+import logging
+import os
+import select
+import threading
+from typing import Any, Callable, List, Optional
+
+import psycopg2
+from psycopg2 import sql
+
+from app.backend.repositories import dashboard_repo
+
+logger = logging.getLogger(__name__)
+
+_version: Optional[str] = None
+_loaded_at: Any = None
+_listeners: List[Callable[[], None]] = []
+_lock = threading.Lock()
+_watcher: Optional["DataVersionWatcher"] = None
+
+
+def current_version() -> Optional[str]:
+    """Return the current data version or None if it has not been read yet."""
+    return _version
+
+
+def current_loaded_at():
+    """Return the raw ``last_loaded`` value behind the current version."""
+    return _loaded_at
+
+
+def on_change(callback: Callable[[], None]) -> Callable[[], None]:
+    """Register ``callback`` to be called every time the data version moves."""
+    with _lock:
+        _listeners.append(callback)
+    return callback
+
+
+def _version_of(loaded_at) -> Optional[str]:
+    if loaded_at is None:
+        return None
+    try:
+        return loaded_at.isoformat()
+    except Exception:
+        return str(loaded_at)
+
+
+def set_loaded_at(loaded_at) -> bool:
+    """Record a freshly read ``last_loaded`` value. Returns True if the version moved."""
+    global _version, _loaded_at
+    version = _version_of(loaded_at)
+    with _lock:
+        if version == _version:
+            return False
+        previous = _version
+        _version = version
+        _loaded_at = loaded_at
+        listeners = list(_listeners)
+    logger.info("Data version changed: %s -> %s", previous, version)
+    for callback in listeners:
+        try:
+            callback()
+        except Exception:
+            logger.exception("Data version listener %r failed", callback)
+    return True
+
+
+def refresh() -> Optional[str]:
+    """Read ``last_loaded`` from the database and update the current version."""
+    row = dashboard_repo.get_last_loaded_row()
+    set_loaded_at(row.get("loaded_at") if row else None)
+    return _version
+
+
+class DataVersionWatcher(threading.Thread):
+    """Background thread that keeps the data version in sync with ``last_loaded``.
+
+    Without a channel it polls ``last_loaded`` every ``poll_seconds``. With a channel it
+    holds a dedicated connection in ``LISTEN`` mode and re-reads ``last_loaded`` as soon
+    as the ETL sends a ``NOTIFY``, still polling every ``poll_seconds`` in case a
+    notification was missed while reconnecting.
+    """
+
+    def __init__(self, dsn: Optional[str], poll_seconds: float, channel: Optional[str] = None):
+        super().__init__(name="data-version-watcher", daemon=True)
+        self.dsn = dsn
+        self.poll_seconds = poll_seconds
+        self.channel = channel
+        self._stop_event = threading.Event()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        self.join(timeout)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                if self.channel and self.dsn:
+                    self._listen()
+                else:
+                    refresh()
+                    self._stop_event.wait(self.poll_seconds)
+            except Exception:
+                logger.exception("Data version watcher failed, retrying in %ss", self.poll_seconds)
+                self._stop_event.wait(self.poll_seconds)
+
+    def _listen(self):
+        conn = psycopg2.connect(self.dsn)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+            refresh()
+            while not self._stop_event.is_set():
+                ready, _, _ = select.select([conn], [], [], self.poll_seconds)
+                if ready:
+                    conn.poll()
+                    if not conn.notifies:
+                        continue
+                    conn.notifies.clear()
+                refresh()
+        finally:
+            conn.close()
+
+
+def start_watcher(dsn: Optional[str], poll_seconds: float | None = None, channel: str | None = None):
+    """Start the per-process watcher.
+
+    If `poll_seconds`/`channel` are not provided, read `DATA_VERSION_POLL_SECONDS`
+    (default 5) and `DATA_VERSION_CHANNEL` (LISTEN/NOTIFY is off when unset) from
+    environment variables.
+    """
+    global _watcher
+    with _lock:
+        if _watcher is not None:
+            return
+        env_poll = os.environ.get("DATA_VERSION_POLL_SECONDS")
+        poll = poll_seconds if poll_seconds is not None else float(env_poll) if env_poll else 5.0
+        chan = channel if channel is not None else os.environ.get("DATA_VERSION_CHANNEL") or None
+        _watcher = DataVersionWatcher(dsn, poll, chan)
+        _watcher.start()
+
+
+def stop_watcher():
+    global _watcher
+    with _lock:
+        watcher, _watcher = _watcher, None
+    if watcher is not None:
+        watcher.stop(timeout=5)
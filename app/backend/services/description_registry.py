@@ -0,0 +1,109 @@
+"""Registry of short ``description_id`` values for work descriptions.
+
+Every description in ``work_description`` is indexed once per data version (the data
+version watcher fires on startup and on every ETL load), so any uvicorn worker resolves
+a ``description_id`` in O(1) right after startup, without first serving smeta details.
+Each id also maps to the ``id_description`` values sharing that text, which lets the
+daily drill-down filter ``mv_fact_daily_amounts`` on the integer column.
+
+Descriptions missing from ``work_description`` are still registered on the fly when a
+response includes them, as before.
+"""
+
+import hashlib
+import logging
+from threading import RLock
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.backend.repositories import dashboard_repo
+from app.backend.services import data_version
+
+logger = logging.getLogger(__name__)
+
+_description_id_map: Dict[str, str] = {}  # description -> id
+_id_description_map: Dict[str, str] = {}  # id -> description
+_id_description_ids: Dict[str, Tuple[int, ...]] = {}  # id -> id_description values
+_lock = RLock()
+
+
+def generate_description_id(description: str) -> str:
+    """Generate a short, URL-safe ID from description using SHA256 hash.
+
+    The ID is 12 characters long (base16), which gives us ~2.8 * 10^14
+    possible values - more than enough for our use case while keeping
+    URLs reasonably short.
+    """
+    if not description:
+        return ""
+    # Use SHA256 and take first 12 hex chars (48 bits = plenty of uniqueness)
+    hash_bytes = hashlib.sha256(description.encode('utf-8')).hexdigest()[:12]
+    return hash_bytes
+
+
+def register_description(description: str) -> str:
+    """Return the ID of a description, registering it if it is not indexed yet. Thread-safe."""
+    if not description:
+        return ""
+    desc_id = _description_id_map.get(description)
+    if desc_id is not None:
+        return desc_id
+    desc_id = generate_description_id(description)
+    with _lock:
+        _description_id_map[description] = desc_id
+        _id_description_map[desc_id] = description
+    return desc_id
+
+
+def resolve_description_id(desc_id: str) -> Optional[str]:
+    """Resolve a description ID back to the original description string."""
+    if not desc_id:
+        return None
+    return _id_description_map.get(desc_id)
+
+
+def resolve_description_ids(desc_id: str) -> Tuple[int, ...]:
+    """Return the ``id_description`` values behind a description ID (empty if unknown)."""
+    if not desc_id:
+        return ()
+    return _id_description_ids.get(desc_id, ())
+
+
+def load(rows: Sequence[dict]) -> int:
+    """Index ``work_description`` rows (``id_description``, ``description``).
+
+    The new index replaces the previous one in a single swap; descriptions registered
+    on the fly are kept. Returns the number of indexed description IDs.
+    """
+    global _description_id_map, _id_description_map, _id_description_ids
+    description_ids: Dict[str, str] = {}
+    id_descriptions: Dict[str, str] = {}
+    id_ids: Dict[str, list] = {}
+    for r in rows:
+        description = r.get("description")
+        if not description:
+            continue
+        desc_id = description_ids.get(description) or _description_id_map.get(description)
+        if desc_id is None:
+            desc_id = generate_description_id(description)
+        description_ids[description] = desc_id
+        id_descriptions[desc_id] = description
+        if r.get("id_description") is not None:
+            id_ids.setdefault(desc_id, []).append(int(r["id_description"]))
+
+    with _lock:
+        _description_id_map = {**_description_id_map, **description_ids}
+        _id_description_map = {**_id_description_map, **id_descriptions}
+        _id_description_ids = {desc_id: tuple(sorted(ids)) for desc_id, ids in id_ids.items()}
+    return len(id_descriptions)
+
+
+def refresh() -> int:
+    """Reload the index from ``work_description``."""
+    count = load(dashboard_repo.get_work_descriptions())
+    logger.info("Description registry loaded: %s descriptions", count)
+    return count
+
+
+@data_version.on_change
+def _refresh_on_data_change():
+    refresh()
@@ -0,0 +1,231 @@
+"""Streaming CSV/XLSX exports of the drill-down tables over a range of months.
+
+Rows are read through a server-side cursor (``db.server_cursor``) in batches of
+``DB_STREAM_BATCH_ROWS`` and every batch is encoded and handed to the response before the
+next one is fetched, so an export of any length runs in flat memory and its first bytes
+go out as soon as the query is declared.
+
+CSV is UTF-8 with a BOM and ``;`` separators, which is what Excel expects with Russian
+locale settings. XLSX is written as a zip stream (``zipfile`` supports unseekable
+outputs) with a single sheet of inline strings, so no library has to hold the workbook
+in memory before saving it.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, ContextManager, Iterator, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from fastapi import HTTPException
+
+from app.backend.repositories import dashboard_repo
+from app.backend.services import dashboard_service
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+DAILY_HEADERS = ("Дата", "Работа", "Ед. изм.", "Объём", "Сумма")
+SMETA_DETAILS_HEADERS = ("Месяц", "Тип работ", "Работа", "План", "Факт", "Отклонение")
+DESCRIPTION_DAILY_HEADERS = ("Дата", "Объём", "Ед. изм.", "Сумма")
+ITEMS_HEADERS = ("Месяц", "Смета", "Работа", "План", "Факт")
+
+
+@dataclass
+class ExportStream:
+    filename: str
+    media_type: str
+    chunks: Iterator[bytes]
+
+
+def _batches(open_cursor: Callable[[], ContextManager], transform: Optional[Callable[[tuple], tuple]]) -> Iterator[List[tuple]]:
+    with open_cursor() as cur:
+        yield []  # the query is declared: let the writer send its header
+        while True:
+            rows = cur.fetchmany(cur.itersize)
+            if not rows:
+                return
+            yield [transform(row) for row in rows] if transform else rows
+
+
+def _csv_chunks(headers: Sequence[str], batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";", lineterminator="\r\n")
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    for batch in batches:
+        writer.writerows(batch)
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        yield data.encode("utf-8")
+
+
+# --- Minimal streaming XLSX ---
+
+_XML_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_XLSX_PARTS = (
+    ("[Content_Types].xml", _XML_HEAD
+     + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+     '<Default Extension="xml" ContentType="application/xml"/>'
+     '<Override PartName="/xl/workbook.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+     '<Override PartName="/xl/worksheets/sheet1.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+     '</Types>'),
+    ("_rels/.rels", _XML_HEAD
+     + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" Target="xl/workbook.xml" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+     '</Relationships>'),
+    ("xl/_rels/workbook.xml.rels", _XML_HEAD
+     + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+     '</Relationships>'),
+)
+_WORKBOOK_XML = (
+    _XML_HEAD
+    + '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+_SHEET_HEAD = (
+    _XML_HEAD
+    + '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+# Characters XML 1.0 does not allow
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class _Sink:
+    """Unseekable file collecting what ``ZipFile`` writes until it is taken."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _xlsx_cell(value) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_INVALID_XML_CHARS.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values: Sequence) -> str:
+    return "<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+def _xlsx_chunks(sheet_name: str, headers: Sequence[str], batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS:
+            archive.writestr(name, content)
+        archive.writestr("xl/workbook.xml", _WORKBOOK_XML.format(name=escape(sheet_name[:31])))
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((_SHEET_HEAD + _xlsx_row(headers)).encode("utf-8"))
+            for batch in batches:
+                sheet.write("".join(_xlsx_row(row) for row in batch).encode("utf-8"))
+                # The deflate stream emits output in blocks; an empty take is skipped
+                chunk = sink.take()
+                if chunk or not batch:
+                    yield chunk
+            sheet.write(_SHEET_TAIL.encode("utf-8"))
+    yield sink.take()
+
+
+def _stream(
+    fmt: str,
+    name: str,
+    headers: Sequence[str],
+    open_cursor: Callable[[], ContextManager],
+    transform: Optional[Callable[[tuple], tuple]] = None,
+) -> ExportStream:
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail="invalid format")
+    batches = _batches(open_cursor, transform)
+    chunks = _csv_chunks(headers, batches) if fmt == "csv" else _xlsx_chunks(name, headers, batches)
+    return ExportStream(f"{name}.{fmt}", FORMATS[fmt], chunks)
+
+
+def _month_bounds(month_from: str, month_to: Optional[str]) -> Tuple[str, str, str]:
+    """First day of the range, first day after it and a file name suffix."""
+    first, last = dashboard_service.normalize_month_range(month_from, month_to)
+    end = datetime.strptime(last + "-01", "%Y-%m-%d")
+    after = end.replace(year=end.year + 1, month=1) if end.month == 12 else end.replace(month=end.month + 1)
+    suffix = first if first == last else f"{first}_{last}"
+    return first + "-01", after.strftime("%Y-%m-%d"), suffix
+
+
+def daily_rows(month_from: str, month_to: Optional[str], fmt: str, statement_timeout_ms: Optional[int] = None) -> ExportStream:
+    start, end, suffix = _month_bounds(month_from, month_to)
+
+    def open_cursor():
+        return dashboard_repo.stream_daily_rows(start, end, statement_timeout_ms)
+
+    return _stream(fmt, f"daily_{suffix}", DAILY_HEADERS, open_cursor)
+
+
+def smeta_details_with_types(
+    month_from: str, month_to: Optional[str], smeta_key: str, fmt: str, statement_timeout_ms: Optional[int] = None
+) -> ExportStream:
+    start, end, suffix = _month_bounds(month_from, month_to)
+    smeta_ids = dashboard_service.require_smeta_ids(smeta_key)
+    # Same rule as assemble_smeta_details_with_types: no plan for vnereglament
+    include_plan = smeta_key != "vnereglement"
+
+    def transform(row: tuple) -> tuple:
+        month, type_of_work, description, plan, fact = row
+        plan = plan if include_plan else 0
+        return month, type_of_work, description, plan, fact, fact - plan
+
+    def open_cursor():
+        return dashboard_repo.stream_smeta_details_with_types(start, end, smeta_ids, statement_timeout_ms)
+
+    return _stream(fmt, f"smeta_details_{smeta_key}_{suffix}", SMETA_DETAILS_HEADERS, open_cursor, transform)
+
+
+def description_daily_rows(
+    month_from: str, month_to: Optional[str], smeta_key: str, description_id: str, fmt: str,
+    statement_timeout_ms: Optional[int] = None,
+) -> ExportStream:
+    start, end, suffix = _month_bounds(month_from, month_to)
+    smeta_ids = dashboard_service.require_smeta_ids(smeta_key)
+    dashboard_service.resolve_description_or_404(description_id)
+    description_ids = dashboard_service.resolve_description_ids(description_id)
+
+    def open_cursor():
+        return dashboard_repo.stream_description_daily_rows(start, end, description_ids, smeta_ids, statement_timeout_ms)
+
+    return _stream(fmt, f"description_daily_{description_id}_{suffix}", DESCRIPTION_DAILY_HEADERS, open_cursor)
+
+
+def monthly_items(month_from: str, month_to: Optional[str], fmt: str, statement_timeout_ms: Optional[int] = None) -> ExportStream:
+    start, end, suffix = _month_bounds(month_from, month_to)
+
+    def open_cursor():
+        return dashboard_repo.stream_monthly_items(start, end, statement_timeout_ms)
+
+    return _stream(fmt, f"items_{suffix}", ITEMS_HEADERS, open_cursor)
@@ -0,0 +1,567 @@
+"""Incremental maintenance of the daily and monthly aggregates.
+
+``mv_fact_daily_amounts``, ``mv_plan_vs_fact_monthly_ids`` and
+``mv_plan_fact_monthly_backend_ids`` are kept as ordinary tables under the same names
+(so ``dashboard_repo`` reads them unchanged) and only the keys touched by a load batch
+are recomputed, so an update costs as much as the batch rather than the whole history:
+
+* daily rows of the touched ``(date, id_description)`` keys, or of whole days;
+* plan-vs-fact rows of the ``(month, id_description)`` keys they roll up into, plus
+  whole months whose plan changed;
+* backend rows of every touched month.
+
+``fact_pik_amount`` replaces the SKPDI fact of its month (see
+``docs/materialized_views.md``), so a month with changed PIK data is recomputed as a
+whole. The SELECTs below are the bodies of the materialized views with a filter on the
+touched keys; an update deletes those keys and inserts them again in one transaction,
+so readers see either the old or the new aggregates. The catalog views are then
+refreshed and ``last_loaded`` is moved as in ``mv_refresh``, under the same advisory
+lock.
+
+The tables are created once from the materialized views with ``--init``; ``--verify``
+diffs them against a full rebuild::
+
+    python -m app.backend.services.incremental_aggregates --init
+    python -m app.backend.services.incremental_aggregates --date 2025-11-03 --date 2025-11-04
+    python -m app.backend.services.incremental_aggregates --pik-month 2025-10 --verify
+"""
+
+import argparse
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_REPEATABLE_READ
+
+from app.backend import metrics
+from app.backend.services import mv_refresh
+
+logger = logging.getLogger(__name__)
+
+DAILY_TABLE = "mv_fact_daily_amounts"
+PLAN_VS_FACT_TABLE = "mv_plan_vs_fact_monthly_ids"
+BACKEND_TABLE = "mv_plan_fact_monthly_backend_ids"
+AGGREGATE_TABLES = (DAILY_TABLE, PLAN_VS_FACT_TABLE, BACKEND_TABLE)
+CATALOG_VIEWS = ("mv_fact_dates_catalog", "mv_months_catalog")
+
+# Body of mv_fact_daily_amounts; {skpdi_filter} and {pik_filter} restrict it to touched keys
+DAILY_SELECT_SQL = """
+    WITH pik_months AS (
+             SELECT DISTINCT date_trunc('month'::text, fact_pik_amount.date_of_work::timestamp with time zone)::date AS month_start
+               FROM fact_pik_amount
+            ), skpdi AS (
+             SELECT d.date AS date_done,
+                date_trunc('month'::text, d.date::timestamp with time zone)::date AS month_start,
+                sr.id_status,
+                st.status,
+                wd.id_description,
+                wd.description,
+                wd.id_unit,
+                u.unit,
+                wd.id_smeta,
+                ts.smeta_code,
+                wd.id_smeta_section,
+                ss.smeta_section,
+                wd.id_type_of_work,
+                tw.type_work AS type_of_work,
+                COALESCE(sum(sr.volume_done), 0::numeric) AS total_volume,
+                COALESCE(sum(sr.volume_done * p.price), 0::numeric) AS total_amount
+               FROM skpdi_report_raw sr
+                 JOIN dates_table d ON d.date = sr.date_of_work
+                 JOIN work_description wd ON wd.id_description = sr.id_description
+                 JOIN type_of_smeta ts ON ts.id_smeta = wd.id_smeta
+                 JOIN smeta_section ss ON ss.id_smeta_section = wd.id_smeta_section
+                 LEFT JOIN prices_2025 p ON p.id_description = sr.id_description AND p.id_smeta = wd.id_smeta AND p.id_smeta_section = wd.id_smeta_section
+                 LEFT JOIN unit_list u ON u.id_unit = wd.id_unit
+                 LEFT JOIN type_of_work tw ON tw.id_type_of_work = wd.id_type_of_work
+                 LEFT JOIN status_of_work st ON st.id_status = sr.id_status
+              WHERE NOT (EXISTS ( SELECT 1
+                       FROM pik_months pm
+                      WHERE pm.month_start = date_trunc('month'::text, d.date::timestamp with time zone)::date)){skpdi_filter}
+              GROUP BY d.date, sr.id_status, st.status, wd.id_description, wd.description, wd.id_unit, u.unit, wd.id_smeta, ts.smeta_code, wd.id_smeta_section, ss.smeta_section, wd.id_type_of_work, tw.type_work
+            ), pik AS (
+             SELECT f.date_of_work AS date_done,
+                date_trunc('month'::text, f.date_of_work::timestamp with time zone)::date AS month_start,
+                3::bigint AS id_status,
+                'Рассмотрено'::text AS status,
+                wd.id_description,
+                wd.description,
+                wd.id_unit,
+                u.unit,
+                wd.id_smeta,
+                ts.smeta_code,
+                wd.id_smeta_section,
+                ss.smeta_section,
+                wd.id_type_of_work,
+                tw.type_work AS type_of_work,
+                COALESCE(sum(f.volume_done), 0::numeric) AS total_volume,
+                COALESCE(sum(f.volume_done * p.price), 0::numeric) AS total_amount
+               FROM fact_pik_amount f
+                 JOIN work_description wd ON wd.description = f.description
+                 JOIN type_of_smeta ts ON ts.id_smeta = wd.id_smeta
+                 JOIN smeta_section ss ON ss.id_smeta_section = wd.id_smeta_section
+                 LEFT JOIN prices_2025 p ON p.id_description = wd.id_description AND p.id_smeta = wd.id_smeta AND p.id_smeta_section = wd.id_smeta_section
+                 LEFT JOIN unit_list u ON u.id_unit = wd.id_unit
+                 LEFT JOIN type_of_work tw ON tw.id_type_of_work = wd.id_type_of_work{pik_filter}
+              GROUP BY f.date_of_work, wd.id_description, wd.description, wd.id_unit, u.unit, wd.id_smeta, ts.smeta_code, wd.id_smeta_section, ss.smeta_section, wd.id_type_of_work, tw.type_work
+            )
+     SELECT skpdi.date_done, skpdi.month_start, skpdi.id_status, skpdi.status, skpdi.id_description,
+        skpdi.description, skpdi.id_unit, skpdi.unit, skpdi.id_smeta, skpdi.smeta_code, skpdi.id_smeta_section,
+        skpdi.smeta_section, skpdi.id_type_of_work, skpdi.type_of_work, skpdi.total_volume, skpdi.total_amount
+       FROM skpdi
+    UNION ALL
+     SELECT pik.date_done, pik.month_start, pik.id_status, pik.status, pik.id_description,
+        pik.description, pik.id_unit, pik.unit, pik.id_smeta, pik.smeta_code, pik.id_smeta_section,
+        pik.smeta_section, pik.id_type_of_work, pik.type_of_work, pik.total_volume, pik.total_amount
+       FROM pik
+    """
+
+DAILY_SKPDI_FILTER = """
+                AND EXISTS (SELECT 1 FROM touched_daily t
+                    WHERE t.date_done = sr.date_of_work AND (t.id_description IS NULL OR t.id_description = sr.id_description))"""
+DAILY_PIK_FILTER = """
+              WHERE EXISTS (SELECT 1 FROM touched_daily t
+                    WHERE t.date_done = f.date_of_work AND (t.id_description IS NULL OR t.id_description = wd.id_description))"""
+
+# Body of mv_plan_vs_fact_monthly_ids reading the daily aggregate from {daily}
+PLAN_VS_FACT_SELECT_SQL = """
+     WITH plan AS (
+             SELECT date_trunc('month'::text, rp.month_start::timestamp with time zone)::date AS month_start,
+                rp.id_description,
+                rp.id_smeta,
+                COALESCE(sum(rp.planned_amount), 0::numeric) AS planned_amount
+               FROM mv_ruad_plan rp{plan_filter}
+              GROUP BY (date_trunc('month'::text, rp.month_start::timestamp with time zone)::date), rp.id_description, rp.id_smeta
+            ), fact AS (
+             SELECT fd.month_start,
+                fd.id_description,
+                fd.id_smeta,
+                COALESCE(sum(fd.total_amount), 0::numeric) AS fact_amount_done
+               FROM {daily} fd
+              WHERE fd.status = 'Рассмотрено'::text{fact_filter}
+              GROUP BY fd.month_start, fd.id_description, fd.id_smeta
+            )
+     SELECT COALESCE(p.month_start, f.month_start) AS month_start,
+        wd.id_description,
+        wd.description,
+        wd.id_smeta,
+        ts.smeta_code,
+        wd.id_type_of_work,
+        tw.type_work AS type_of_work,
+        COALESCE(p.planned_amount, 0::numeric) AS planned_amount,
+        COALESCE(f.fact_amount_done, 0::numeric) AS fact_amount_done
+       FROM plan p
+         FULL JOIN fact f ON p.month_start = f.month_start AND p.id_description = f.id_description AND p.id_smeta = f.id_smeta
+         JOIN work_description wd ON wd.id_description = COALESCE(p.id_description, f.id_description)
+         JOIN type_of_smeta ts ON ts.id_smeta = wd.id_smeta
+         LEFT JOIN type_of_work tw ON tw.id_type_of_work = wd.id_type_of_work
+    """
+
+PLAN_FILTER = """
+              WHERE EXISTS (SELECT 1 FROM touched_monthly t
+                    WHERE t.month_start = date_trunc('month'::text, rp.month_start::timestamp with time zone)::date
+                      AND (t.id_description IS NULL OR t.id_description = rp.id_description))"""
+FACT_FILTER = """
+                AND EXISTS (SELECT 1 FROM touched_monthly t
+                    WHERE t.month_start = fd.month_start AND (t.id_description IS NULL OR t.id_description = fd.id_description))"""
+
+# Body of mv_plan_fact_monthly_backend_ids reading the monthly aggregate from {plan_vs_fact}
+BACKEND_SELECT_SQL = """
+     WITH base AS (
+             SELECT to_char(pvf.month_start::timestamp with time zone, 'YYYY-MM'::text) AS month_key,
+                pvf.smeta_code,
+                COALESCE(sum(pvf.planned_amount), 0::numeric) AS planned_amount,
+                COALESCE(sum(pvf.fact_amount_done), 0::numeric) AS fact_amount
+               FROM {plan_vs_fact} pvf{month_filter}
+              GROUP BY (to_char(pvf.month_start::timestamp with time zone, 'YYYY-MM'::text)), pvf.smeta_code
+            )
+     SELECT month_key,
+        sum(planned_amount) FILTER (WHERE smeta_code = 'Лето'::text) AS plan_leto,
+        sum(planned_amount) FILTER (WHERE smeta_code = 'Зима'::text) AS plan_zima,
+        round((COALESCE(sum(planned_amount) FILTER (WHERE smeta_code = 'Лето'::text), 0::numeric) + COALESCE(sum(planned_amount) FILTER (WHERE smeta_code = 'Зима'::text), 0::numeric)) * 0.43) AS plan_vnereglament,
+        COALESCE(sum(planned_amount) FILTER (WHERE smeta_code = 'Лето'::text), 0::numeric) + COALESCE(sum(planned_amount) FILTER (WHERE smeta_code = 'Зима'::text), 0::numeric) + round((COALESCE(sum(planned_amount) FILTER (WHERE smeta_code = 'Лето'::text), 0::numeric) + COALESCE(sum(planned_amount) FILTER (WHERE smeta_code = 'Зима'::text), 0::numeric)) * 0.43) AS plan_total,
+        sum(fact_amount) FILTER (WHERE smeta_code = 'Лето'::text) AS fact_leto,
+        sum(fact_amount) FILTER (WHERE smeta_code = 'Зима'::text) AS fact_zima,
+        sum(fact_amount) FILTER (WHERE smeta_code = ANY (ARRAY['Внерегламент ч.1'::text, 'Внерегламент ч.2'::text])) AS fact_vnereglament,
+        sum(fact_amount) AS fact_total
+       FROM base
+      GROUP BY month_key
+    """
+
+BACKEND_FILTER = """
+              WHERE EXISTS (SELECT 1 FROM touched_monthly t WHERE t.month_start = pvf.month_start)"""
+
+# Keys of a batch; id_description NULL stands for the whole day / month
+CREATE_TOUCHED_SQL = """
+    CREATE TEMP TABLE touched_daily (date_done date NOT NULL, id_description bigint) ON COMMIT DROP;
+    CREATE TEMP TABLE touched_monthly (month_start date NOT NULL, id_description bigint) ON COMMIT DROP;
+    """
+TOUCH_DATES_SQL = "INSERT INTO touched_daily (date_done) SELECT unnest(%s::date[])"
+TOUCH_KEYS_SQL = "INSERT INTO touched_daily (date_done, id_description) SELECT * FROM unnest(%s::date[], %s::bigint[])"
+TOUCH_PIK_MONTHS_SQL = """
+    INSERT INTO touched_daily (date_done)
+    SELECT generate_series(m, m + interval '1 month' - interval '1 day', interval '1 day')::date
+      FROM unnest(%s::date[]) AS m
+    """
+TOUCH_MONTHS_SQL = """
+    INSERT INTO touched_monthly (month_start, id_description)
+    SELECT DISTINCT date_trunc('month', date_done)::date, id_description FROM touched_daily
+    """
+TOUCH_PLAN_MONTHS_SQL = "INSERT INTO touched_monthly (month_start) SELECT unnest(%s::date[])"
+ANALYZE_TOUCHED_SQL = "ANALYZE touched_daily, touched_monthly"
+
+DELETE_DAILY_SQL = """
+    DELETE FROM mv_fact_daily_amounts a
+     WHERE EXISTS (SELECT 1 FROM touched_daily t
+                    WHERE t.date_done = a.date_done AND (t.id_description IS NULL OR t.id_description = a.id_description))
+    """
+DELETE_PLAN_VS_FACT_SQL = """
+    DELETE FROM mv_plan_vs_fact_monthly_ids a
+     WHERE EXISTS (SELECT 1 FROM touched_monthly t
+                    WHERE t.month_start = a.month_start AND (t.id_description IS NULL OR t.id_description = a.id_description))
+    """
+DELETE_BACKEND_SQL = """
+    DELETE FROM mv_plan_fact_monthly_backend_ids a
+     WHERE a.month_key IN (SELECT DISTINCT to_char(t.month_start, 'YYYY-MM') FROM touched_monthly t)
+    """
+
+# One-time migration: the materialized views become tables under the same names
+DROP_VIEWS_SQL = "DROP MATERIALIZED VIEW IF EXISTS mv_months_catalog, mv_fact_dates_catalog"
+DROP_AGGREGATE_VIEWS_SQL = "DROP MATERIALIZED VIEW {}"
+
+# Read indexes from Postgres DB.md plus the keys the deletes above look up
+AGGREGATE_INDEXES_SQL = """
+    CREATE UNIQUE INDEX mv_fact_daily_amounts_key_uq ON mv_fact_daily_amounts (date_done, id_description, id_status);
+    CREATE INDEX mv_fact_daily_amounts_description_idx ON mv_fact_daily_amounts (id_description, date_done) WHERE id_status = 3;
+    CREATE INDEX mv_fact_daily_amounts_date_status3_idx ON mv_fact_daily_amounts (date_done) WHERE id_status = 3;
+    CREATE INDEX mv_fact_daily_amounts_date_desc_status3_idx ON mv_fact_daily_amounts (date_done, description) WHERE id_status = 3;
+    CREATE INDEX mv_fact_daily_amounts_date_smeta_status3_idx ON mv_fact_daily_amounts (date_done, id_smeta) WHERE id_status = 3;
+    CREATE INDEX mv_plan_vs_fact_monthly_ids_month_desc_idx ON mv_plan_vs_fact_monthly_ids (month_start, id_description);
+    CREATE INDEX mv_plan_vs_fact_monthly_ids_month_smeta_idx ON mv_plan_vs_fact_monthly_ids (month_start, id_smeta);
+    CREATE INDEX mv_plan_vs_fact_monthly_ids_month_smeta_desc_idx ON mv_plan_vs_fact_monthly_ids (month_start, id_smeta, description);
+    CREATE UNIQUE INDEX mv_plan_fact_monthly_backend_ids_month_key_uq ON mv_plan_fact_monthly_backend_ids (month_key);
+    CREATE INDEX mv_plan_fact_monthly_backend_ids_month_facttotal_idx ON mv_plan_fact_monthly_backend_ids (month_key, fact_total);
+    """
+
+# Sections 4 and 5 of docs/materialized_views.md, dropped together with the aggregates
+CATALOG_VIEWS_SQL = """
+    CREATE MATERIALIZED VIEW mv_fact_dates_catalog AS
+     SELECT DISTINCT mv_fact_daily_amounts.date_done,
+        date_trunc('month'::text, mv_fact_daily_amounts.date_done::timestamp with time zone)::date AS month_start
+       FROM mv_fact_daily_amounts
+      WHERE mv_fact_daily_amounts.id_status = 3;
+
+    CREATE UNIQUE INDEX mv_fact_dates_catalog_date_done_idx ON mv_fact_dates_catalog (date_done);
+    CREATE INDEX mv_fact_dates_catalog_month_idx ON mv_fact_dates_catalog (month_start, date_done);
+
+    CREATE MATERIALIZED VIEW mv_months_catalog AS
+     WITH plan AS (
+             SELECT mv_plan_vs_fact_monthly_ids.month_start,
+                bool_or(mv_plan_vs_fact_monthly_ids.planned_amount > 0::numeric) AS has_plan
+               FROM mv_plan_vs_fact_monthly_ids
+              GROUP BY mv_plan_vs_fact_monthly_ids.month_start
+            ), fact AS (
+             SELECT DISTINCT mv_fact_dates_catalog.month_start
+               FROM mv_fact_dates_catalog
+            )
+     SELECT to_char(COALESCE(p.month_start, f.month_start)::timestamp with time zone, 'YYYY-MM'::text) AS month_key,
+        COALESCE(p.month_start, f.month_start) AS month_start,
+        COALESCE(p.has_plan, false) AS has_plan,
+        f.month_start IS NOT NULL AS has_fact
+       FROM plan p
+         FULL JOIN fact f ON f.month_start = p.month_start;
+
+    CREATE UNIQUE INDEX mv_months_catalog_month_key_idx ON mv_months_catalog (month_key);
+    """
+
+# Rows only on one side of the comparison (EXCEPT ALL keeps duplicates)
+DIFF_SQL = """
+    SELECT (SELECT count(*) FROM (TABLE {table} EXCEPT ALL TABLE {expected}) missing_in_expected) AS extra,
+           (SELECT count(*) FROM (TABLE {expected} EXCEPT ALL TABLE {table}) missing_in_table) AS missing
+    """
+
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+@dataclass
+class Batch:
+    """Source keys changed by a load.
+
+    ``dates`` are whole days of ``skpdi_report_raw``, ``keys`` single ``(date,
+    id_description)`` pairs (old and new values of changed rows), ``pik_months`` months
+    with changed ``fact_pik_amount`` rows and ``plan_months`` months whose plan in
+    ``mv_ruad_plan`` changed.
+    """
+
+    dates: Set[date] = field(default_factory=set)
+    keys: Set[Tuple[date, int]] = field(default_factory=set)
+    pik_months: Set[date] = field(default_factory=set)
+    plan_months: Set[date] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.dates or self.keys or self.pik_months or self.plan_months)
+
+    def merged(self, other: Optional["Batch"]) -> "Batch":
+        if other is None:
+            return self
+        return Batch(
+            self.dates | other.dates,
+            self.keys | other.keys,
+            self.pik_months | other.pik_months,
+            self.plan_months | other.plan_months,
+        )
+
+
+@dataclass
+class TableUpdate:
+    table: str
+    deleted: int
+    inserted: int
+    seconds: float
+
+
+@dataclass
+class UpdateResult:
+    started_at: str
+    tables: List[TableUpdate] = field(default_factory=list)
+    views: List[mv_refresh.ViewRefresh] = field(default_factory=list)
+    loaded_at: Optional[str] = None
+    prewarm_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _daily_select(skpdi_filter: str = "", pik_filter: str = "") -> str:
+    return DAILY_SELECT_SQL.format(skpdi_filter=skpdi_filter, pik_filter=pik_filter)
+
+
+def _plan_vs_fact_select(daily: str = DAILY_TABLE, plan_filter: str = "", fact_filter: str = "") -> str:
+    return PLAN_VS_FACT_SELECT_SQL.format(daily=daily, plan_filter=plan_filter, fact_filter=fact_filter)
+
+
+def _backend_select(plan_vs_fact: str = PLAN_VS_FACT_TABLE, month_filter: str = "") -> str:
+    return BACKEND_SELECT_SQL.format(plan_vs_fact=plan_vs_fact, month_filter=month_filter)
+
+
+def _touch(cur, batch: Batch):
+    cur.execute(CREATE_TOUCHED_SQL)
+    if batch.dates:
+        cur.execute(TOUCH_DATES_SQL, (sorted(batch.dates),))
+    if batch.keys:
+        keys = sorted(batch.keys)
+        cur.execute(TOUCH_KEYS_SQL, ([key[0] for key in keys], [key[1] for key in keys]))
+    if batch.pik_months:
+        cur.execute(TOUCH_PIK_MONTHS_SQL, (sorted({_month_start(m) for m in batch.pik_months}),))
+    cur.execute(TOUCH_MONTHS_SQL)
+    if batch.plan_months:
+        cur.execute(TOUCH_PLAN_MONTHS_SQL, (sorted({_month_start(m) for m in batch.plan_months}),))
+    cur.execute(ANALYZE_TOUCHED_SQL)
+
+
+def _replace(cur, table: str, delete_sql: str, select_sql: str) -> TableUpdate:
+    started = time.perf_counter()
+    cur.execute(delete_sql)
+    deleted = cur.rowcount
+    cur.execute(f"INSERT INTO {table} {select_sql}")
+    inserted = cur.rowcount
+    seconds = time.perf_counter() - started
+    metrics.AGGREGATE_UPDATE_SECONDS.labels(table=table).observe(seconds)
+    metrics.AGGREGATE_UPDATE_ROWS.labels(table=table, op="deleted").inc(deleted)
+    metrics.AGGREGATE_UPDATE_ROWS.labels(table=table, op="inserted").inc(inserted)
+    logger.info("%s: %d rows deleted, %d inserted in %.2fs", table, deleted, inserted, seconds)
+    return TableUpdate(table, deleted, inserted, round(seconds, 3))
+
+
+def apply(cur, batch: Batch) -> List[TableUpdate]:
+    """Recompute the keys touched by ``batch`` in the caller's transaction."""
+    if not batch:
+        return []
+    _touch(cur, batch)
+    return [
+        _replace(cur, DAILY_TABLE, DELETE_DAILY_SQL, _daily_select(DAILY_SKPDI_FILTER, DAILY_PIK_FILTER)),
+        _replace(cur, PLAN_VS_FACT_TABLE, DELETE_PLAN_VS_FACT_SQL, _plan_vs_fact_select(
+            plan_filter=PLAN_FILTER, fact_filter=FACT_FILTER)),
+        _replace(cur, BACKEND_TABLE, DELETE_BACKEND_SQL, _backend_select(month_filter=BACKEND_FILTER)),
+    ]
+
+
+def rebuild(cur) -> List[TableUpdate]:
+    """Recompute the tables from scratch in the caller's transaction.
+
+    ``DELETE`` rather than ``TRUNCATE``: readers keep seeing the old rows until commit.
+    """
+    return [
+        _replace(cur, DAILY_TABLE, f"DELETE FROM {DAILY_TABLE}", _daily_select()),
+        _replace(cur, PLAN_VS_FACT_TABLE, f"DELETE FROM {PLAN_VS_FACT_TABLE}", _plan_vs_fact_select()),
+        _replace(cur, BACKEND_TABLE, f"DELETE FROM {BACKEND_TABLE}", _backend_select()),
+    ]
+
+
+def _connect(dsn: Optional[str]):
+    dsn = dsn or os.environ.get("DB_DSN")
+    if not dsn:
+        raise RuntimeError("DB_DSN is not set")
+    return psycopg2.connect(dsn)
+
+
+def update(
+    batch: Optional[Batch] = None,
+    dsn: Optional[str] = None,
+    handoff: bool = True,
+    load: Optional[Callable[[Any], Batch]] = None,
+    full: bool = False,
+) -> UpdateResult:
+    """Recompute the keys of ``batch`` (everything with ``full``), then publish the new version.
+
+    ``load(cur)``, if given, runs in the same transaction before the aggregates are
+    touched and returns the batch it wrote, so source rows and aggregates are committed
+    together. After the commit the catalog views are refreshed and ``last_loaded`` is
+    moved; ``handoff`` pre-warms this process as in ``mv_refresh.refresh``. Raises
+    ``mv_refresh.RefreshInProgress`` if a refresh or another update holds the lock.
+    """
+    result = UpdateResult(started_at=datetime.now().isoformat(timespec="seconds"))
+    conn = _connect(dsn)
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur, mv_refresh.advisory_lock(cur):
+            try:
+                conn.autocommit = False
+                try:
+                    with conn:
+                        if load is not None:
+                            batch = (batch or Batch()).merged(load(cur))
+                        result.tables = rebuild(cur) if full else apply(cur, batch or Batch())
+                finally:
+                    conn.autocommit = True
+                if not result.tables:
+                    metrics.AGGREGATE_UPDATE_RUNS.labels(result="empty").inc()
+                    return result
+                # Catalogs are small; REFRESH ... CONCURRENTLY cannot run in the transaction above
+                result.views = mv_refresh.refresh_views(cur, CATALOG_VIEWS)
+                loaded_at = mv_refresh.bump_last_loaded(cur)
+            except Exception as exc:
+                metrics.AGGREGATE_UPDATE_RUNS.labels(result="failed").inc()
+                logger.exception("Aggregate update failed, last_loaded is not moved")
+                result.error = str(exc)
+                return result
+    finally:
+        conn.close()
+
+    metrics.AGGREGATE_UPDATE_RUNS.labels(result="ok").inc()
+    result.loaded_at = loaded_at.isoformat()
+    if handoff:
+        result.prewarm_seconds = mv_refresh.hand_off(loaded_at)
+    return result
+
+
+def verify(dsn: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """Diff the tables against a full rebuild in one snapshot; rows per table on each side.
+
+    Each layer of the rebuild reads the rebuilt layer below it, so a drift anywhere shows
+    up in every table that depends on it.
+    """
+    conn = _connect(dsn)
+    try:
+        conn.set_session(isolation_level=ISOLATION_LEVEL_REPEATABLE_READ)
+        with conn.cursor() as cur:
+            expected = {table: f"expected_{table}" for table in AGGREGATE_TABLES}
+            selects = {
+                DAILY_TABLE: _daily_select(),
+                PLAN_VS_FACT_TABLE: _plan_vs_fact_select(daily=expected[DAILY_TABLE]),
+                BACKEND_TABLE: _backend_select(plan_vs_fact=expected[PLAN_VS_FACT_TABLE]),
+            }
+            diff = {}
+            for table in AGGREGATE_TABLES:
+                cur.execute(f"CREATE TEMP TABLE {expected[table]} ON COMMIT DROP AS {selects[table]}")
+                cur.execute(DIFF_SQL.format(table=table, expected=expected[table]))
+                extra, missing = cur.fetchone()
+                diff[table] = {"extra": extra, "missing": missing}
+        conn.rollback()
+    finally:
+        conn.close()
+    return diff
+
+
+def init(dsn: Optional[str] = None):
+    """Replace the three materialized views with tables of the same contents (one transaction)."""
+    conn = _connect(dsn)
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(mv_refresh.MATERIALIZED_VIEWS_SQL, (list(AGGREGATE_TABLES),))
+            views = {row[0] for row in cur.fetchall()}
+            if views != set(AGGREGATE_TABLES):
+                raise RuntimeError(f"Expected materialized views {', '.join(AGGREGATE_TABLES)}, found {sorted(views)}")
+            cur.execute(DROP_VIEWS_SQL)
+            for table in reversed(AGGREGATE_TABLES):
+                cur.execute(DROP_AGGREGATE_VIEWS_SQL.format(table))
+            for table, select_sql in (
+                (DAILY_TABLE, _daily_select()),
+                (PLAN_VS_FACT_TABLE, _plan_vs_fact_select()),
+                (BACKEND_TABLE, _backend_select()),
+            ):
+                started = time.perf_counter()
+                cur.execute(f"CREATE TABLE {table} AS {select_sql}")
+                logger.info("Created table %s (%d rows) in %.1fs", table, cur.rowcount, time.perf_counter() - started)
+            cur.execute(AGGREGATE_INDEXES_SQL)
+            cur.execute(CATALOG_VIEWS_SQL)
+            cur.execute(f"ANALYZE {', '.join(AGGREGATE_TABLES + CATALOG_VIEWS)}")
+    finally:
+        conn.close()
+
+
+def _days(since: date, until: date) -> Iterable[date]:
+    for offset in range((until - since).days + 1):
+        yield since + timedelta(days=offset)
+
+
+def _month(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally update the daily and monthly aggregate tables")
+    parser.add_argument("--dsn", default=os.environ.get("DB_DSN"), help="database DSN (default: DB_DSN)")
+    parser.add_argument("--init", action="store_true", help="one-time: replace the materialized views with tables")
+    parser.add_argument("--rebuild", action="store_true", help="recompute the tables from scratch")
+    parser.add_argument("--date", dest="dates", action="append", type=date.fromisoformat, default=[],
+                        help="recompute a whole day of SKPDI data (repeatable)")
+    parser.add_argument("--since", type=date.fromisoformat, help="recompute every day from this date to today")
+    parser.add_argument("--pik-month", dest="pik_months", action="append", type=_month, default=[],
+                        help="YYYY-MM with changed fact_pik_amount rows (repeatable)")
+    parser.add_argument("--plan-month", dest="plan_months", action="append", type=_month, default=[],
+                        help="YYYY-MM with a changed plan (repeatable)")
+    parser.add_argument("--verify", action="store_true", help="diff the tables against a full rebuild afterwards")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.init:
+        init(args.dsn)
+    batch = Batch(set(args.dates), set(), set(args.pik_months), set(args.plan_months))
+    if args.since:
+        batch.dates.update(_days(args.since, date.today()))
+    if batch or args.rebuild:
+        # The API workers pick the new version up through their watcher and pre-warm themselves
+        result = update(batch, args.dsn, handoff=False, full=args.rebuild)
+        for table in result.tables:
+            print(f"{table.table:<36} -{table.deleted:<9} +{table.inserted:<9} {table.seconds:>8.2f}s")
+        if result.error:
+            raise SystemExit(f"Update failed: {result.error}")
+        print(f"last_loaded = {result.loaded_at}")
+    if args.verify:
+        diff = verify(args.dsn)
+        for table, counts in diff.items():
+            print(f"{table:<36} extra {counts['extra']:<9} missing {counts['missing']}")
+        if any(counts["extra"] or counts["missing"] for counts in diff.values()):
+            raise SystemExit("Aggregates differ from a full rebuild")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""In-process columnar copy of a month's reviewed fact slice.
+
+The daily, daily-revenue, description-daily, type-of-work, dates and smeta-details
+drill-downs all read the same slice of ``mv_fact_daily_amounts`` (one month,
+``id_status = 3``) and only group it differently. With ``MONTH_CUBE=1`` the service
+loads that slice once per (data version, month) into NumPy columns and answers every
+one of those groupings in memory, so drill-down clicks no longer reach Postgres.
+
+Strings (description, unit, type_of_work) are dictionary-encoded with codes in sorted
+order, so ``MIN(unit)`` is a minimum over codes; ``None`` is encoded as ``-1``. Amounts
+and volumes are ``numeric`` with no fixed scale, so they are kept exact: as integers scaled
+by the largest number of decimal places in the slice (int64, or Python ints if the totals
+could overflow it). Sums are exact and rounded half away from zero like ``numeric::int``.
+Rows are returned in the same shape as the corresponding ``dashboard_repo`` functions.
+"""
+
+import os
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def enabled() -> bool:
+    """Whether drill-downs should be served from the month cube (``MONTH_CUBE``)."""
+    return os.environ.get("MONTH_CUBE", "").lower() in ("1", "true", "yes", "on")
+
+
+def cached_months() -> int:
+    """How many month cubes each process keeps (``MONTH_CUBE_MONTHS``, default 3)."""
+    env_months = os.environ.get("MONTH_CUBE_MONTHS")
+    return max(1, int(env_months)) if env_months else 3
+
+
+def _encode(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, List[str]]:
+    """Dictionary-encode strings; codes follow sorted order and None becomes -1."""
+    dictionary = sorted({v for v in values if v is not None})
+    index = {v: i for i, v in enumerate(dictionary)}
+    codes = np.fromiter((index[v] if v is not None else -1 for v in values), dtype=np.int32, count=len(values))
+    return codes, dictionary
+
+
+def _scaled(values: Sequence) -> Tuple[np.ndarray, int]:
+    """Exact fixed-point copy of ``numeric`` values: scaled integers and the decimal places."""
+    decimals = [v if isinstance(v, Decimal) else Decimal(str(v or 0)) for v in values]
+    places = max((-d.as_tuple().exponent for d in decimals if d.as_tuple().exponent < 0), default=0)
+    ints = []
+    for d in decimals:
+        sign, digits, exponent = d.as_tuple()
+        value = int("".join(map(str, digits)) or "0") * 10 ** (exponent + places)
+        ints.append(-value if sign else value)
+    # Any group sum is bounded by the sum of absolute values
+    dtype = np.int64 if sum(abs(v) for v in ints) < 2 ** 63 else object
+    return np.array(ints, dtype=dtype).reshape(-1), places
+
+
+def _unscaled(value, places: int) -> Decimal:
+    """The exact ``numeric`` value of a scaled integer."""
+    value = int(value)
+    return Decimal((1 if value < 0 else 0, tuple(map(int, str(abs(value)))), -places))
+
+
+def _round_int(values: np.ndarray, places: int) -> List[int]:
+    """Round scaled sums half away from zero, the way Postgres casts ``numeric`` to ``int``."""
+    scale = 10 ** places
+    rounded = []
+    for value in values:
+        quotient, remainder = divmod(abs(int(value)), scale)
+        quotient += 2 * remainder >= scale
+        rounded.append(-quotient if value < 0 else quotient)
+    return rounded
+
+
+class MonthCube:
+    """Columns of one month's ``mv_fact_daily_amounts`` rows with ``id_status = 3``."""
+
+    def __init__(self, month_key: str, rows: Sequence[dict]):
+        self.month_key = month_key
+        self.day = np.fromiter((r["date_done"].day for r in rows), dtype=np.int16, count=len(rows))
+        self.id_smeta = np.fromiter((r.get("id_smeta") or 0 for r in rows), dtype=np.int64, count=len(rows))
+        self.id_description = np.fromiter((r.get("id_description") or 0 for r in rows), dtype=np.int64, count=len(rows))
+        self.description, self.descriptions = _encode([r.get("description") for r in rows])
+        self._description_codes = {d: i for i, d in enumerate(self.descriptions)}
+        self.type_of_work, self.types_of_work = _encode([r.get("type_of_work") for r in rows])
+        self.unit, self.units = _encode([r.get("unit") for r in rows])
+        self.volume, self.volume_places = _scaled([r.get("total_volume") for r in rows])
+        self.amount, self.amount_places = _scaled([r.get("total_amount") for r in rows])
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    # --- helpers ---
+
+    def _date(self, day: int) -> str:
+        return f"{self.month_key}-{int(day):02d}"
+
+    def _day_of(self, date_value: str) -> Optional[int]:
+        if date_value[:7] != self.month_key:
+            return None
+        return int(date_value[8:10])
+
+    def _smeta_mask(self, smeta_ids: Sequence[int]) -> np.ndarray:
+        return np.isin(self.id_smeta, np.asarray(list(smeta_ids), dtype=np.int64))
+
+    def _min_unit(self, inverse: np.ndarray, groups: int, mask: np.ndarray) -> List[Optional[str]]:
+        """``MIN(unit)`` per group, ignoring NULL units like SQL does."""
+        missing = len(self.units)
+        codes = np.where(self.unit[mask] >= 0, self.unit[mask], missing)
+        mins = np.full(groups, missing, dtype=np.int64)
+        np.minimum.at(mins, inverse, codes)
+        return [self.units[c] if c < missing else None for c in mins]
+
+    @staticmethod
+    def _group(keys: np.ndarray, *weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[np.ndarray]]:
+        """Group rows by ``keys`` (1-D or a 2-D stack) and sum each of ``weights`` exactly."""
+        if keys.ndim == 1:
+            groups, inverse = np.unique(keys, return_inverse=True)
+        else:
+            groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        sums = []
+        for w in weights:
+            total = np.zeros(len(groups), dtype=w.dtype)
+            np.add.at(total, inverse, w)
+            sums.append(total)
+        return groups, inverse, sums
+
+    # --- drill-downs ---
+
+    def dates(self) -> List[str]:
+        """Same as ``dashboard_repo.get_monthly_dates``."""
+        return [self._date(day) for day in np.unique(self.day)]
+
+    def daily_revenue_rows(self) -> List[dict]:
+        """Same as ``dashboard_repo.get_monthly_daily_revenue_rows``."""
+        days, _, (amounts,) = self._group(self.day, self.amount)
+        return [{"date": self._date(day), "amount": amount} for day, amount in zip(days, _round_int(amounts, self.amount_places))]
+
+    def daily_rows(self, date_value: str) -> List[dict]:
+        """Same as ``dashboard_repo.get_daily_rows`` (ordered by description code point)."""
+        day = self._day_of(date_value)
+        mask = self.day == day if day is not None else np.zeros(len(self), dtype=bool)
+        codes, inverse, (volumes, amounts) = self._group(self.description[mask], self.volume[mask], self.amount[mask])
+        units = self._min_unit(inverse, len(codes), mask)
+        return [
+            {
+                "description": self.descriptions[code] if code >= 0 else None,
+                "unit": unit,
+                "volume": volume,
+                "amount": amount,
+            }
+            for code, unit, volume, amount in zip(
+                codes, units, _round_int(volumes, self.volume_places), _round_int(amounts, self.amount_places)
+            )
+        ]
+
+    def daily_total(self, date_value: str) -> dict:
+        """Same as ``dashboard_repo.get_daily_total``."""
+        day = self._day_of(date_value)
+        total = self.amount[self.day == day].sum() if day is not None else 0
+        return {"total": _round_int([total], self.amount_places)[0]}
+
+    def description_daily_rows(self, description: str, smeta_ids: Sequence[int]) -> List[dict]:
+        """Same as ``dashboard_repo.get_description_daily_rows``."""
+        code = self._description_codes.get(description)
+        if code is None:
+            return []
+        mask = (self.description == code) & self._smeta_mask(smeta_ids)
+        days, inverse, (volumes, amounts) = self._group(self.day[mask], self.volume[mask], self.amount[mask])
+        units = self._min_unit(inverse, len(days), mask)
+        return [
+            {"date": self._date(day), "volume": volume, "unit": unit, "amount": amount}
+            for day, volume, unit, amount in zip(
+                days, _round_int(volumes, self.volume_places), units, _round_int(amounts, self.amount_places)
+            )
+        ]
+
+    def fact_by_type_of_work(self) -> List[dict]:
+        """Same as ``dashboard_repo.get_fact_by_type_of_work``."""
+        codes, _, (amounts,) = self._group(self.type_of_work, self.amount)
+        rows = [
+            {"type_of_work": self.types_of_work[code] if code >= 0 else "Не указано", "amount": amount}
+            for code, amount in zip(codes, _round_int(amounts, self.amount_places))
+        ]
+        rows.sort(key=lambda r: r["amount"], reverse=True)
+        return rows
+
+    def smeta_fact_rows(self, smeta_ids: Optional[Sequence[int]] = None) -> List[dict]:
+        """Unrounded fact per (id_smeta, description, type_of_work), as in the ``smeta``
+        rows of ``dashboard_repo.get_month_fact_breakdown``."""
+        mask = self._smeta_mask(smeta_ids) if smeta_ids is not None else np.ones(len(self), dtype=bool)
+        keys = np.stack([self.id_smeta[mask], self.description[mask], self.type_of_work[mask]], axis=1)
+        groups, _, (amounts,) = self._group(keys.reshape(-1, 3), self.amount[mask])
+        return [
+            {
+                "id_smeta": int(id_smeta),
+                "description": self.descriptions[desc] if desc >= 0 else None,
+                "type_of_work": self.types_of_work[tow] if tow >= 0 else None,
+                "amount": _unscaled(amount, self.amount_places),
+            }
+            for (id_smeta, desc, tow), amount in zip(groups, amounts)
+        ]
+
+    def fact_breakdown_rows(self) -> List[dict]:
+        """Same rows as ``dashboard_repo.get_month_fact_breakdown``."""
+        rows: List[Dict] = []
+        days, _, (day_amounts,) = self._group(self.day, self.amount)
+        rows.extend({"breakdown": "date", "date": self._date(d), "amount": _unscaled(a, self.amount_places)}
+            for d, a in zip(days, day_amounts)
+        )
+        codes, _, (type_amounts,) = self._group(self.type_of_work, self.amount)
+        rows.extend(
+            {
+                "breakdown": "type_of_work",
+                "type_of_work": self.types_of_work[c] if c >= 0 else None,
+                "amount": _unscaled(a, self.amount_places),
+            }
+            for c, a in zip(codes, type_amounts)
+        )
+        rows.extend({"breakdown": "smeta", **r} for r in self.smeta_fact_rows())
+        return rows
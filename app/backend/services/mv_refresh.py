@@ -0,0 +1,268 @@
+"""Refresh of the dashboard materialized views and hand-off to the API caches.
+
+The views are rebuilt in the dependency order of ``docs/materialized_views.md`` with
+``REFRESH MATERIALIZED VIEW CONCURRENTLY`` where the view has a unique index (readers
+keep seeing the previous contents instead of waiting on an exclusive lock), or a plain
+``REFRESH`` otherwise. Only when every view is refreshed is ``last_loaded`` moved (and a
+``NOTIFY`` sent on ``DATA_VERSION_CHANNEL``), so the API switches to the new data version
+at once and never mixes old and new aggregates; in the API process the caches are
+dropped and the latest months are built again right away (see
+``dashboard_service.prewarm``), the other workers do the same when their data version
+watcher sees the new value.
+
+A Postgres advisory lock keeps runs from overlapping across processes. Runs are started
+from ``POST /api/admin/mv-refresh`` (``routers/admin.py``) or from the command line::
+
+    python -m app.backend.services.mv_refresh --dsn "$DB_DSN"
+"""
+
+import argparse
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+
+import psycopg2
+from psycopg2 import sql
+
+from app.backend import metrics
+from app.backend.services import dashboard_service, data_version
+
+logger = logging.getLogger(__name__)
+
+# Dependency order from docs/materialized_views.md
+REFRESH_ORDER = (
+    "mv_fact_daily_amounts",
+    "mv_plan_vs_fact_monthly_ids",
+    "mv_plan_fact_monthly_backend_ids",
+    "mv_fact_dates_catalog",
+    "mv_months_catalog",
+)
+
+# Arbitrary key of the advisory lock held for the duration of a run
+ADVISORY_LOCK_KEY = 4_207_311
+
+# REFRESH ... CONCURRENTLY needs a unique index on plain columns without a WHERE clause
+HAS_UNIQUE_INDEX_SQL = """
+    SELECT EXISTS (
+        SELECT 1
+        FROM pg_index i
+        WHERE i.indrelid = %s::regclass
+          AND i.indisunique
+          AND i.indpred IS NULL
+          AND i.indexprs IS NULL
+    ) AS has_unique_index
+    """
+
+MATERIALIZED_VIEWS_SQL = "SELECT matviewname FROM pg_matviews WHERE schemaname = current_schema() AND matviewname = ANY(%s)"
+
+# Whole seconds, strictly increasing: two loads within one second (or a clock step back)
+# still give a new data version
+BUMP_LAST_LOADED_SQL = (
+    "UPDATE last_loaded SET last_loaded = GREATEST(localtimestamp(0), last_loaded + interval '1 second') "
+    "RETURNING last_loaded"
+)
+INSERT_LAST_LOADED_SQL = "INSERT INTO last_loaded (last_loaded) VALUES (localtimestamp(0)) RETURNING last_loaded"
+
+
+class RefreshInProgress(Exception):
+    """Another run holds the refresh lock."""
+
+
+@dataclass
+class ViewRefresh:
+    view: str
+    seconds: float
+    concurrently: bool
+
+
+@dataclass
+class RefreshResult:
+    started_at: str
+    views: List[ViewRefresh] = field(default_factory=list)
+    loaded_at: Optional[str] = None
+    prewarm_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _has_unique_index(cur, view: str) -> bool:
+    cur.execute(HAS_UNIQUE_INDEX_SQL, (view,))
+    return bool(cur.fetchone()[0])
+
+
+def _materialized_views(cur, views: Sequence[str]) -> List[str]:
+    cur.execute(MATERIALIZED_VIEWS_SQL, (list(views),))
+    return [row[0] for row in cur.fetchall()]
+
+
+def _refresh_view(cur, view: str, concurrently: bool) -> ViewRefresh:
+    use_concurrently = concurrently and _has_unique_index(cur, view)
+    if concurrently and not use_concurrently:
+        logger.warning("%s has no unique index, refreshing it with an exclusive lock", view)
+    statement = "REFRESH MATERIALIZED VIEW CONCURRENTLY {}" if use_concurrently else "REFRESH MATERIALIZED VIEW {}"
+    started = time.perf_counter()
+    cur.execute(sql.SQL(statement).format(sql.Identifier(view)))
+    seconds = time.perf_counter() - started
+    metrics.MV_REFRESH_SECONDS.labels(view=view).observe(seconds)
+    logger.info("Refreshed %s in %.1fs%s", view, seconds, " (concurrently)" if use_concurrently else "")
+    return ViewRefresh(view, round(seconds, 3), use_concurrently)
+
+
+def refresh_views(cur, views: Sequence[str], concurrently: bool = True) -> List[ViewRefresh]:
+    """Refresh ``views`` in order on an autocommit cursor.
+
+    Names that are not materialized views (e.g. aggregates kept as tables by
+    ``incremental_aggregates``) are skipped.
+    """
+    existing = set(_materialized_views(cur, views))
+    refreshed = []
+    for view in views:
+        if view not in existing:
+            logger.info("%s is not a materialized view, skipping it", view)
+            continue
+        refreshed.append(_refresh_view(cur, view, concurrently))
+    return refreshed
+
+
+def bump_last_loaded(cur):
+    """Move ``last_loaded`` to now and notify ``DATA_VERSION_CHANNEL``; returns the new value.
+
+    The new value is at least one second past the previous one, so every bump is a new
+    data version.
+    """
+    cur.execute(BUMP_LAST_LOADED_SQL)
+    row = cur.fetchone()
+    if row is None:
+        cur.execute(INSERT_LAST_LOADED_SQL)
+        row = cur.fetchone()
+    channel = os.environ.get("DATA_VERSION_CHANNEL")
+    if channel:
+        cur.execute("SELECT pg_notify(%s, %s)", (channel, row[0].isoformat()))
+    return row[0]
+
+
+@contextmanager
+def advisory_lock(cur) -> Iterator[None]:
+    """Hold the refresh lock on the cursor's session; raises ``RefreshInProgress`` if taken."""
+    cur.execute("SELECT pg_try_advisory_lock(%s)", (ADVISORY_LOCK_KEY,))
+    if not cur.fetchone()[0]:
+        metrics.MV_REFRESH_RUNS.labels(result="busy").inc()
+        raise RefreshInProgress()
+    try:
+        yield
+    finally:
+        cur.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_KEY,))
+
+
+def hand_off(loaded_at) -> float:
+    """Switch this process to the new data version and pre-warm its caches; returns seconds."""
+    started = time.perf_counter()
+    # The version change starts the pre-warm (dashboard_service._prewarm_on_data_change),
+    # also when the NOTIFY watcher applied it first: wait for that run instead of a second one
+    data_version.set_loaded_at(loaded_at)
+    dashboard_service.wait_for_prewarm()
+    return round(time.perf_counter() - started, 3)
+
+
+def refresh(
+    dsn: Optional[str] = None,
+    views: Sequence[str] = REFRESH_ORDER,
+    concurrently: bool = True,
+    handoff: bool = True,
+) -> RefreshResult:
+    """Refresh ``views`` in order, then move ``last_loaded``.
+
+    With ``handoff`` (the API process) the new version is applied in this process right
+    away and the caches are pre-warmed before returning. Raises ``RefreshInProgress`` if
+    another run holds the lock; a failed refresh leaves ``last_loaded`` untouched.
+    """
+    dsn = dsn or os.environ.get("DB_DSN")
+    if not dsn:
+        raise RuntimeError("DB_DSN is not set")
+    result = RefreshResult(started_at=datetime.now().isoformat(timespec="seconds"))
+    conn = psycopg2.connect(dsn)
+    try:
+        # REFRESH ... CONCURRENTLY cannot run inside a transaction block
+        conn.autocommit = True
+        with conn.cursor() as cur, advisory_lock(cur):
+            try:
+                result.views = refresh_views(cur, views, concurrently)
+                loaded_at = bump_last_loaded(cur)
+            except Exception as exc:
+                metrics.MV_REFRESH_RUNS.labels(result="failed").inc()
+                logger.exception("Materialized view refresh failed, last_loaded is not moved")
+                result.error = str(exc)
+                return result
+    finally:
+        conn.close()
+
+    metrics.MV_REFRESH_RUNS.labels(result="ok").inc()
+    result.loaded_at = loaded_at.isoformat()
+    if handoff:
+        result.prewarm_seconds = hand_off(loaded_at)
+    return result
+
+
+# --- Background runs started from the admin endpoint ---
+
+_run_lock = threading.Lock()
+_running = False
+_last_result: Optional[RefreshResult] = None
+
+
+def _run_in_background(concurrently: bool):
+    global _running, _last_result
+    try:
+        _last_result = refresh(concurrently=concurrently)
+    except RefreshInProgress:
+        _last_result = RefreshResult(started_at=datetime.now().isoformat(timespec="seconds"),
+                                     error="another refresh is running")
+    except Exception as exc:  # noqa: BLE001 - reported through status()
+        logger.exception("Materialized view refresh failed")
+        _last_result = RefreshResult(started_at=datetime.now().isoformat(timespec="seconds"), error=str(exc))
+    finally:
+        with _run_lock:
+            _running = False
+
+
+def start_background(concurrently: bool = True) -> bool:
+    """Start a run in a background thread; False if this process already runs one."""
+    global _running
+    with _run_lock:
+        if _running:
+            return False
+        _running = True
+    threading.Thread(target=_run_in_background, args=(concurrently,), name="mv-refresh", daemon=True).start()
+    return True
+
+
+def status() -> dict:
+    """Whether a run started in this process is in progress, and the result of the last one."""
+    return {"running": _running, "last_result": _last_result.to_dict() if _last_result else None}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh the dashboard materialized views and move last_loaded")
+    parser.add_argument("--dsn", default=os.environ.get("DB_DSN"), help="database DSN (default: DB_DSN)")
+    parser.add_argument("--no-concurrently", dest="concurrently", action="store_false",
+                        help="plain REFRESH (exclusive lock), e.g. for the first population")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    # The API workers pick the new version up through their watcher and pre-warm themselves
+    result = refresh(args.dsn, concurrently=args.concurrently, handoff=False)
+    for view in result.views:
+        print(f"{view.view:<36} {view.seconds:>9.1f}s{'  concurrently' if view.concurrently else ''}")
+    if result.error:
+        raise SystemExit(f"Refresh failed: {result.error}")
+    print(f"last_loaded = {result.loaded_at}")
+
+
+if __name__ == "__main__":
+    main()
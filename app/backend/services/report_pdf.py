@@ -0,0 +1,231 @@
+"""PDF layout of the monthly report, drawn with reportlab from the monthly page.
+
+``render_monthly_report`` takes the dict built by ``dashboard_service.build_monthly_page``
+(summary, smeta cards, smeta details by type of work, daily revenue) and returns the PDF
+bytes; it does no I/O of its own. Cyrillic needs a TrueType font: ``REPORT_FONT`` /
+``REPORT_FONT_BOLD`` (default DejaVu Sans from the ``fonts-dejavu-core`` package).
+"""
+
+import io
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import KeepTogether, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from app.backend.services.dashboard_service import SMETA_LABELS
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_FONT = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+_DEFAULT_FONT_BOLD = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+MONTH_NAMES = (
+    "январь", "февраль", "март", "апрель", "май", "июнь",
+    "июль", "август", "сентябрь", "октябрь", "ноябрь", "декабрь",
+)
+
+_MARGIN = 15 * mm
+_WIDTH = A4[0] - 2 * _MARGIN
+_HEADER_BACKGROUND = colors.HexColor("#e8edf3")
+_GROUP_BACKGROUND = colors.HexColor("#f5f7fa")
+_GRID = colors.HexColor("#c5ccd6")
+_BAR = colors.HexColor("#3b6ea8")
+
+_fonts: Optional[Tuple[str, str]] = None
+_fonts_lock = threading.Lock()
+
+
+def _register_fonts() -> Tuple[str, str]:
+    """Register the report fonts once; falls back to Helvetica (no Cyrillic) if missing."""
+    global _fonts
+    with _fonts_lock:
+        if _fonts is None:
+            regular = os.environ.get("REPORT_FONT", _DEFAULT_FONT)
+            bold = os.environ.get("REPORT_FONT_BOLD", _DEFAULT_FONT_BOLD)
+            try:
+                pdfmetrics.registerFont(TTFont("Report", regular))
+                pdfmetrics.registerFont(TTFont("Report-Bold", bold if os.path.exists(bold) else regular))
+                _fonts = ("Report", "Report-Bold")
+            except Exception:
+                logger.warning("Report font %s is not available, Cyrillic text will not render", regular, exc_info=True)
+                _fonts = ("Helvetica", "Helvetica-Bold")
+        return _fonts
+
+
+def _money(value) -> str:
+    return f"{round(value or 0):,}".replace(",", " ")
+
+
+def _percent(value: Optional[float]) -> str:
+    return "—" if value is None else f"{value * 100:.1f} %".replace(".", ",")
+
+
+def _month_title(month_key: str) -> str:
+    year, month = month_key.split("-")
+    return f"{MONTH_NAMES[int(month) - 1]} {year}"
+
+
+class _Styles:
+    def __init__(self, regular: str, bold: str):
+        self.regular = regular
+        self.bold = bold
+        self.title = ParagraphStyle("title", fontName=bold, fontSize=16, leading=20, spaceAfter=2 * mm)
+        self.subtitle = ParagraphStyle("subtitle", fontName=regular, fontSize=9, leading=12,
+                                       textColor=colors.HexColor("#5a6472"), spaceAfter=4 * mm)
+        self.heading = ParagraphStyle("heading", fontName=bold, fontSize=12, leading=15,
+                                      spaceBefore=5 * mm, spaceAfter=2 * mm)
+        self.cell = ParagraphStyle("cell", fontName=regular, fontSize=8, leading=10)
+        self.group = ParagraphStyle("group", fontName=bold, fontSize=8, leading=10)
+
+
+def _table(rows: List[list], widths: Sequence[float], styles: _Styles, extra: Sequence[tuple] = ()) -> Table:
+    table = Table(rows, colWidths=widths, repeatRows=1)
+    table.setStyle(TableStyle([
+        ("FONTNAME", (0, 0), (-1, -1), styles.regular),
+        ("FONTNAME", (0, 0), (-1, 0), styles.bold),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("BACKGROUND", (0, 0), (-1, 0), _HEADER_BACKGROUND),
+        ("GRID", (0, 0), (-1, -1), 0.4, _GRID),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+        *extra,
+    ]))
+    return table
+
+
+def _summary(page: dict, styles: _Styles) -> list:
+    summary = page["summary"]
+    contract, kpi = summary["contract"], summary["kpi"]
+    rows = [
+        ["Показатель", "Значение, руб."],
+        ["Сумма контракта", _money(contract["summa_contract"])],
+        ["Выполнено по контракту (все месяцы)", _money(contract["fact_total"])],
+        ["Выполнение контракта", _percent(contract["contract_planfact_pct"])],
+        ["План месяца", _money(kpi["plan_total"])],
+        ["Факт месяца", _money(kpi["fact_total"])],
+        ["Отклонение", _money(kpi["delta"])],
+        ["Среднедневная выручка", _money(kpi["avg_daily_revenue"])],
+    ]
+    return [Paragraph("Сводка", styles.heading), _table(rows, (_WIDTH * 0.6, _WIDTH * 0.4), styles)]
+
+
+def _smeta_cards(page: dict, styles: _Styles) -> list:
+    rows = [["Смета", "План", "Факт", "Отклонение"]]
+    for card in page["by_smeta"]["cards"]:
+        rows.append([card["label"], _money(card["plan"]), _money(card["fact"]), _money(card["delta"])])
+    widths = (_WIDTH * 0.4, _WIDTH * 0.2, _WIDTH * 0.2, _WIDTH * 0.2)
+    return [Paragraph("По сметам", styles.heading), _table(rows, widths, styles)]
+
+
+def _smeta_details(page: dict, smeta_key: str, styles: _Styles) -> list:
+    details = page["smeta_details_with_types"][smeta_key]["rows"]
+    heading = Paragraph(f"Смета «{SMETA_LABELS[smeta_key]}»: работы по типам", styles.heading)
+    if not details:
+        return [heading, Paragraph("Нет данных за месяц", styles.cell)]
+
+    # Rows come sorted by type of work; each group gets a subtotal line
+    groups: Dict[str, List[dict]] = {}
+    for row in details:
+        groups.setdefault(row.get("type_of_work") or "Не указано", []).append(row)
+    rows = [["Работа", "План", "Факт", "Отклонение"]]
+    extra = []
+    for type_of_work, group in groups.items():
+        extra.append(("BACKGROUND", (0, len(rows)), (-1, len(rows)), _GROUP_BACKGROUND))
+        extra.append(("FONTNAME", (1, len(rows)), (-1, len(rows)), styles.bold))
+        rows.append([
+            # Paragraph parses its text as markup: names from the DB are escaped
+            Paragraph(escape(type_of_work), styles.group),
+            _money(sum(r["plan"] for r in group)),
+            _money(sum(r["fact"] for r in group)),
+            _money(sum(r["delta"] for r in group)),
+        ])
+        for row in group:
+            rows.append([Paragraph(escape(row["description"] or ""), styles.cell),
+                         _money(row["plan"]), _money(row["fact"]), _money(row["delta"])])
+    widths = (_WIDTH * 0.52, _WIDTH * 0.16, _WIDTH * 0.16, _WIDTH * 0.16)
+    return [heading, _table(rows, widths, styles, extra)]
+
+
+def _daily_chart(rows: List[dict], styles: _Styles) -> Drawing:
+    drawing = Drawing(_WIDTH, 60 * mm)
+    chart = VerticalBarChart()
+    chart.x, chart.y = 12 * mm, 8 * mm
+    chart.width, chart.height = _WIDTH - 14 * mm, 48 * mm
+    chart.data = [[(r["amount"] or 0) / 1_000_000 for r in rows]]
+    chart.categoryAxis.categoryNames = [r["date"][8:10] for r in rows]
+    chart.categoryAxis.labels.fontName = styles.regular
+    chart.categoryAxis.labels.fontSize = 6
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.labels.fontName = styles.regular
+    chart.valueAxis.labels.fontSize = 7
+    chart.valueAxis.labelTextFormat = "%.1f"
+    chart.bars[0].fillColor = _BAR
+    chart.bars[0].strokeColor = None
+    drawing.add(chart)
+    return drawing
+
+
+def _daily_revenue(page: dict, styles: _Styles) -> list:
+    rows = page["daily_revenue"]["rows"]
+    heading = Paragraph("Выручка по дням, млн руб.", styles.heading)
+    if not rows:
+        return [heading, Paragraph("Нет данных за месяц", styles.cell)]
+    # Two date/amount column pairs side by side keep a month on half a page
+    half = (len(rows) + 1) // 2
+    table_rows = [["Дата", "Сумма, руб.", "Дата", "Сумма, руб."]]
+    for left, right in zip(rows[:half], rows[half:] + [None]):
+        line = [_day(left["date"]), _money(left["amount"])]
+        line += [_day(right["date"]), _money(right["amount"])] if right else ["", ""]
+        table_rows.append(line)
+    table = _table(table_rows, (_WIDTH * 0.2, _WIDTH * 0.3) * 2, styles, [("ALIGN", (2, 1), (2, -1), "LEFT")])
+    return [KeepTogether([heading, _daily_chart(rows, styles)]), Spacer(1, 3 * mm), table]
+
+
+def _day(date_value: str) -> str:
+    return datetime.strptime(date_value[:10], "%Y-%m-%d").strftime("%d.%m.%Y")
+
+
+def render_monthly_report(page: dict, loaded_at: Optional[str] = None) -> bytes:
+    """Render the monthly report for ``page`` (``build_monthly_page`` result) as PDF bytes."""
+    styles = _Styles(*_register_fonts())
+    month_key = page["month"]
+    generated = datetime.now().strftime("%d.%m.%Y %H:%M")
+    footer = f"Данные на {loaded_at or '—'} · сформировано {generated}"
+
+    def draw_footer(canvas, doc):
+        canvas.saveState()
+        canvas.setFont(styles.regular, 7)
+        canvas.setFillColor(colors.HexColor("#5a6472"))
+        canvas.drawString(_MARGIN, 8 * mm, footer)
+        canvas.drawRightString(A4[0] - _MARGIN, 8 * mm, f"Стр. {doc.page}")
+        canvas.restoreState()
+
+    story = [
+        Paragraph(f"Отчёт о выполнении работ: {_month_title(month_key)}", styles.title),
+        Paragraph(f"Месяц {month_key}. Суммы в рублях.", styles.subtitle),
+        *_summary(page, styles),
+        *_smeta_cards(page, styles),
+        *_daily_revenue(page, styles),
+    ]
+    for smeta_key in SMETA_LABELS:
+        story.extend(_smeta_details(page, smeta_key, styles))
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4, leftMargin=_MARGIN, rightMargin=_MARGIN, topMargin=_MARGIN, bottomMargin=_MARGIN,
+        title=f"Отчёт за {_month_title(month_key)}",
+    )
+    doc.build(story, onFirstPage=draw_footer, onLaterPages=draw_footer)
+    return buffer.getvalue()
@@ -0,0 +1,242 @@
+"""Monthly PDF reports rendered by background jobs and stored per data version.
+
+Rendering a multi-page PDF takes seconds of CPU, so requests never do it themselves:
+``submit`` puts a job on a bounded queue served by a small pool of worker threads
+(``REPORT_WORKERS``, default 2; ``REPORT_QUEUE_MAX``, default 20, beyond which
+``QueueFull`` is raised). A worker takes the month from the cached monthly page
+(``dashboard_service.build_monthly_page``), renders it with ``report_pdf`` and stores
+the file in ``REPORTS_DIR`` under the (month, data version, UTC date) job id.
+
+The job id is derived from the month, the data version and the UTC date (the report
+shows ``avg_daily_revenue``, which depends on today's date, like the monthly page cache
+key), so the same report is rendered once per data load and day: a repeated ``submit``
+returns the queued or finished job, and a stored file is served by any worker process
+without rendering. Older files of a month are removed when a newer one is stored.
+"""
+
+import logging
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from glob import glob
+from typing import List, Optional
+
+from app.backend import metrics
+from app.backend.services import dashboard_service, data_version, report_pdf
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs remembered for the status endpoint
+_MAX_JOBS = 200
+
+_JOB_ID = re.compile(r"^(\d{4}-\d{2})_([0-9A-Za-z]+)_(\d{8})$")
+
+
+class QueueFull(Exception):
+    """The render queue is full; the client should retry later."""
+
+
+@dataclass
+class ReportJob:
+    job_id: str
+    month: str
+    data_version: Optional[str]
+    status: str  # queued, running, done, failed
+    queued_at: Optional[str]
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    render_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def reports_dir() -> str:
+    return os.environ.get("REPORTS_DIR") or os.path.join(tempfile.gettempdir(), "skpdi-reports")
+
+
+def job_id_for(month_key: str, version: Optional[str]) -> str:
+    """Job id of the report of ``month_key`` for ``version`` rendered today (UTC)."""
+    token = re.sub(r"[^0-9A-Za-z]", "", version) if version else "none"
+    return f"{month_key}_{token}_{datetime.utcnow():%Y%m%d}"
+
+
+def stored_path(job_id: str) -> Optional[str]:
+    """Path of the stored PDF of ``job_id`` if it exists (None for unknown or malformed ids)."""
+    if not _JOB_ID.match(job_id):
+        return None
+    path = os.path.join(reports_dir(), f"monthly_{job_id}.pdf")
+    return path if os.path.exists(path) else None
+
+
+def _store(job_id: str, data: bytes):
+    directory = reports_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"monthly_{job_id}.pdf")
+    # Readers only ever see complete files
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    month_key = _JOB_ID.match(job_id).group(1)
+    for old in glob(os.path.join(directory, f"monthly_{month_key}_*.pdf")):
+        if old != path:
+            try:
+                os.unlink(old)
+            except OSError:
+                pass
+
+
+# --- Jobs and workers ---
+
+_lock = threading.Lock()
+_jobs: "OrderedDict[str, ReportJob]" = OrderedDict()
+_queue: Optional[queue.Queue] = None
+_workers: List[threading.Thread] = []
+
+
+def _remember(job: ReportJob):
+    _jobs[job.job_id] = job
+    _jobs.move_to_end(job.job_id)
+    while len(_jobs) > _MAX_JOBS:
+        oldest = next(iter(_jobs.values()))
+        if oldest.status in ("queued", "running"):
+            break
+        _jobs.popitem(last=False)
+
+
+def _render(job: ReportJob):
+    started = time.perf_counter()
+    page = dashboard_service.build_monthly_page(job.month)
+    loaded_at = dashboard_service.build_last_loaded()["loaded_at"]
+    metrics.REPORT_RENDER_SECONDS.labels(phase="data").observe(time.perf_counter() - started)
+    # The page cache follows the current data version and UTC date: a report of a version
+    # or day that is gone would be stored under the wrong key
+    if job_id_for(job.month, data_version.current_version()) != job.job_id:
+        raise RuntimeError("data version or date changed, request the report again")
+    started = time.perf_counter()
+    pdf = report_pdf.render_monthly_report(page, loaded_at)
+    metrics.REPORT_RENDER_SECONDS.labels(phase="pdf").observe(time.perf_counter() - started)
+    _store(job.job_id, pdf)
+
+
+def _run(job: ReportJob):
+    job.status = "running"
+    job.started_at = _now()
+    started = time.perf_counter()
+    try:
+        _render(job)
+    except Exception as exc:
+        logger.exception("Rendering report %s failed", job.job_id)
+        job.error = str(exc)
+        job.status = "failed"
+        metrics.REPORT_JOBS.labels(result="failed").inc()
+    else:
+        job.status = "done"
+        metrics.REPORT_JOBS.labels(result="rendered").inc()
+    finally:
+        job.render_seconds = round(time.perf_counter() - started, 3)
+        job.finished_at = _now()
+
+
+def _work(jobs: queue.Queue):
+    while True:
+        job = jobs.get()
+        metrics.REPORT_QUEUE_DEPTH.set(jobs.qsize())
+        if job is None:
+            return
+        _run(job)
+
+
+def _get_queue() -> queue.Queue:
+    """Start the worker pool on first use (called under ``_lock``)."""
+    global _queue
+    if _queue is None:
+        _queue = queue.Queue(maxsize=_env_int("REPORT_QUEUE_MAX", 20))
+        for number in range(max(1, _env_int("REPORT_WORKERS", 2))):
+            worker = threading.Thread(target=_work, args=(_queue,), name=f"report-worker-{number}", daemon=True)
+            worker.start()
+            _workers.append(worker)
+    return _queue
+
+
+def stop_workers():
+    """Let the workers finish their current job and exit (on shutdown)."""
+    global _queue
+    with _lock:
+        jobs, _queue = _queue, None
+        workers = list(_workers)
+        _workers.clear()
+    if jobs is None:
+        return
+    for _ in workers:
+        try:
+            jobs.put_nowait(None)
+        except queue.Full:
+            # Daemon threads: the ones still busy with queued jobs die with the process
+            break
+
+
+def submit(month: str) -> ReportJob:
+    """Queue the monthly report of ``month`` for the current data version.
+
+    Returns the existing job if one is queued, running or done for the same version
+    (a stored file counts as done). Raises ``QueueFull`` when the queue is full.
+    """
+    month_key = dashboard_service.normalize_month(month)
+    version = data_version.current_version()
+    if version is None:
+        version = data_version.refresh()
+    job_id = job_id_for(month_key, version)
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is not None and job.status in ("queued", "running"):
+            return job
+        if stored_path(job_id):
+            metrics.REPORT_JOBS.labels(result="stored").inc()
+            if job is None or job.status != "done":
+                job = ReportJob(job_id, month_key, version, status="done", queued_at=_now(), finished_at=_now())
+                _remember(job)
+            return job
+        job = ReportJob(job_id, month_key, version, status="queued", queued_at=_now())
+        jobs = _get_queue()
+        try:
+            jobs.put_nowait(job)
+        except queue.Full:
+            metrics.REPORT_JOBS.labels(result="rejected").inc()
+            raise QueueFull()
+        _remember(job)
+        metrics.REPORT_QUEUE_DEPTH.set(jobs.qsize())
+        return job
+
+
+def get_job(job_id: str) -> Optional[ReportJob]:
+    """Status of ``job_id``: the job of this process, or done if another process stored it."""
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is not None and (job.status != "done" or stored_path(job_id)):
+            return job
+    match = _JOB_ID.match(job_id)
+    if match and stored_path(job_id):
+        return ReportJob(job_id, match.group(1), None, status="done", queued_at=None)
+    return None
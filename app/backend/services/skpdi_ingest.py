@@ -0,0 +1,545 @@
+"""Ingestion of SKPDI report exports into ``skpdi_report_raw``.
+
+Follows "Файл из СКПДИ" in ``docs/Postgres DB.md``: report files (``.xlsx`` or
+``.csv``) are taken from a local directory (``SKPDI_DIR``), files whose SHA-256 matches
+the last successful run are skipped, and the columns of the rest are mapped into
+``skpdi_report_raw`` with the status, road section and work description resolved to
+their ids. The dimensions are read once into dictionaries, so resolving costs no
+queries.
+
+Files are streamed row by row (``openpyxl`` read-only mode, ``csv``) straight into
+``COPY`` of a temporary staging table, so memory does not grow with the file size. The
+staging rows are then merged by ``id_done_work``: new works are inserted, works whose
+columns changed are replaced, unchanged rows are left alone; a later file wins when a
+work appears in several. Rows of a work missing from a newer export are kept.
+
+The merge runs inside ``incremental_aggregates.update``, so the source rows, the file
+hashes and the recomputed aggregates of the touched ``(date, id_description)`` keys are
+committed together; while the aggregates are still materialized views a full
+``mv_refresh`` runs after the merge instead::
+
+    python -m app.backend.services.skpdi_ingest --dir /data/skpdi
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import itertools
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import openpyxl
+import psycopg2
+
+from app.backend import metrics
+from app.backend.services import incremental_aggregates, mv_refresh
+
+logger = logging.getLogger(__name__)
+
+FILE_SUFFIXES = (".xlsx", ".csv")
+
+# File column -> field, from "Файл из СКПДИ"; the other columns are not stored
+FILE_COLUMNS = {
+    "ID Плана": "id_plan",
+    "ID выполненной работы": "id_done_work",
+    "Дата завершения работы": "date_of_work",
+    "Время завершения работы": "time_of_closing",
+    "Статус работы": "status",
+    "Участок дороги": "section_of_road",
+    "Краткое описание работ и методы их производства": "description",
+    "Объем": "volume_done",
+    "Комментарий": "comments",
+}
+REQUIRED_FIELDS = ("id_done_work", "date_of_work", "description")
+
+# Exports may start with a title block above the header row
+HEADER_SEARCH_ROWS = 20
+
+# Unresolved dimension values logged per run and dimension
+UNRESOLVED_SAMPLES = 10
+
+STATUS_LOOKUP_SQL = "SELECT status, id_status FROM status_of_work ORDER BY id_status"
+SECTION_LOOKUP_SQL = 'SELECT section_of_road, "id_section of road" FROM section_of_road ORDER BY "id_section of road"'
+DESCRIPTION_LOOKUP_SQL = "SELECT description, id_description FROM work_description ORDER BY id_description"
+
+CREATE_INGESTED_FILES_SQL = """
+    CREATE TABLE IF NOT EXISTS skpdi_ingested_files (
+        file_name text PRIMARY KEY,
+        sha256 text NOT NULL,
+        rows_staged integer NOT NULL,
+        loaded_at timestamp without time zone NOT NULL
+    )
+    """
+INGESTED_FILES_SQL = "SELECT file_name, sha256 FROM skpdi_ingested_files"
+RECORD_FILE_SQL = """
+    INSERT INTO skpdi_ingested_files (file_name, sha256, rows_staged, loaded_at)
+    VALUES (%s, %s, %s, localtimestamp(0))
+    ON CONFLICT (file_name) DO UPDATE
+       SET sha256 = EXCLUDED.sha256, rows_staged = EXCLUDED.rows_staged, loaded_at = EXCLUDED.loaded_at
+    """
+
+RAW_COLUMNS = (
+    "id_plan", "id_done_work", "date_of_work", "time_of_closing", "id_status",
+    '"id_section of road"', "id_description", "volume_done", "comments",
+)
+
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE skpdi_staging (
+        seq bigint NOT NULL,
+        id_plan integer,
+        id_done_work integer NOT NULL,
+        date_of_work date NOT NULL,
+        time_of_closing time,
+        id_status bigint,
+        "id_section of road" bigint,
+        id_description bigint,
+        volume_done numeric,
+        comments text
+    ) ON COMMIT DROP
+    """
+COPY_STAGING_SQL = f"COPY skpdi_staging (seq, {', '.join(RAW_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+# Latest staged version of every work that is new or differs from skpdi_report_raw
+CHANGED_ROWS_SQL = """
+    CREATE TEMP TABLE skpdi_changed ON COMMIT DROP AS
+    WITH staged AS (
+        SELECT DISTINCT ON (id_done_work) *
+          FROM skpdi_staging
+         ORDER BY id_done_work, seq DESC
+    )
+    SELECT s.*, r.date_of_work AS old_date_of_work, r.id_description AS old_id_description,
+           r.id_done_work IS NOT NULL AS replaced
+      FROM staged s
+      LEFT JOIN skpdi_report_raw r ON r.id_done_work = s.id_done_work
+     WHERE r.id_done_work IS NULL
+        OR (r.id_plan, r.date_of_work, r.time_of_closing, r.id_status, r."id_section of road",
+            r.id_description, r.volume_done, r.comments)
+           IS DISTINCT FROM
+           (s.id_plan, s.date_of_work, s.time_of_closing, s.id_status, s."id_section of road",
+            s.id_description, s.volume_done, s.comments)
+    """
+CHANGED_COUNTS_SQL = """
+    SELECT count(DISTINCT id_done_work) FILTER (WHERE replaced),
+           count(DISTINCT id_done_work) FILTER (WHERE NOT replaced)
+      FROM skpdi_changed
+    """
+DELETE_REPLACED_SQL = """
+    DELETE FROM skpdi_report_raw r
+     USING (SELECT DISTINCT id_done_work FROM skpdi_changed WHERE replaced) c
+     WHERE r.id_done_work = c.id_done_work
+    """
+INSERT_CHANGED_SQL = f"""
+    INSERT INTO skpdi_report_raw ({', '.join(RAW_COLUMNS)})
+    SELECT DISTINCT ON (id_done_work) {', '.join(RAW_COLUMNS)} FROM skpdi_changed
+    """
+# Aggregate keys before and after the merge; rows without a description never reach them
+CHANGED_KEYS_SQL = """
+    SELECT date_of_work, id_description FROM skpdi_changed WHERE id_description IS NOT NULL
+    UNION
+    SELECT old_date_of_work, old_id_description FROM skpdi_changed
+     WHERE replaced AND old_id_description IS NOT NULL
+    """
+
+
+def _normalize(value: Any) -> str:
+    text = " ".join(str(value).split()).lower()
+    return text.replace("ё", "е")
+
+
+_HEADERS = {_normalize(name): name for name in FILE_COLUMNS}
+
+
+@dataclass
+class FileLoad:
+    file_name: str
+    rows: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+
+@dataclass
+class IngestResult:
+    started_at: str
+    files: List[FileLoad] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    inserted: int = 0
+    replaced: int = 0
+    unresolved: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    refresh: Optional[dict] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _Dimension:
+    """Normalized text -> id of one dimension table; the smallest id wins on duplicates."""
+
+    def __init__(self, name: str, rows: Iterable[Tuple[Any, int]]):
+        self.name = name
+        self.ids: Dict[str, int] = {}
+        for text, id_ in rows:
+            if text is not None:
+                self.ids.setdefault(_normalize(text), id_)
+        self.unresolved: Dict[str, int] = {}
+
+    def resolve(self, value: Any) -> Optional[int]:
+        if value is None or value == "":
+            return None
+        key = _normalize(value)
+        id_ = self.ids.get(key)
+        if id_ is None and (key in self.unresolved or len(self.unresolved) < UNRESOLVED_SAMPLES):
+            self.unresolved[key] = self.unresolved.get(key, 0) + 1
+        return id_
+
+
+class _Lookups:
+    def __init__(self, cur):
+        self.dimensions = {}
+        for name, query in (
+            ("status", STATUS_LOOKUP_SQL),
+            ("section_of_road", SECTION_LOOKUP_SQL),
+            ("description", DESCRIPTION_LOOKUP_SQL),
+        ):
+            cur.execute(query)
+            self.dimensions[name] = _Dimension(name, cur.fetchall())
+
+    def resolve(self, name: str, value: Any) -> Optional[int]:
+        return self.dimensions[name].resolve(value)
+
+    def unresolved(self) -> Dict[str, Dict[str, int]]:
+        return {name: dict(d.unresolved) for name, d in self.dimensions.items() if d.unresolved}
+
+
+class _CopyStream:
+    """File-like object feeding ``copy_expert`` from a row iterator, one chunk at a time."""
+
+    def __init__(self, rows: Iterator[Sequence[Any]]):
+        self._rows = rows
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            # A few rows at a time: keeps the buffer bounded
+            if self._buffer.tell() >= 8192:
+                self._pending += self._buffer.getvalue()
+                self._buffer.seek(0)
+                self._buffer.truncate()
+        if self._buffer.tell():
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+
+def sha256_of(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _xlsx_rows(path: Path) -> Iterator[Sequence[Any]]:
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _csv_encoding(path: Path) -> str:
+    with path.open("rb") as f:
+        sample = f.read(1 << 16)
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        # A multi-byte character cut at the end of the sample is still UTF-8
+        if exc.start < len(sample) - 3:
+            return "cp1251"
+    return "utf-8-sig"
+
+
+class _Semicolon(csv.excel):
+    delimiter = ";"
+
+
+def _csv_rows(path: Path) -> Iterator[Sequence[Any]]:
+    with path.open(newline="", encoding=_csv_encoding(path)) as f:
+        sample = f.read(1 << 16)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+        except csv.Error:
+            dialect = _Semicolon
+        yield from csv.reader(f, dialect)
+
+
+def _file_rows(path: Path) -> Iterator[Sequence[Any]]:
+    return _xlsx_rows(path) if path.suffix.lower() == ".xlsx" else _csv_rows(path)
+
+
+def _header_positions(rows: Iterator[Sequence[Any]], path: Path) -> Dict[str, int]:
+    for _ in range(HEADER_SEARCH_ROWS):
+        row = next(rows, None)
+        if row is None:
+            break
+        positions = {}
+        for index, cell in enumerate(row):
+            name = _HEADERS.get(_normalize(cell)) if cell is not None else None
+            if name is not None:
+                positions.setdefault(FILE_COLUMNS[name], index)
+        if all(field_ in positions for field_ in REQUIRED_FIELDS):
+            return positions
+    required = [column for column, name in FILE_COLUMNS.items() if name in REQUIRED_FIELDS]
+    raise ValueError(f"{path.name}: no header row with the columns {', '.join(required)}")
+
+
+def _to_int(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(Decimal(str(value).replace(" ", "").replace(",", ".")))
+
+
+def _to_date(value: Any) -> Optional[date]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()[:10]
+    for fmt in ("%d.%m.%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"bad date {value!r}")
+
+
+def _to_time(value: Any) -> Optional[dt_time]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.time()
+    if isinstance(value, dt_time):
+        return value
+    text = str(value).strip()
+    # "dd.mm.yyyy HH:MM" in some exports
+    text = text.rsplit(" ", 1)[-1]
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            return datetime.strptime(text, fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(f"bad time {value!r}")
+
+
+def _to_decimal(value: Any) -> Optional[Decimal]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, Decimal)):
+        return Decimal(value)
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    try:
+        return Decimal(str(value).replace("\xa0", "").replace(" ", "").replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(f"bad number {value!r}") from None
+
+
+def _staging_rows(path: Path, lookups: _Lookups, stats: FileLoad, next_seq: Callable[[], int]) -> Iterator[tuple]:
+    rows = iter(_file_rows(path))
+    positions = _header_positions(rows, path)
+
+    def cell(row: Sequence[Any], name: str) -> Any:
+        index = positions.get(name)
+        if index is None or index >= len(row):
+            return None
+        value = row[index]
+        return value.strip() if isinstance(value, str) else value
+
+    for row in rows:
+        if not any(value not in (None, "") for value in row):
+            continue
+        try:
+            id_done_work = _to_int(cell(row, "id_done_work"))
+            date_of_work = _to_date(cell(row, "date_of_work"))
+            if id_done_work is None or date_of_work is None:
+                raise ValueError("no work id or date")
+            record = (
+                next_seq(),
+                _to_int(cell(row, "id_plan")),
+                id_done_work,
+                date_of_work,
+                _to_time(cell(row, "time_of_closing")),
+                lookups.resolve("status", cell(row, "status")),
+                lookups.resolve("section_of_road", cell(row, "section_of_road")),
+                lookups.resolve("description", cell(row, "description")),
+                _to_decimal(cell(row, "volume_done")),
+                cell(row, "comments") or None,
+            )
+        except (ValueError, ArithmeticError) as exc:
+            stats.rejected += 1
+            if stats.rejected <= UNRESOLVED_SAMPLES:
+                logger.warning("%s: row rejected (%s): %r", path.name, exc, row)
+            continue
+        stats.rows += 1
+        yield record
+
+
+def report_files(directory: Path) -> List[Path]:
+    """Report files of ``directory``, oldest first (later files win on the same work)."""
+    files = [p for p in directory.iterdir() if p.is_file() and p.suffix.lower() in FILE_SUFFIXES
+             and not p.name.startswith(("~$", "."))]
+    return sorted(files, key=lambda p: (p.stat().st_mtime, p.name))
+
+
+def _merge(cur, result: IngestResult) -> incremental_aggregates.Batch:
+    cur.execute(CHANGED_ROWS_SQL)
+    cur.execute(CHANGED_COUNTS_SQL)
+    result.replaced, result.inserted = cur.fetchone()
+    cur.execute(DELETE_REPLACED_SQL)
+    cur.execute(INSERT_CHANGED_SQL)
+    cur.execute(CHANGED_KEYS_SQL)
+    keys = {(row[0], row[1]) for row in cur.fetchall()}
+    logger.info("Merged: %d works inserted, %d replaced, %d aggregate keys touched",
+                result.inserted, result.replaced, len(keys))
+    return incremental_aggregates.Batch(keys=keys)
+
+
+def _loader(files: Sequence[Path], result: IngestResult, force: bool) -> Callable[[Any], incremental_aggregates.Batch]:
+    hashes = {path: sha256_of(path) for path in files}
+
+    def load(cur) -> incremental_aggregates.Batch:
+        cur.execute(CREATE_INGESTED_FILES_SQL)
+        cur.execute(INGESTED_FILES_SQL)
+        known = dict(cur.fetchall())
+        changed = []
+        for path in files:
+            if not force and known.get(path.name) == hashes[path]:
+                result.unchanged.append(path.name)
+            else:
+                changed.append(path)
+        if not changed:
+            return incremental_aggregates.Batch()
+
+        lookups = _Lookups(cur)
+        cur.execute(CREATE_STAGING_SQL)
+        seq = itertools.count(1)
+        for path in changed:
+            stats = FileLoad(path.name)
+            started = time.perf_counter()
+            cur.copy_expert(COPY_STAGING_SQL, _CopyStream(_staging_rows(path, lookups, stats, seq.__next__)))
+            stats.seconds = round(time.perf_counter() - started, 3)
+            stats.rows_per_second = round(stats.rows / stats.seconds) if stats.seconds else 0.0
+            logger.info("%s: %d rows staged (%d rejected) in %.1fs, %.0f rows/s",
+                        path.name, stats.rows, stats.rejected, stats.seconds, stats.rows_per_second)
+            cur.execute(RECORD_FILE_SQL, (path.name, hashes[path], stats.rows))
+            result.files.append(stats)
+        result.unresolved = lookups.unresolved()
+        for name, samples in result.unresolved.items():
+            logger.warning("Unresolved %s values (stored as NULL): %s", name, samples)
+        return _merge(cur, result)
+
+    return load
+
+
+def _count(result: IngestResult):
+    """Add a successful run to the ingestion metrics (a failed one rolls back or is not visible)."""
+    metrics.SKPDI_INGEST_FILES.labels(result="unchanged").inc(len(result.unchanged))
+    metrics.SKPDI_INGEST_FILES.labels(result="loaded").inc(len(result.files))
+    metrics.SKPDI_INGEST_ROWS.labels(result="staged").inc(sum(f.rows for f in result.files))
+    metrics.SKPDI_INGEST_ROWS.labels(result="rejected").inc(sum(f.rejected for f in result.files))
+    metrics.SKPDI_INGEST_ROWS.labels(result="inserted").inc(result.inserted)
+    metrics.SKPDI_INGEST_ROWS.labels(result="replaced").inc(result.replaced)
+    total_seconds = sum(f.seconds for f in result.files)
+    if total_seconds:
+        metrics.SKPDI_INGEST_ROWS_PER_SECOND.set(sum(f.rows for f in result.files) / total_seconds)
+
+
+def _aggregates_are_views(cur) -> bool:
+    cur.execute(mv_refresh.MATERIALIZED_VIEWS_SQL, ([incremental_aggregates.DAILY_TABLE],))
+    return bool(cur.fetchall())
+
+
+def ingest(directory: Path, dsn: Optional[str] = None, handoff: bool = True, force: bool = False) -> IngestResult:
+    """Load the changed report files of ``directory`` and refresh the aggregates.
+
+    ``force`` loads every file regardless of its recorded hash. ``handoff`` pre-warms
+    this process after the refresh, as in ``mv_refresh.refresh``.
+    """
+    dsn = dsn or os.environ.get("DB_DSN")
+    if not dsn:
+        raise RuntimeError("DB_DSN is not set")
+    result = IngestResult(started_at=datetime.now().isoformat(timespec="seconds"))
+    load = _loader(report_files(directory), result, force)
+
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn, conn.cursor() as cur:
+            views = _aggregates_are_views(cur)
+            if views:
+                batch = load(cur)
+    except Exception as exc:
+        logger.exception("SKPDI ingestion failed, nothing is loaded")
+        result.error = str(exc)
+        return result
+    finally:
+        conn.close()
+
+    if not views:
+        update = incremental_aggregates.update(dsn=dsn, handoff=handoff, load=load)
+        result.refresh, result.error = update.to_dict(), update.error
+    elif batch:
+        refresh = mv_refresh.refresh(dsn, handoff=handoff)
+        result.refresh, result.error = refresh.to_dict(), refresh.error
+    # Only once the rows are committed and the aggregates refreshed
+    if result.error is None:
+        _count(result)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load SKPDI report files into skpdi_report_raw")
+    parser.add_argument("--dir", type=Path, default=os.environ.get("SKPDI_DIR"),
+                        help="directory with the report files (default: SKPDI_DIR)")
+    parser.add_argument("--dsn", default=os.environ.get("DB_DSN"), help="database DSN (default: DB_DSN)")
+    parser.add_argument("--force", action="store_true", help="load every file, even if unchanged")
+    args = parser.parse_args(argv)
+    if args.dir is None:
+        parser.error("--dir or SKPDI_DIR is required")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    # The API workers pick the new version up through their watcher and pre-warm themselves
+    result = ingest(args.dir, args.dsn, handoff=False, force=args.force)
+    for load in result.files:
+        print(f"{load.file_name:<48} {load.rows:>9} rows {load.rejected:>6} rejected "
+              f"{load.seconds:>8.1f}s {load.rows_per_second:>9.0f} rows/s")
+    if result.unchanged:
+        print(f"unchanged: {len(result.unchanged)} files")
+    print(f"inserted {result.inserted}, replaced {result.replaced}")
+    if result.error:
+        raise SystemExit(f"Ingestion failed: {result.error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,16 @@ function isRetryableStatus(status) {
   return status >= 500 || status === 425
 }
 
+// При перегрузке бэкенд отвечает 503 с Retry-After (в секундах) — ждём не меньше этого
+function retryDelayMs(res, attempt) {
+  const backoff = RETRY_BASE_DELAY_MS * (attempt + 1)
+  const retryAfter = Number(res.headers.get('retry-after'))
+  if (res.status === 503 && Number.isFinite(retryAfter) && retryAfter > 0) {
+    return Math.max(backoff, retryAfter * 1000)
+  }
+  return backoff
+}
+
 function wait(ms) {
   return new Promise(resolve => setTimeout(resolve, ms))
 }
@@ -55,7 +65,7 @@ async function request(path, options = {}) {
 
     if (!res.ok) {
       if (isRetryableStatus(res.status) && attempt < RETRY_ATTEMPTS - 1) {
-        await wait(RETRY_BASE_DELAY_MS * (attempt + 1))
+        await wait(retryDelayMs(res, attempt))
         continue
       }
       const text = await res.text().catch(() => '')
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.backend import admission
+
+
+@pytest.fixture(autouse=True)
+def _defaults(monkeypatch):
+    for name in ("ADMISSION_CONTROL", "ADMISSION_EXPORT_CONCURRENCY", "ADMISSION_EXPORT_QUEUE",
+                 "ADMISSION_HEAVY_CONCURRENCY", "ADMISSION_HEAVY_QUEUE", "DB_POOL_MAX", "DB_FANOUT_LIMIT"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("ADMISSION_MAX_WAIT", "0.05")
+
+
+def _scope(path: str) -> dict:
+    return {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []}
+
+
+@pytest.mark.parametrize("pool, fanout, exports, heavy", [
+    (None, None, 1, 3),
+    ("20", "3", 2, 6),
+    ("2", "3", 1, 1),
+    ("10", "1", 1, 9),
+])
+def test_default_limits_fit_the_pool(monkeypatch, pool, fanout, exports, heavy):
+    if pool:
+        monkeypatch.setenv("DB_POOL_MAX", pool)
+    if fanout:
+        monkeypatch.setenv("DB_FANOUT_LIMIT", fanout)
+    middleware = admission.AdmissionControlMiddleware(None)
+    assert middleware.gates["export"].limit == exports
+    assert middleware.gates["heavy"].limit == heavy
+
+
+def test_export_paths_have_their_own_class():
+    middleware = admission.AdmissionControlMiddleware(None)
+    assert middleware.route_class(_scope("/api/dashboard/export/daily")) == "export"
+    assert middleware.route_class(_scope("/api/dashboard/monthly/page")) == "heavy"
+
+
+def test_running_export_does_not_block_heavy_requests():
+    release = asyncio.Event()
+    statuses = []
+
+    async def app(scope, receive, send):
+        if "/export/" in scope["path"]:
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    async def scenario():
+        middleware = admission.AdmissionControlMiddleware(app)
+        download = asyncio.create_task(middleware(_scope("/api/dashboard/export/daily"), None, send))
+        await asyncio.sleep(0)
+        assert middleware.gates["export"].active == 1
+        for _ in range(5):
+            await middleware(_scope("/api/dashboard/monthly/page"), None, send)
+        # A second download waits for the running one and is turned away after ADMISSION_MAX_WAIT
+        await middleware(_scope("/api/dashboard/export/items"), None, send)
+        release.set()
+        await download
+        return middleware
+
+    middleware = asyncio.run(scenario())
+    assert statuses == [200] * 5 + [503, 200]
+    assert middleware.gates["export"].active == 0 and middleware.gates["heavy"].active == 0
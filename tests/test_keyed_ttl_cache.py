@@ -0,0 +1,148 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.backend import db
+from app.backend.services import dashboard_service as svc
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(svc, "monotonic", lambda: now[0])
+    return now
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = svc._KeyedTTLCache(ttl_seconds=60)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_set(("k",), factory))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == [1] and results == ["value"] * 5
+
+
+def test_async_misses_share_one_computation():
+    cache = svc._KeyedTTLCache(ttl_seconds=60)
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario():
+        return await asyncio.gather(*(cache.aget_or_set(("k",), factory) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["value"] * 5
+    assert calls == [1]
+
+
+def test_expired_entry_is_served_while_refreshing(clock):
+    cache = svc._KeyedTTLCache(ttl_seconds=60, stale_seconds=600)
+    cache.get_or_set(("k",), lambda: "old")
+    clock[0] += 61
+    refreshing = threading.Event()
+
+    def refresh():
+        refreshing.wait(5)
+        return "new"
+
+    assert cache.get_or_set(("k",), refresh) == "old"
+    flight = cache._in_flight[("k",)]
+    refreshing.set()
+    flight.event.wait(5)
+    assert cache.get_or_set(("k",), lambda: "unused") == "new"
+
+    # Past the stale window the caller computes the value itself
+    clock[0] += 61 + 600
+    assert cache.get_or_set(("k",), lambda: "newest") == "newest"
+
+
+def test_waiter_recomputes_when_the_leader_was_cancelled():
+    cache = svc._KeyedTTLCache(ttl_seconds=60)
+    leader_started, waiter_joined = threading.Event(), threading.Event()
+    calls = []
+
+    def factory():
+        calls.append(db.current_scope())
+        if len(calls) == 1:
+            leader_started.set()
+            waiter_joined.wait(5)
+            raise db.QueryCancelled()
+        return "value"
+
+    outcome = {}
+
+    def leader():
+        with db.query_scope() as scope:
+            scope.cancel()
+            try:
+                cache.get_or_set(("k",), factory)
+            except db.QueryCancelled:
+                outcome["leader"] = "cancelled"
+
+    def waiter():
+        leader_started.wait(5)
+        waiter_joined.set()
+        outcome["waiter"] = cache.get_or_set(("k",), factory)
+
+    threads = [threading.Thread(target=leader), threading.Thread(target=waiter)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert outcome == {"leader": "cancelled", "waiter": "value"}
+    assert len(calls) == 2
+
+
+def test_async_computation_outlives_a_disconnected_leader():
+    cache = svc._KeyedTTLCache(ttl_seconds=60)
+    started = None
+    scopes = []
+
+    async def factory():
+        scopes.append(db.current_scope())
+        await asyncio.sleep(0.05)
+        if db.scope_cancelled():
+            raise db.QueryCancelled()
+        return "value"
+
+    async def leader():
+        with db.query_scope(statement_timeout_ms=1234) as scope:
+            started.set_result(scope)
+            await cache.aget_or_set(("k",), factory)
+
+    async def scenario():
+        nonlocal started
+        started = asyncio.get_running_loop().create_future()
+        leader_task = asyncio.create_task(leader())
+        leader_scope = await started
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.aget_or_set(("k",), factory))
+        # The leader's client goes away
+        leader_scope.cancel()
+        leader_task.cancel()
+        value = await waiter
+        with pytest.raises(asyncio.CancelledError):
+            await leader_task
+        return leader_scope, value
+
+    leader_scope, value = asyncio.run(scenario())
+    assert value == "value"
+    assert len(scopes) == 1
+    assert scopes[0] is not leader_scope and scopes[0].statement_timeout_ms == 1234
@@ -0,0 +1,88 @@
+import random
+from collections import defaultdict
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+from app.backend.services import dashboard_service, month_cube
+
+MONTH = "2025-11"
+
+
+def _sql_int(value: Decimal) -> int:
+    """``numeric::int`` in Postgres: round half away from zero."""
+    return int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _rows(seed: int = 7):
+    """Fact rows whose per-day and per-type totals often end exactly on .5."""
+    rnd = random.Random(seed)
+    rows = []
+    for day in range(1, 29):
+        for i in range(rnd.randint(2, 12)):
+            rows.append({
+                "date_done": date(2025, 11, day),
+                "id_smeta": i % 4 + 1,
+                "id_description": i,
+                "description": f"Работа {i % 7}",
+                "type_of_work": ("Уборка", "Ремонт", None)[i % 3],
+                "unit": "м2",
+                "total_volume": Decimal(rnd.randint(1, 10_000)) / 4,
+                "total_amount": Decimal(rnd.randint(1, 10_000_000)) / 100,
+            })
+        # Close the day on an exact .5 (and a negative correction now and then)
+        day_total = sum(r["total_amount"] for r in rows if r["date_done"].day == day)
+        delta = Decimal("0.5") - (day_total - int(day_total)) + (-3 if day % 5 == 0 else 0)
+        rows.append({**rows[-1], "description": "Поправка", "total_amount": delta, "total_volume": Decimal("0.5")})
+    # Amounts with more decimal places than the rest (numeric has no fixed scale)
+    rows.append({**rows[0], "total_amount": Decimal("1234.5678"), "total_volume": Decimal("0.125")})
+    return rows
+
+
+def _grouped(rows, key, column="total_amount"):
+    sums = defaultdict(Decimal)
+    for r in rows:
+        sums[key(r)] += r[column]
+    return sums
+
+
+def test_daily_revenue_matches_sql_rounding():
+    rows = _rows()
+    cube = month_cube.MonthCube(MONTH, rows)
+    expected = {d.isoformat(): _sql_int(s) for d, s in _grouped(rows, lambda r: r["date_done"]).items()}
+    assert any(s % 1 == Decimal("0.5") for s in _grouped(rows, lambda r: r["date_done"]).values())
+    assert {r["date"]: r["amount"] for r in cube.daily_revenue_rows()} == expected
+
+
+def test_daily_rows_and_total_match_sql_rounding():
+    rows = _rows()
+    cube = month_cube.MonthCube(MONTH, rows)
+    for day in (1, 5, 10, 28):
+        day_rows = [r for r in rows if r["date_done"].day == day]
+        date_value = f"{MONTH}-{day:02d}"
+        amounts = _grouped(day_rows, lambda r: r["description"])
+        volumes = _grouped(day_rows, lambda r: r["description"], "total_volume")
+        assert {r["description"]: (r["volume"], r["amount"]) for r in cube.daily_rows(date_value)} == {
+            d: (_sql_int(volumes[d]), _sql_int(a)) for d, a in amounts.items()
+        }
+        assert cube.daily_total(date_value) == {"total": _sql_int(sum(r["total_amount"] for r in day_rows))}
+
+
+def test_type_of_work_and_smeta_details_match_sql_rounding():
+    rows = _rows()
+    cube = month_cube.MonthCube(MONTH, rows)
+    expected = {(t or "Не указано"): _sql_int(s) for t, s in _grouped(rows, lambda r: r["type_of_work"]).items()}
+    assert {r["type_of_work"]: r["amount"] for r in cube.fact_by_type_of_work()} == expected
+
+    # Unrounded sums are exact, so the service rounds them like the SQL rows
+    smeta = _grouped(rows, lambda r: (r["id_smeta"], r["description"], r["type_of_work"]))
+    cube_rows = cube.smeta_fact_rows()
+    assert {(r["id_smeta"], r["description"], r["type_of_work"]): r["amount"] for r in cube_rows} == dict(smeta)
+    assert all(dashboard_service._round_amount(r["amount"]) == _sql_int(smeta[(r["id_smeta"], r["description"], r["type_of_work"])])
+               for r in cube_rows)
+
+
+def test_empty_month():
+    cube = month_cube.MonthCube(MONTH, [])
+    assert cube.daily_revenue_rows() == []
+    assert cube.daily_total(f"{MONTH}-01") == {"total": 0}
+    assert cube.fact_breakdown_rows() == []
@@ -0,0 +1,83 @@
+import pytest
+
+from app.backend.benchmarks import query_budget
+from app.backend.repositories import dashboard_repo
+from app.backend.services import dashboard_service as svc
+
+
+@pytest.fixture
+def data():
+    svc._invalidate_caches()
+    data = query_budget.FixtureData()
+    with query_budget.recording_db(query_budget.RecordingDB(data)):
+        yield data
+    svc._invalidate_caches()
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    """(first, last) months of every range query."""
+    queried = []
+    for name in ("get_range_daily_revenue_rows", "get_range_plan_fact"):
+        original = getattr(dashboard_repo, name)
+
+        def recording(first, last, original=original):
+            queried.append((first, last))
+            return original(first, last)
+
+        monkeypatch.setattr(dashboard_repo, name, recording)
+    return queried
+
+
+@pytest.mark.parametrize("cached, span", [
+    ([], ["2025-01", "2025-02", "2025-03", "2025-04"]),
+    (["2025-01", "2025-02", "2025-03", "2025-04"], []),
+    (["2025-01", "2025-04"], ["2025-02", "2025-03"]),
+    (["2025-02"], ["2025-01", "2025-02", "2025-03", "2025-04"]),
+    (["2025-01", "2025-02"], ["2025-03", "2025-04"]),
+])
+def test_range_cached_queries_one_span(cached, span):
+    cache = svc._KeyedTTLCache(ttl_seconds=60, max_entries=10)
+    for month_key in cached:
+        cache.get_or_set(svc._versioned_key(month_key), lambda month_key=month_key: {"month": month_key})
+    months = ["2025-01", "2025-02", "2025-03", "2025-04"]
+    found, missing = svc.range_cached(cache, months)
+    assert missing == span
+    assert {m for m, entry in found.items() if entry is not None} == set(cached)
+
+
+def test_sliding_range_queries_only_new_months(data, spans):
+    first = svc.build_daily_revenue_range("2025-09", "2025-10")
+    slid = svc.build_daily_revenue_range("2025-09", "2025-11")
+    assert spans == [("2025-09", "2025-10"), ("2025-11", "2025-11")]
+    assert slid["rows"][:len(first["rows"])] == first["rows"]
+    # The single-month endpoint reads the same entries
+    assert svc.build_monthly_daily_revenue("2025-11")["rows"] == [r for r in slid["rows"] if r["date"][:7] == "2025-11"]
+    assert spans == [("2025-09", "2025-10"), ("2025-11", "2025-11")]
+
+
+def test_longest_range_keeps_hot_months_cached(data, spans):
+    svc.build_monthly_daily_revenue("2025-11")
+    months = svc.range_months("2023-01", "2025-12")
+    assert len(months) == svc.RANGE_MAX_MONTHS
+    svc.build_daily_revenue_range(months[0], months[-1])
+    svc.build_daily_revenue_range("2023-02", "2026-01")
+    # One span from the first to the last missing month; the slide only adds its new month
+    assert spans == [("2023-01", "2025-12"), ("2026-01", "2026-01")]
+    assert svc._DAILY_REVENUE_CACHE.peek(svc._versioned_key("2025-11")) is not None
+
+
+def test_fact_cumulative_runs_over_all_earlier_months(data, spans):
+    result = svc.build_monthly_range("2025-09", "2025-12")
+    months = result["months"]
+    cumulative = [m["contract"]["fact_cumulative"] for m in months]
+    assert cumulative[0] == months[0]["fact_total"]
+    for previous, current, month in zip(cumulative, cumulative[1:], months[1:]):
+        assert current - previous == month["fact_total"]
+    assert cumulative[-1] == cumulative[-2] == data.fact_total_all_months()
+    contract = months[-1]["contract"]
+    assert contract["contract_planfact_pct"] == pytest.approx(contract["fact_cumulative"] / contract["summa_contract"])
+
+    # Cached months keep their cumulative value when a later range starts after them
+    assert svc.build_monthly_range("2025-10", "2025-12")["months"] == months[1:]
+    assert spans == [("2025-09", "2025-12")]
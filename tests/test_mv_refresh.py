@@ -0,0 +1,38 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app.backend.services import dashboard_service, data_version, mv_refresh
+
+
+@pytest.fixture
+def prewarms(monkeypatch):
+    """Names of the threads that ran a (slow) pre-warm."""
+    monkeypatch.setenv("CACHE_PREWARM_MONTHS", "2")
+    monkeypatch.setattr(data_version, "_version", None)
+    monkeypatch.setattr(data_version, "_loaded_at", None)
+    calls = []
+
+    def prewarm(months=None):
+        time.sleep(0.2)
+        calls.append(threading.current_thread().name)
+        return []
+
+    monkeypatch.setattr(dashboard_service, "prewarm", prewarm)
+    yield calls
+    dashboard_service.wait_for_prewarm()
+
+
+def test_hand_off_waits_for_the_version_change_prewarm(prewarms):
+    seconds = mv_refresh.hand_off(datetime(2025, 11, 30, 10, 0, 0))
+    assert prewarms == ["cache-prewarm"]
+    assert seconds >= 0.2
+
+
+def test_hand_off_after_the_watcher_applied_the_version(prewarms):
+    loaded_at = datetime(2025, 11, 30, 10, 0, 1)
+    data_version.set_loaded_at(loaded_at)  # NOTIFY watcher got there first
+    mv_refresh.hand_off(loaded_at)
+    assert prewarms == ["cache-prewarm"]
@@ -0,0 +1,26 @@
+from decimal import Decimal
+
+import pytest
+
+from app.backend.benchmarks import query_budget
+
+
+@pytest.fixture(autouse=True)
+def _restore_env(monkeypatch):
+    # run() sets these for the budgeted configuration; monkeypatch restores them afterwards
+    monkeypatch.delenv("MONTH_CUBE", raising=False)
+    monkeypatch.setenv("CACHE_PREWARM_MONTHS", "0")
+    monkeypatch.setenv("ADMISSION_CONTROL", "0")
+
+
+@pytest.mark.parametrize("use_async", [False, True], ids=["threadpool", "async"])
+def test_endpoints_stay_within_budget(use_async):
+    lines, passed = query_budget.run(use_async=use_async)
+    assert passed, "\n".join(lines)
+
+
+def test_fixture_rounds_like_numeric_to_int():
+    assert query_budget._rounded(Decimal("10.5")) == 11
+    assert query_budget._rounded(Decimal("10.49")) == 10
+    assert query_budget._rounded(Decimal("-10.5")) == -11
+    assert query_budget._rounded(0) == 0
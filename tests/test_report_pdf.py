@@ -0,0 +1,45 @@
+from app.backend.services import report_pdf
+from app.backend.services.dashboard_service import SMETA_LABELS
+
+MONTH = "2025-11"
+
+
+def _page(type_of_work: str, description: str) -> dict:
+    cards = [{"smeta_key": key, "label": label, "plan": 100, "fact": 90, "delta": -10} for key, label in SMETA_LABELS.items()]
+    details = {
+        key: {
+            "month": MONTH,
+            "smeta_key": key,
+            "rows": [
+                {"type_of_work": type_of_work, "description": description, "description_id": "x",
+                 "plan": 1000, "fact": 1500, "delta": 500},
+                {"type_of_work": None, "description": None, "description_id": "y", "plan": 0, "fact": 7, "delta": 7},
+            ],
+        }
+        for key in SMETA_LABELS
+    }
+    return {
+        "month": MONTH,
+        "summary": {
+            "month": MONTH,
+            "contract": {"summa_contract": 1_000_000, "fact_total": 250_000, "contract_planfact_pct": 0.25},
+            "kpi": {"plan_total": 300, "fact_total": 270, "delta": -30, "avg_daily_revenue": 9},
+        },
+        "by_smeta": {"month": MONTH, "cards": cards},
+        "daily_revenue": {"month": MONTH, "rows": [{"date": f"{MONTH}-{d:02d}", "amount": d * 1000} for d in range(1, 6)]},
+        "smeta_details_with_types": details,
+    }
+
+
+def test_renders_markup_characters_from_data():
+    page = _page("Ремонт <покрытий> & ям", "Ремонт покрытия <b толщиной до 5 см & более > 3 слоёв")
+    pdf = report_pdf.render_monthly_report(page, "2025-11-21T06:00:00")
+    assert pdf.startswith(b"%PDF-")
+
+
+def test_renders_month_without_data():
+    page = _page("Уборка", "Уборка территории")
+    page["daily_revenue"]["rows"] = []
+    for details in page["smeta_details_with_types"].values():
+        details["rows"] = []
+    assert report_pdf.render_monthly_report(page).startswith(b"%PDF-")
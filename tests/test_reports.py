@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pytest
+
+from app.backend.services import reports
+
+
+class _Clock(datetime):
+    current = datetime(2025, 11, 30, 23, 59, 59)
+
+    @classmethod
+    def utcnow(cls):
+        return cls.current
+
+
+@pytest.fixture
+def clock(monkeypatch, tmp_path):
+    monkeypatch.setattr(reports, "datetime", _Clock)
+    monkeypatch.setenv("REPORTS_DIR", str(tmp_path))
+    _Clock.current = datetime(2025, 11, 30, 23, 59, 59)
+    return _Clock
+
+
+def test_job_id_rolls_over_with_utc_date(clock):
+    today = reports.job_id_for("2025-11", "2025-11-30T10:00:00")
+    assert today == "2025-11_20251130T100000_20251130"
+    clock.current = datetime(2025, 12, 1, 0, 0, 1)
+    assert reports.job_id_for("2025-11", "2025-11-30T10:00:00") != today
+
+
+def test_yesterdays_report_is_not_served_today(clock):
+    yesterday = reports.job_id_for("2025-11", "v1")
+    reports._store(yesterday, b"%PDF-yesterday")
+    assert reports.stored_path(yesterday)
+
+    clock.current = datetime(2025, 12, 1, 0, 0, 1)
+    today = reports.job_id_for("2025-11", "v1")
+    assert reports.stored_path(today) is None
+    reports._store(today, b"%PDF-today")
+    # Storing today's file prunes the older one of the month
+    assert reports.stored_path(today) and reports.stored_path(yesterday) is None
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from starlette.requests import Request
+
+from app.backend import response_cache
+from app.backend.response_cache import CachedResponse, ResponseCache
+
+
+def _request(path: str = "/api/dashboard/monthly/summary", query: bytes = b"month=2025-11") -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query, "headers": []})
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(max_entries=8, ttl_seconds=60)
+    entry = CachedResponse(b"{}")
+    cache.put(("key",), entry)
+
+    now[0] += 59
+    assert cache.get(("key",)) is entry
+    now[0] += 1
+    assert cache.get(("key",)) is None
+
+
+def test_request_key_rolls_over_with_utc_date(monkeypatch):
+    class FakeDatetime:
+        today = datetime(2025, 11, 30, 23, 59)
+
+        @classmethod
+        def utcnow(cls):
+            return cls.today
+
+    monkeypatch.setattr(response_cache, "datetime", FakeDatetime)
+    before = response_cache.request_key(_request())
+    assert response_cache.request_key(_request()) == before
+
+    FakeDatetime.today = datetime(2025, 12, 1, 0, 0)
+    assert response_cache.request_key(_request()) != before
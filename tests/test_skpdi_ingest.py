@@ -0,0 +1,181 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from app.backend import metrics
+from app.backend.services import skpdi_ingest
+from app.backend.services.skpdi_ingest import FileLoad, IngestResult
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("", None),
+    (date(2025, 11, 3), date(2025, 11, 3)),
+    (datetime(2025, 11, 3, 14, 30), date(2025, 11, 3)),
+    ("03.11.2025", date(2025, 11, 3)),
+    ("03.11.2025 14:30", date(2025, 11, 3)),
+    ("2025-11-03", date(2025, 11, 3)),
+    (" 2025-11-03T14:30:00", date(2025, 11, 3)),
+])
+def test_to_date(value, expected):
+    assert skpdi_ingest._to_date(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("", None),
+    (time(14, 30), time(14, 30)),
+    (datetime(2025, 11, 3, 14, 30, 5), time(14, 30, 5)),
+    ("14:30", time(14, 30)),
+    ("14:30:05", time(14, 30, 5)),
+    ("03.11.2025 14:30", time(14, 30)),
+])
+def test_to_time(value, expected):
+    assert skpdi_ingest._to_time(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("", None),
+    (12, Decimal(12)),
+    (Decimal("1.50"), Decimal("1.50")),
+    (0.1, Decimal("0.1")),
+    ("1 234,5", Decimal("1234.5")),
+    ("1\xa0234,50", Decimal("1234.50")),
+    ("-3.25", Decimal("-3.25")),
+])
+def test_to_decimal(value, expected):
+    result = skpdi_ingest._to_decimal(value)
+    assert result == expected and (expected is None or str(result) == str(expected))
+
+
+@pytest.mark.parametrize("convert, value", [
+    (skpdi_ingest._to_date, "31.02.2025"),
+    (skpdi_ingest._to_date, "вчера"),
+    (skpdi_ingest._to_time, "25:00"),
+    (skpdi_ingest._to_decimal, "12 штук"),
+])
+def test_bad_values_raise_value_error(convert, value):
+    with pytest.raises(ValueError):
+        convert(value)
+
+
+@pytest.mark.parametrize("rows, expected", [
+    (
+        [["ID выполненной работы", "Дата завершения работы", "Краткое описание работ и методы их производства"]],
+        {"id_done_work": 0, "date_of_work": 1, "description": 2},
+    ),
+    (
+        # Title block above the header, extra spaces, case and ё, unknown columns skipped
+        [["Отчёт о выполненных работах"], [], [None, "Прочее", " id  выполненной работы ", "ДАТА ЗАВЕРШЕНИЯ РАБОТЫ",
+                                               "Краткое описание работ и методы их производства", "Объём", "Объем"]],
+        {"id_done_work": 2, "date_of_work": 3, "description": 4, "volume_done": 5},
+    ),
+])
+def test_header_positions(rows, expected):
+    rows = iter(rows)
+    assert skpdi_ingest._header_positions(rows, Path("report.csv")) == expected
+
+
+def test_header_positions_without_required_columns():
+    with pytest.raises(ValueError, match="report.csv"):
+        skpdi_ingest._header_positions(iter([["ID Плана", "Объем"]]), Path("report.csv"))
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("Дата;Объем\n".encode("utf-8"), "utf-8-sig"),
+    ("﻿Дата;Объем\n".encode("utf-8"), "utf-8-sig"),
+    ("Дата;Объем\n".encode("cp1251"), "cp1251"),
+    # A multi-byte character cut by the 64 KiB sample is still UTF-8
+    (b"a" * ((1 << 16) - 1) + "Ж".encode("utf-8"), "utf-8-sig"),
+])
+def test_csv_encoding(tmp_path, content, expected):
+    path = tmp_path / "report.csv"
+    path.write_bytes(content)
+    assert skpdi_ingest._csv_encoding(path) == expected
+
+
+@pytest.mark.parametrize("size", [-1, 1, 7, 100, 10_000])
+def test_copy_stream_read(size):
+    rows = [(i, f"работа {i}", None, 'с "кавычками", и запятой') for i in range(2000)]
+    stream = skpdi_ingest._CopyStream(iter(rows))
+    chunks = []
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        assert size < 0 or len(chunk) <= size
+        chunks.append(chunk)
+    text = "".join(chunks)
+    assert text.count("\n") == len(rows)
+    assert text.startswith('0,работа 0,,"с ""кавычками"", и запятой"\n')
+
+
+def _sample(name: str, result: str) -> float:
+    return getattr(metrics, name).labels(result=result)._value.get()
+
+
+def _result() -> IngestResult:
+    result = IngestResult(started_at="2025-11-30T10:00:00", unchanged=["old.csv"], inserted=5, replaced=2)
+    result.files.append(FileLoad("new.csv", rows=10, rejected=1, seconds=0.5))
+    return result
+
+
+class _Conn:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return self
+
+    def close(self):
+        pass
+
+
+class _Run:
+    def __init__(self, error):
+        self.error = error
+
+    def to_dict(self):
+        return {"error": self.error}
+
+
+@pytest.mark.parametrize("failure", ["merge", "refresh", "update"])
+def test_failed_run_is_not_counted(monkeypatch, tmp_path, failure):
+    before = {label: _sample("SKPDI_INGEST_ROWS", label) for label in ("staged", "inserted")}
+
+    def loader(files, result, force):
+        def load(cur):
+            result.files.append(FileLoad("new.csv", rows=10))
+            result.inserted = 10
+            if failure == "merge":
+                raise RuntimeError("merge failed")
+            return skpdi_ingest.incremental_aggregates.Batch(keys={(date(2025, 11, 3), 1)})
+        return load
+
+    monkeypatch.setattr(skpdi_ingest, "report_files", lambda directory: [])
+    monkeypatch.setattr(skpdi_ingest, "_loader", loader)
+    monkeypatch.setattr(skpdi_ingest.psycopg2, "connect", lambda dsn: _Conn())
+    monkeypatch.setattr(skpdi_ingest, "_aggregates_are_views", lambda cur: failure != "update")
+    monkeypatch.setattr(skpdi_ingest.mv_refresh, "refresh", lambda dsn, handoff: _Run("refresh failed"))
+    monkeypatch.setattr(skpdi_ingest.incremental_aggregates, "update",
+                        lambda dsn, handoff, load: load(None) and _Run("aggregate update failed"))
+
+    result = skpdi_ingest.ingest(tmp_path, dsn="postgresql://test")
+    assert result.error
+    assert {label: _sample("SKPDI_INGEST_ROWS", label) for label in ("staged", "inserted")} == before
+
+
+def test_successful_run_is_counted():
+    before = {label: _sample("SKPDI_INGEST_ROWS", label) for label in ("staged", "rejected", "inserted", "replaced")}
+    files_before = {label: _sample("SKPDI_INGEST_FILES", label) for label in ("loaded", "unchanged")}
+    skpdi_ingest._count(_result())
+    after = {label: _sample("SKPDI_INGEST_ROWS", label) - before[label] for label in before}
+    assert after == {"staged": 10, "rejected": 1, "inserted": 5, "replaced": 2}
+    assert {label: _sample("SKPDI_INGEST_FILES", label) - files_before[label] for label in files_before} == {
+        "loaded": 1, "unchanged": 1}
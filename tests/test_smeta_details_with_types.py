@@ -0,0 +1,87 @@
+from decimal import Decimal
+
+import pytest
+
+from app.backend.services import dashboard_service as svc
+
+MONTH = "2025-11"
+
+
+def _sql_reference(smeta_key, plan_fact_rows, smeta_fact_rows):
+    """Rows of SMETA_DETAILS_WITH_TYPE_OF_WORK_SQL, evaluated literally (before ORDER BY)."""
+    smeta_ids = svc.smeta_key_to_ids(smeta_key)
+
+    def with_type(rows, column):
+        sums = {}
+        for r in rows:
+            if r["id_smeta"] in smeta_ids:
+                key = (r["id_smeta"], r["description"], r["type_of_work"])
+                sums[key] = sums.get(key, 0) + r[column]
+        return [(*key, svc._round_amount(amount)) for key, amount in sums.items()]
+
+    plan, fact = with_type(plan_fact_rows, "plan"), with_type(smeta_fact_rows, "amount")
+    # FULL OUTER JOIN ... ON p.id_smeta = f.id_smeta AND p.description = f.description (NULL never equals)
+    combined, matched_fact = [], set()
+    for p in plan:
+        matches = [f for f in fact if p[0] == f[0] and p[1] is not None and f[1] is not None and p[1] == f[1]]
+        for f in matches or [None]:
+            combined.append({"type_of_work": p[2] if p[2] is not None else (f[2] if f else None),
+                             "description": p[1], "plan": p[3], "fact": f[3] if f else 0})
+        matched_fact.update(matches)
+    combined += [{"type_of_work": f[2], "description": f[1], "plan": 0, "fact": f[3]}
+                 for f in fact if f not in matched_fact]
+    return [r for r in combined if r["plan"] > 1 or r["fact"] > 1]
+
+
+def _plan(id_smeta, description, type_of_work, plan):
+    return {"id_smeta": id_smeta, "description": description, "type_of_work": type_of_work,
+            "plan": Decimal(plan), "fact": Decimal(0)}
+
+
+def _fact(id_smeta, description, type_of_work, amount):
+    return {"id_smeta": id_smeta, "description": description, "type_of_work": type_of_work, "amount": Decimal(amount)}
+
+
+PLAN = [
+    _plan(1, "Покос травы", "Ремонт", "1000.5"),
+    _plan(1, "Ямочный ремонт", "Ремонт", "500"),
+    _plan(1, "Ямочный ремонт", "Содержание", "300.25"),
+    _plan(1, None, "Уборка", "200"),
+    _plan(1, "Только план", None, "70.5"),
+    _plan(2, "Покос травы", "Зима", "999"),
+    _plan(3, "Вне регламента", "Ремонт", "40"),
+]
+FACT = [
+    _fact(1, "Покос травы", None, "400.5"),
+    _fact(1, "Ямочный ремонт", "Другое", "120"),
+    _fact(1, None, "Уборка", "90"),
+    _fact(1, "Только факт", "Благоустройство", "60.49"),
+    _fact(1, "Только план", "Озеленение", "0.4"),
+    _fact(4, "Вне регламента", None, "15.5"),
+]
+
+
+def _key(r):
+    return (r["type_of_work"] or "", r["description"] or "", r["plan"], r["fact"])
+
+
+@pytest.mark.parametrize("smeta_key", ["leto", "zima", "vnereglement"])
+def test_matches_sql_join_semantics(smeta_key):
+    result = svc.smeta_details_with_types_from_rows(MONTH, smeta_key, PLAN, FACT)["rows"]
+    expected = _sql_reference(smeta_key, PLAN, FACT)
+    if smeta_key == "vnereglement":
+        expected = [{**r, "plan": 0} for r in expected]
+    assert sorted(map(_key, result)) == sorted(map(_key, expected))
+    # ORDER BY type_of_work NULLS LAST
+    types = [r["type_of_work"] for r in result]
+    assert types == sorted(types, key=lambda t: (t is None, t or ""))
+
+
+def test_plan_type_wins_and_null_descriptions_stay_apart():
+    rows = svc.smeta_details_with_types_from_rows(MONTH, "leto", PLAN, FACT)["rows"]
+    mowing = [r for r in rows if r["description"] == "Покос травы"]
+    assert [(r["type_of_work"], r["plan"], r["fact"]) for r in mowing] == [("Ремонт", 1001, 401)]
+    assert sorted((r["plan"], r["fact"]) for r in rows if r["description"] is None) == [(0, 90), (200, 0)]
+    # Every plan type of a work joins the work's fact
+    patching = sorted((r["type_of_work"], r["fact"]) for r in rows if r["description"] == "Ямочный ремонт")
+    assert patching == [("Ремонт", 120), ("Содержание", 120)]
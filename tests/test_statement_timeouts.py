@@ -0,0 +1,21 @@
+import logging
+
+from app.backend.routers import dashboard
+
+
+def test_overrides_skip_malformed_entries(caplog):
+    with caplog.at_level(logging.WARNING, logger=dashboard.logger.name):
+        timeouts = dashboard._parse_statement_timeouts("monthly_page=30000, daily=abc,=5,bad,,summary=-1, daily_total=0")
+    assert timeouts["monthly_page"] == 30000
+    assert timeouts["daily_total"] == 0
+    assert "daily" not in timeouts and "summary" not in timeouts
+    assert timeouts["combined_dashboard"] == dashboard._STATEMENT_TIMEOUTS_MS["combined_dashboard"]
+    assert len(caplog.records) == 4
+
+
+def test_malformed_default_falls_back(caplog):
+    with caplog.at_level(logging.WARNING, logger=dashboard.logger.name):
+        assert dashboard._parse_default_timeout_ms("10s") == 10000
+    assert len(caplog.records) == 1
+    assert dashboard._parse_default_timeout_ms(None) == 10000
+    assert dashboard._parse_default_timeout_ms("0") == 0